@@ -0,0 +1,139 @@
+"""
+Chaos API endpoints
+Scheduled link failures and impairment changes (chaos timelines) per lab
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Literal, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+from app.api.v1.labs import LinkUpdate
+from app.db.base import get_async_db
+from app.db.models import Lab, LabSession, Link
+from app.runtime.chaos import ChaosEvent
+from app.runtime.manager import get_runtime, RuntimeManager
+
+router = APIRouter()
+
+
+class ChaosEventCreate(BaseModel):
+    at: float = Field(ge=0, le=86400, description="Seconds after the timeline starts")
+    link_id: UUID
+    action: Literal["down", "up", "impair", "restore"]
+    impairment: Optional[LinkUpdate] = None
+
+
+class ChaosTimelineCreate(BaseModel):
+    name: Optional[str] = None
+    restore: bool = True
+    events: List[ChaosEventCreate] = Field(min_length=1, max_length=1000)
+
+
+@router.post("/{lab_id}/chaos", status_code=202)
+async def start_chaos(
+    lab_id: UUID,
+    timeline: ChaosTimelineCreate,
+    db: AsyncSession = Depends(get_async_db),
+    runtime: RuntimeManager = Depends(get_runtime)
+):
+    """
+    Start a chaos timeline on a running lab
+
+    Each event takes a link down or up, impairs it (fields as in
+    PATCH /links/{link_id}, on top of the link's stored values) or restores
+    it.  With `restore` set every touched link is put back to its stored
+    state when the timeline ends or is cancelled.  Applied events are logged
+    with timestamps in the timeline's lab session.
+    """
+    lab = await db.scalar(
+        select(Lab)
+        .options(selectinload(Lab.links).options(
+            selectinload(Link.source_node), selectinload(Link.target_node)
+        ))
+        .where(Lab.id == lab_id)
+    )
+
+    if not lab:
+        raise HTTPException(status_code=404, detail="Lab not found")
+
+    if lab.status != "running":
+        raise HTTPException(status_code=409, detail="Lab is not running")
+
+    if runtime.chaos.active(str(lab_id)):
+        raise HTTPException(status_code=409, detail="A chaos timeline is already running for this lab")
+
+    events = [
+        ChaosEvent(
+            at=event.at,
+            link_id=str(event.link_id),
+            action=event.action,
+            impairment=event.impairment.model_dump(exclude_unset=True) if event.impairment else {}
+        )
+        for event in timeline.events
+    ]
+
+    try:
+        started = await runtime.chaos.start(lab, events, db, name=timeline.name, restore=timeline.restore)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return {
+        "session_id": started.session_id,
+        "status": started.status,
+        "events": len(events),
+        "duration_s": max(event.at for event in events)
+    }
+
+
+@router.get("/{lab_id}/chaos")
+async def get_chaos(lab_id: UUID, runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Progress of the lab's current (or most recent) chaos timeline
+    """
+    timeline = runtime.chaos.timelines.get(str(lab_id))
+
+    if not timeline:
+        raise HTTPException(status_code=404, detail="No chaos timeline for this lab")
+
+    return {"session_id": timeline.session_id, **timeline.details()}
+
+
+@router.delete("/{lab_id}/chaos")
+async def cancel_chaos(lab_id: UUID, runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Cancel the running chaos timeline of a lab
+    """
+    timeline = await runtime.chaos.cancel(str(lab_id))
+
+    if not timeline:
+        raise HTTPException(status_code=404, detail="No chaos timeline running for this lab")
+
+    return {"session_id": timeline.session_id, "status": timeline.status}
+
+
+@router.get("/{lab_id}/chaos/history")
+async def list_chaos_runs(lab_id: UUID, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    """
+    Past chaos timelines of a lab with their event logs, most recent first
+    """
+    sessions = (await db.scalars(
+        select(LabSession)
+        .where(LabSession.lab_id == lab_id, LabSession.action == "chaos")
+        .order_by(LabSession.created_at.desc())
+        .limit(min(limit, 100))
+    )).all()
+
+    return {
+        "count": len(sessions),
+        "runs": [
+            {
+                "session_id": str(session.id),
+                "created_at": session.created_at.isoformat() if session.created_at else None,
+                **(session.details or {})
+            }
+            for session in sessions
+        ]
+    }
@@ -3,29 +3,39 @@ Enhanced Chat API with AI Tool Calling
 Uses Claude API with structured tools for topology manipulation
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, List, Dict, Optional, Any
 from uuid import UUID
+import asyncio
+import json
 import logging
 
-from app.db.base import get_db
-from app.db.models import Lab, Image, Node
+from app.db.base import get_async_db, AsyncSessionLocal
+from app.db.models import Lab, Node, Link
 from app.core.config import settings
 from app.services.topology_builder import TopologyBuilder
+from app.services.image_catalog import get_image_catalog
 from app.services.ai_tools import TOPOLOGY_TOOLS, get_system_prompt
-from app.runtime.manager import get_runtime
-
-# Import Anthropic client
-try:
-    from anthropic import Anthropic
-    anthropic_available = True
-except ImportError:
-    anthropic_available = False
+from app.services.ai_client import anthropic_available, get_ai_client
+from app.runtime.jobs import get_job_queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+CHAT_MODEL = "claude-sonnet-4-6"
+CHAT_MAX_TOKENS = 2048
+
+FOLLOW_UP_SUGGESTIONS = [
+    "Add more devices",
+    "Connect devices",
+    "Create a topology pattern",
+    "Deploy the lab"
+]
+
 
 class ChatMessage(BaseModel):
     message: str
@@ -47,10 +57,35 @@ class ChatResponse(BaseModel):
     preview: bool = False  # Requires user approval
 
 
+async def _build_system_prompt(message: ChatMessage, db: AsyncSession) -> str:
+    """System prompt with the current lab and the image catalog"""
+    lab_context = ""
+    if message.lab_id:
+        lab = await db.scalar(
+            select(Lab)
+            .options(selectinload(Lab.nodes), selectinload(Lab.links))
+            .where(Lab.id == message.lab_id)
+        )
+        if lab:
+            lab_context = f"""Current Lab: {lab.name}
+Status: {lab.status}
+Nodes: {len(lab.nodes)} ({', '.join([n.name for n in lab.nodes[:10]])})
+Links: {len(lab.links)}"""
+
+    # Get available images
+    images = (await get_image_catalog().load(db)).images()
+    images_context = "\n".join([
+        f"- {img.display_name} ({img.type}, vendor: {img.vendor})"
+        for img in images[:15]  # Limit to prevent token overflow
+    ])
+
+    return get_system_prompt(lab_context, images_context)
+
+
 @router.post("/", response_model=ChatResponse)
 async def chat_with_tools(
     message: ChatMessage,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Process natural language requests using Claude's tool calling
@@ -79,34 +114,12 @@ async def chat_with_tools(
         )
 
     try:
-        # Initialize Claude client
-        client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-
-        # Get lab context
-        lab = None
-        lab_context = ""
-        if message.lab_id:
-            lab = db.query(Lab).filter(Lab.id == message.lab_id).first()
-            if lab:
-                lab_context = f"""Current Lab: {lab.name}
-Status: {lab.status}
-Nodes: {len(lab.nodes)} ({', '.join([n.name for n in lab.nodes[:10]])})
-Links: {len(lab.links)}"""
-
-        # Get available images
-        images = db.query(Image).filter(Image.is_active == True).all()
-        images_context = "\n".join([
-            f"- {img.display_name} ({img.type}, vendor: {img.vendor.name})"
-            for img in images[:15]  # Limit to prevent token overflow
-        ])
+        system_prompt = await _build_system_prompt(message, db)
 
-        # Create system prompt
-        system_prompt = get_system_prompt(lab_context, images_context)
-
-        # Call Claude API with tools
-        response = client.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=2048,
+        # Call Claude API with tools (shared client: pooled connections, retries)
+        response = await get_ai_client().create(
+            model=CHAT_MODEL,
+            max_tokens=CHAT_MAX_TOKENS,
             system=system_prompt,
             tools=TOPOLOGY_TOOLS,
             messages=[{
@@ -133,18 +146,10 @@ Links: {len(lab.links)}"""
                 )
                 actions.append(action)
 
-        # Generate suggestions
-        suggestions = [
-            "Add more devices",
-            "Connect devices",
-            "Create a topology pattern",
-            "Deploy the lab"
-        ]
-
         return ChatResponse(
             response=text_response or "Actions executed successfully!",
             actions=actions,
-            suggestions=suggestions,
+            suggestions=FOLLOW_UP_SUGGESTIONS,
             preview=False  # Actions already executed
         )
 
@@ -153,11 +158,120 @@ Links: {len(lab.links)}"""
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
 
+def _sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Streaming variant of the chat endpoint (Server-Sent Events)
+
+    Events, in order of arrival:
+    - **text**: `{"text": ...}` delta of the assistant's reply
+    - **tool_use**: `{"id", "name"}` when the model starts a tool call
+    - **tool_result**: `{"id", "type", "description", "data", "status"}` once a tool has run
+    - **error**: `{"detail": ...}` if the model call fails
+    - **done**: the same payload as `POST /chat/`
+
+    Tools run one at a time, in the order the model emits them, while the
+    model keeps generating.
+    """
+    return StreamingResponse(
+        _chat_events(message),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _chat_events(message: ChatMessage) -> AsyncIterator[str]:
+    if not settings.ANTHROPIC_API_KEY or not anthropic_available:
+        detail = (
+            "AI assistant is not configured. Please add ANTHROPIC_API_KEY to environment variables."
+            if anthropic_available else
+            "Anthropic library not installed. Run: pip install anthropic"
+        )
+        yield _sse("done", {"response": detail, "actions": [], "suggestions": []})
+        return
+
+    # The session outlives the request handler, so it is owned here rather
+    # than injected with Depends(get_async_db)
+    db = AsyncSessionLocal()
+    events: asyncio.Queue = asyncio.Queue()
+    tool_calls: asyncio.Queue = asyncio.Queue()
+
+    async def read_model() -> None:
+        async with get_ai_client().stream(
+            model=CHAT_MODEL,
+            max_tokens=CHAT_MAX_TOKENS,
+            system=await _build_system_prompt(message, db),
+            tools=TOPOLOGY_TOOLS,
+            messages=[{"role": "user", "content": message.message}]
+        ) as stream:
+            async for event in stream:
+                if event.type == "text":
+                    await events.put(("text", {"text": event.text}))
+                elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    await events.put(("tool_use", {
+                        "id": event.content_block.id,
+                        "name": event.content_block.name
+                    }))
+                elif event.type == "content_block_stop":
+                    # Tool input is complete once its block closes
+                    block = stream.current_message_snapshot.content[event.index]
+                    if block.type == "tool_use":
+                        await tool_calls.put(block)
+
+    async def run_tools() -> None:
+        while (block := await tool_calls.get()) is not None:
+            action = await execute_tool_call(
+                tool_name=block.name,
+                tool_input=block.input,
+                lab_id=message.lab_id,
+                db=db
+            )
+            await events.put(("tool_result", {"id": block.id, **action.model_dump()}))
+
+    reader = asyncio.create_task(read_model())
+    worker = asyncio.create_task(run_tools())
+    reader.add_done_callback(lambda _: tool_calls.put_nowait(None))
+    worker.add_done_callback(lambda _: events.put_nowait(None))
+
+    text_response = ""
+    actions: List[Dict] = []
+    try:
+        while (item := await events.get()) is not None:
+            event, data = item
+            if event == "text":
+                text_response += data["text"]
+            elif event == "tool_result":
+                actions.append({k: v for k, v in data.items() if k != "id"})
+            yield _sse(event, data)
+
+        if not reader.cancelled() and reader.exception():
+            logger.error(f"Chat stream error: {reader.exception()}")
+            yield _sse("error", {"detail": f"Chat processing failed: {reader.exception()}"})
+
+        yield _sse("done", {
+            "response": text_response or "Actions executed successfully!",
+            "actions": actions,
+            "suggestions": FOLLOW_UP_SUGGESTIONS,
+            "preview": False
+        })
+    finally:
+        # Client went away or the stream finished: stop both tasks
+        for task in (reader, worker):
+            task.cancel()
+        await asyncio.gather(reader, worker, return_exceptions=True)
+        await db.close()
+
+
 async def execute_tool_call(
     tool_name: str,
     tool_input: Dict[str, Any],
     lab_id: Optional[UUID],
-    db: Session
+    db: AsyncSession
 ) -> ChatAction:
     """
     Execute an AI-generated tool call
@@ -173,9 +287,12 @@ async def execute_tool_call(
     """
     try:
         builder = TopologyBuilder()
+        if tool_name in ("add_nodes", "create_topology_pattern"):
+            await get_image_catalog().load(db)
 
+        # TopologyBuilder is shared with sync callers; run it on this session's connection
         if tool_name == "add_nodes":
-            result = builder.add_nodes(lab_id, tool_input["nodes"], db)
+            result = await db.run_sync(lambda session: builder.add_nodes(lab_id, tool_input["nodes"], session))
             return ChatAction(
                 type="add_nodes",
                 description=f"Added {len(result)} nodes: {', '.join([n['name'] for n in result])}",
@@ -184,7 +301,7 @@ async def execute_tool_call(
             )
 
         elif tool_name == "add_links":
-            result = builder.add_links(lab_id, tool_input["links"], db)
+            result = await db.run_sync(lambda session: builder.add_links(lab_id, tool_input["links"], session))
             return ChatAction(
                 type="add_links",
                 description=f"Created {len(result)} links",
@@ -203,12 +320,14 @@ async def execute_tool_call(
             else:
                 count = tool_input.get("count", 3)
 
-            result = builder.create_topology_pattern(
-                lab_id=lab_id,
-                pattern=pattern,
-                count=count,
-                image_type=tool_input.get("image_type", "router"),
-                db=db
+            result = await db.run_sync(
+                lambda session: builder.create_topology_pattern(
+                    lab_id=lab_id,
+                    pattern=pattern,
+                    count=count,
+                    image_type=tool_input.get("image_type", "router"),
+                    db=session
+                )
             )
 
             return ChatAction(
@@ -220,49 +339,35 @@ async def execute_tool_call(
 
         elif tool_name == "deploy_lab":
             # Get lab
-            lab = db.query(Lab).filter(Lab.id == lab_id).first()
+            lab = await db.get(Lab, lab_id)
             if not lab:
                 raise ValueError("Lab not found")
 
-            runtime = get_runtime()
-            deployed_nodes = []
-            created_links = []
-
-            # Deploy each node
-            for node in lab.nodes:
-                if node.status == "stopped":
-                    result = await runtime.deploy_node(node, node.image, db)
-                    deployed_nodes.append({
-                        "name": node.name,
-                        "container_id": result.get("container_id")
-                    })
-
-            # Create links if requested
-            if tool_input.get("create_links", True):
-                for link in lab.links:
-                    if link.status == "down":
-                        result = await runtime.create_link(link, db)
-                        if result.get("status") == "created":
-                            created_links.append({
-                                "source": f"{link.source_node.name}:{link.source_interface}",
-                                "target": f"{link.target_node.name}:{link.target_interface}"
-                            })
-
-            lab.status = "running"
-            db.commit()
+            # Same as POST /labs/{id}/deploy: the job queue runs it in the
+            # background and the UI follows it with GET /jobs/{job_id}
+            kind = "reconcile" if lab.status == "running" else "deploy"
+            queue = get_job_queue()
+            job = await db.run_sync(lambda session: queue.enqueue(lab, kind, session))
+            await db.refresh(job)
 
             return ChatAction(
                 type="deploy_lab",
-                description=f"Deployed {len(deployed_nodes)} nodes and created {len(created_links)} links",
-                data={
-                    "nodes": deployed_nodes,
-                    "links": created_links
-                },
+                description=f"Queued {kind} of lab '{lab.name}' (job {job.id})",
+                data={"job_id": str(job.id), **queue.describe(job)},
                 status="success"
             )
 
         elif tool_name == "get_lab_status":
-            lab = db.query(Lab).filter(Lab.id == lab_id).first()
+            lab = await db.scalar(
+                select(Lab)
+                .options(
+                    selectinload(Lab.nodes).joinedload(Node.image),
+                    selectinload(Lab.links).options(
+                        selectinload(Link.source_node), selectinload(Link.target_node)
+                    )
+                )
+                .where(Lab.id == lab_id)
+            )
             if not lab:
                 raise ValueError("Lab not found")
 
@@ -313,7 +418,7 @@ async def execute_tool_call(
 
 
 @router.get("/suggestions")
-async def get_suggestions(db: Session = Depends(get_db)):
+async def get_suggestions(db: AsyncSession = Depends(get_async_db)):
     """Get quick action suggestions for users"""
 
     suggestions = [
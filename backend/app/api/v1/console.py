@@ -1,21 +1,69 @@
 """
 WebSocket endpoint for device console access
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from uuid import UUID
 import asyncio
 import docker
 from docker.errors import DockerException, NotFound
 
-from app.db.base import get_db
+from app.db.base import get_async_db
 from app.db.models import Node
+from app.runtime.manager import get_runtime
+from app.services.console_relay import ConsoleRelay
 
 router = APIRouter()
 
+# Shared Docker client of the local engine: only used for exec setup, the relay itself is async
+_docker_client = None
+
+
+def get_docker_client() -> docker.DockerClient:
+    """Lazily create the process-wide Docker client used for console exec"""
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = docker.from_env()
+    return _docker_client
+
+
+def _exec_client(node: Node) -> docker.DockerClient:
+    """
+    Docker client of the engine a node runs on
+
+    Raises:
+        ValueError: the node's host is not registered
+    """
+    host = get_runtime().hosts.host_of(node)
+    if host.kernel == "local":
+        # The local engine (and its stand-ins) may be driven by the async runtime, which has no exec sockets
+        return get_docker_client()
+    return host.docker.client
+
+
+def _open_exec_socket(client: docker.DockerClient, container_id: str, shell_cmd: list):
+    """Create an interactive exec instance and return its raw socket (blocking)"""
+    container = client.containers.get(container_id)
+
+    exec_instance = client.api.exec_create(
+        container.id,
+        shell_cmd,
+        stdin=True,
+        tty=True,
+        environment={"TERM": "xterm-256color"}
+    )
+
+    return client.api.exec_start(
+        exec_instance['Id'],
+        socket=True,
+        tty=True
+    )
+
 
 @router.websocket("/nodes/{node_id}/console")
-async def console_websocket(websocket: WebSocket, node_id: UUID, db: Session = Depends(get_db)):
+async def console_websocket(websocket: WebSocket, node_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     WebSocket endpoint for console access to a node
 
@@ -23,9 +71,14 @@ async def console_websocket(websocket: WebSocket, node_id: UUID, db: Session = D
     """
     await websocket.accept()
 
+    exec_socket = None
     try:
         # Get node from database
-        node = db.query(Node).filter(Node.id == node_id).first()
+        node = await db.scalar(
+            select(Node).options(joinedload(Node.image)).where(Node.id == node_id)
+        )
+        # Hand the connection back to the pool; the console may stay open for hours
+        await db.close()
         if not node:
             await websocket.send_json({"error": "Node not found"})
             await websocket.close(code=1008)
@@ -36,71 +89,31 @@ async def console_websocket(websocket: WebSocket, node_id: UUID, db: Session = D
             await websocket.close(code=1008)
             return
 
-        # Connect to Docker
-        client = docker.from_env()
+        # Create exec instance for interactive shell
+        # Use bash for Linux containers, or appropriate shell for network devices
+        shell_cmd = ["/bin/bash"] if node.image.type == "host" else ["/bin/sh"]
+
+        try:
+            client = _exec_client(node)
+        except ValueError as e:
+            await websocket.send_json({"error": str(e)})
+            await websocket.close(code=1011)
+            return
 
         try:
-            container = client.containers.get(node.container_id)
+            exec_socket = await asyncio.to_thread(
+                _open_exec_socket, client, node.container_id, shell_cmd
+            )
         except NotFound:
             await websocket.send_json({"error": "Container not found"})
             await websocket.close(code=1008)
             return
 
-        # Create exec instance for interactive shell
-        # Use bash for Linux containers, or appropriate shell for network devices
-        shell_cmd = ["/bin/bash"] if node.image.type == "host" else ["/bin/sh"]
-
-        exec_instance = client.api.exec_create(
-            container.id,
-            shell_cmd,
-            stdin=True,
-            tty=True,
-            environment={"TERM": "xterm-256color"}
-        )
-
-        exec_socket = client.api.exec_start(
-            exec_instance['Id'],
-            socket=True,
-            tty=True
-        )
-
-        # Task to read from container and send to WebSocket
-        async def container_to_websocket():
-            try:
-                while True:
-                    # Read from container socket
-                    chunk = exec_socket._sock.recv(4096)
-                    if not chunk:
-                        break
-
-                    # Send to WebSocket
-                    await websocket.send_text(chunk.decode('utf-8', errors='replace'))
-
-            except Exception as e:
-                print(f"Error reading from container: {e}")
-            finally:
-                await websocket.close()
-
-        # Task to read from WebSocket and send to container
-        async def websocket_to_container():
-            try:
-                while True:
-                    # Read from WebSocket
-                    data = await websocket.receive_text()
-
-                    # Send to container
-                    exec_socket._sock.send(data.encode('utf-8'))
-
-            except WebSocketDisconnect:
-                pass
-            except Exception as e:
-                print(f"Error sending to container: {e}")
-
-        # Run both tasks concurrently
-        await asyncio.gather(
-            container_to_websocket(),
-            websocket_to_container()
-        )
+        await ConsoleRelay(websocket, exec_socket._sock).run()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # browser side already closed
 
     except DockerException as e:
         await websocket.send_json({"error": f"Docker error: {str(e)}"})
@@ -112,7 +125,5 @@ async def console_websocket(websocket: WebSocket, node_id: UUID, db: Session = D
 
     finally:
         # Cleanup
-        if 'exec_socket' in locals():
+        if exec_socket is not None:
             exec_socket.close()
-        if 'client' in locals():
-            client.close()
@@ -3,12 +3,15 @@ Images API endpoints
 Manage network device images (routers, switches, firewalls, hosts)
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from uuid import UUID
 
-from app.db.base import get_db
+from app.db.base import get_async_db
 from app.db.models import Image, Vendor
+from app.services.image_catalog import get_image_catalog
 
 router = APIRouter()
 
@@ -20,7 +23,7 @@ async def list_images(
     runtime: Optional[str] = None,
     tag: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List available network images with filtering
@@ -31,59 +34,21 @@ async def list_images(
     - **tag**: Filter by tag
     - **search**: Search in name and display_name
     """
-    query = db.query(Image).filter(Image.is_active == True)
-
-    if type:
-        query = query.filter(Image.type == type)
-    if vendor:
-        query = query.join(Vendor).filter(Vendor.name == vendor)
-    if runtime:
-        query = query.filter(Image.runtime == runtime)
-    if tag:
-        query = query.filter(Image.tags.any(tag=tag))
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (Image.display_name.ilike(search_pattern)) |
-            (Image.name.ilike(search_pattern))
-        )
-
-    images = query.all()
+    catalog = await get_image_catalog().load(db)
+    images = catalog.filter(type=type, vendor=vendor, runtime=runtime, tag=tag, search=search)
 
     return {
         "count": len(images),
-        "images": [
-            {
-                "id": str(img.id),
-                "name": img.name,
-                "display_name": img.display_name,
-                "version": img.version,
-                "type": img.type,
-                "runtime": img.runtime,
-                "image_uri": img.image_uri,
-                "vendor": {
-                    "name": img.vendor.name,
-                    "display_name": img.vendor.display_name,
-                    "logo_url": img.vendor.logo_url
-                } if img.vendor else None,
-                "cpu_recommended": img.cpu_recommended,
-                "memory_recommended": img.memory_recommended,
-                "startup_time": img.startup_time,
-                "console_type": img.console_type,
-                "default_credentials": img.default_credentials,
-                "tags": [tag.tag for tag in img.tags]
-            }
-            for img in images
-        ]
+        "images": [img.summary for img in images]
     }
 
 
 @router.get("/vendors/")
-async def list_vendors(db: Session = Depends(get_db)):
+async def list_vendors(db: AsyncSession = Depends(get_async_db)):
     """
     List all vendors
     """
-    vendors = db.query(Vendor).all()
+    vendors = (await db.scalars(select(Vendor).options(selectinload(Vendor.images)))).all()
 
     return {
         "count": len(vendors),
@@ -102,11 +67,15 @@ async def list_vendors(db: Session = Depends(get_db)):
 
 
 @router.get("/{image_id}")
-async def get_image(image_id: UUID, db: Session = Depends(get_db)):
+async def get_image(image_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Get detailed information about a specific image
     """
-    image = db.query(Image).filter(Image.id == image_id).first()
+    image = await db.scalar(
+        select(Image)
+        .options(selectinload(Image.vendor), selectinload(Image.interfaces), selectinload(Image.tags))
+        .where(Image.id == image_id)
+    )
 
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
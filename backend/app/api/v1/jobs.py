@@ -0,0 +1,71 @@
+"""
+Jobs API endpoints
+Status, progress and cancellation of background lab operations
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+
+from app.db.base import get_async_db
+from app.db.models import Job
+from app.runtime.jobs import get_job_queue
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_jobs(
+    lab_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List jobs, newest first, optionally for one lab or in one status
+    """
+    query = select(Job)
+    if lab_id:
+        query = query.where(Job.lab_id == lab_id)
+    if status:
+        query = query.where(Job.status == status)
+
+    jobs = (await db.scalars(query.order_by(Job.created_at.desc()).limit(limit))).all()
+    queue = get_job_queue()
+    return {"count": len(jobs), "jobs": [queue.describe(job) for job in jobs]}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a job's status, progress (percent) and, once finished, its result
+    """
+    job = await db.get(Job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return get_job_queue().describe(job)
+
+
+@router.post("/{job_id}/cancel", status_code=202)
+async def cancel_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cancel a queued or running job
+
+    A running deploy stops where it is: nodes already deployed stay up and
+    the lab is left running (or stopped if nothing was deployed yet).
+    """
+    job = await db.get(Job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+
+    queue = get_job_queue()
+    # The queue is shared with the sync workers; run it on this session's connection
+    await db.run_sync(lambda session: queue.cancel(job, session))
+    return queue.describe(job)
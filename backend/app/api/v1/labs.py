@@ -2,15 +2,22 @@
 Labs API endpoints
 Manage network topology labs
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+import asyncio
+import base64
 
-from app.db.base import get_db
-from app.db.models import Lab, Node, Link, Image
+from app.db.base import get_async_db
+from app.db.models import Lab, Node, Link
 from app.runtime.manager import get_runtime, RuntimeManager
+from app.runtime.jobs import get_job_queue
+from app.runtime.lab_events import get_lab_event_bus
+from app.runtime.network import parse_rate
 from datetime import datetime
 
 router = APIRouter()
@@ -37,36 +44,123 @@ class LinkCreate(BaseModel):
     target_interface: str
 
 
+class LinkUpdate(BaseModel):
+    bandwidth: Optional[str] = None
+    delay_ms: Optional[int] = Field(default=None, ge=0, le=60000)
+    loss_percent: Optional[float] = Field(default=None, ge=0, le=100)
+    jitter_ms: Optional[int] = Field(default=None, ge=0, le=60000)
+    delay_correlation: Optional[float] = Field(default=None, ge=0, le=100)
+    delay_distribution: Optional[Literal["uniform", "normal", "pareto", "paretonormal"]] = None
+    loss_correlation: Optional[float] = Field(default=None, ge=0, le=100)
+    reorder_percent: Optional[float] = Field(default=None, ge=0, le=100)
+    duplicate_percent: Optional[float] = Field(default=None, ge=0, le=100)
+    corrupt_percent: Optional[float] = Field(default=None, ge=0, le=100)
+
+    @field_validator("bandwidth")
+    @classmethod
+    def check_bandwidth(cls, value: Optional[str]) -> Optional[str]:
+        parse_rate(value)  # raises ValueError on a rate tc would reject
+        return value
+
+
+def _encode_cursor(lab: Lab) -> str:
+    """Opaque keyset cursor for the (created_at, id) ordering"""
+    raw = f"{lab.created_at.isoformat()}|{lab.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, lab_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(lab_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _get_lab(lab_id: UUID, db: AsyncSession) -> Lab:
+    lab = await db.get(Lab, lab_id)
+
+    if not lab:
+        raise HTTPException(status_code=404, detail="Lab not found")
+
+    return lab
+
+
+async def _enqueue(lab: Lab, kind: str, db: AsyncSession) -> Dict:
+    """Queue a lab operation, mapping an already active job to 409"""
+    queue = get_job_queue()
+    try:
+        # The queue is shared with the sync workers; run it on this session's connection
+        job = await db.run_sync(lambda session: queue.enqueue(lab, kind, session))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await db.refresh(job)
+
+    return {"message": f"Lab {kind} queued", "job_id": str(job.id), **queue.describe(job)}
+
+
 @router.get("/")
 async def list_labs(
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all labs with optional status filter
+    List labs with optional status filter, newest first
+
+    Node and link counts come from correlated count subqueries, so a page
+    is fetched in a single statement regardless of its size.  Pass the
+    returned `next_cursor` back as `cursor` to fetch the next page.
     """
-    query = db.query(Lab)
+    node_count = (
+        select(func.count(Node.id))
+        .where(Node.lab_id == Lab.id)
+        .correlate(Lab)
+        .scalar_subquery()
+    )
+    link_count = (
+        select(func.count(Link.id))
+        .where(Link.lab_id == Lab.id)
+        .correlate(Lab)
+        .scalar_subquery()
+    )
+
+    query = select(Lab, node_count.label("node_count"), link_count.label("link_count"))
 
     if status:
-        query = query.filter(Lab.status == status)
+        query = query.where(Lab.status == status)
+
+    if cursor:
+        created_at, lab_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Lab.created_at, Lab.id) < tuple_(created_at, lab_id))
 
-    labs = query.all()
+    rows = (
+        await db.execute(
+            query.order_by(Lab.created_at.desc(), Lab.id.desc())
+            .limit(limit + 1)
+        )
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     return {
-        "count": len(labs),
+        "count": len(rows),
+        "next_cursor": _encode_cursor(rows[-1][0]) if has_more else None,
         "labs": [
             {
                 "id": str(lab.id),
                 "name": lab.name,
                 "description": lab.description,
                 "status": lab.status,
-                "node_count": len(lab.nodes),
-                "link_count": len(lab.links),
+                "node_count": nodes,
+                "link_count": links,
                 "created_at": lab.created_at.isoformat() if lab.created_at else None,
                 "updated_at": lab.updated_at.isoformat() if lab.updated_at else None,
                 "deployed_at": lab.deployed_at.isoformat() if lab.deployed_at else None
             }
-            for lab in labs
+            for lab, nodes, links in rows
         ]
     }
 
@@ -74,7 +168,7 @@ async def list_labs(
 @router.post("/")
 async def create_lab(
     lab: LabCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new lab
@@ -85,8 +179,8 @@ async def create_lab(
         status="draft"
     )
     db.add(db_lab)
-    db.commit()
-    db.refresh(db_lab)
+    await db.commit()
+    await db.refresh(db_lab)
 
     return {
         "id": str(db_lab.id),
@@ -98,11 +192,20 @@ async def create_lab(
 
 
 @router.get("/{lab_id}")
-async def get_lab(lab_id: UUID, db: Session = Depends(get_db)):
+async def get_lab(lab_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Get detailed lab information including nodes and links
     """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
+    # Nodes (with their image) and links are loaded up front: three
+    # statements in total, however large the lab is
+    lab = await db.scalar(
+        select(Lab)
+        .options(
+            selectinload(Lab.nodes).joinedload(Node.image),
+            selectinload(Lab.links)
+        )
+        .where(Lab.id == lab_id)
+    )
 
     if not lab:
         raise HTTPException(status_code=404, detail="Lab not found")
@@ -132,6 +235,7 @@ async def get_lab(lab_id: UUID, db: Session = Depends(get_db)):
                     "memory": node.memory
                 },
                 "status": node.status,
+                "host": node.host,
                 "mgmt_ip": str(node.mgmt_ip) if node.mgmt_ip else None,
                 "console_port": node.console_port
             }
@@ -152,7 +256,13 @@ async def get_lab(lab_id: UUID, db: Session = Depends(get_db)):
                     "bandwidth": link.bandwidth,
                     "delay_ms": link.delay_ms,
                     "loss_percent": float(link.loss_percent) if link.loss_percent else 0,
-                    "jitter_ms": link.jitter_ms
+                    "jitter_ms": link.jitter_ms,
+                    "delay_correlation": float(link.delay_correlation) if link.delay_correlation else None,
+                    "delay_distribution": link.delay_distribution,
+                    "loss_correlation": float(link.loss_correlation) if link.loss_correlation else None,
+                    "reorder_percent": float(link.reorder_percent) if link.reorder_percent else None,
+                    "duplicate_percent": float(link.duplicate_percent) if link.duplicate_percent else None,
+                    "corrupt_percent": float(link.corrupt_percent) if link.corrupt_percent else None
                 },
                 "status": link.status
             }
@@ -165,17 +275,14 @@ async def get_lab(lab_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.delete("/{lab_id}")
-async def delete_lab(lab_id: UUID, db: Session = Depends(get_db)):
+async def delete_lab(lab_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a lab
     """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
+    lab = await _get_lab(lab_id, db)
 
-    if not lab:
-        raise HTTPException(status_code=404, detail="Lab not found")
-
-    db.delete(lab)
-    db.commit()
+    await db.delete(lab)
+    await db.commit()
 
     return {"message": "Lab deleted successfully"}
 
@@ -184,15 +291,12 @@ async def delete_lab(lab_id: UUID, db: Session = Depends(get_db)):
 async def add_node_to_lab(
     lab_id: UUID,
     node: NodeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a node to a lab
     """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
-
-    if not lab:
-        raise HTTPException(status_code=404, detail="Lab not found")
+    await _get_lab(lab_id, db)
 
     db_node = Node(
         lab_id=lab_id,
@@ -205,8 +309,8 @@ async def add_node_to_lab(
         status="stopped"
     )
     db.add(db_node)
-    db.commit()
-    db.refresh(db_node)
+    await db.commit()
+    await db.refresh(db_node)
 
     return {
         "id": str(db_node.id),
@@ -219,15 +323,12 @@ async def add_node_to_lab(
 async def add_link_to_lab(
     lab_id: UUID,
     link: LinkCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a link between two nodes in a lab
     """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
-
-    if not lab:
-        raise HTTPException(status_code=404, detail="Lab not found")
+    await _get_lab(lab_id, db)
 
     db_link = Link(
         lab_id=lab_id,
@@ -238,8 +339,8 @@ async def add_link_to_lab(
         status="down"
     )
     db.add(db_link)
-    db.commit()
-    db.refresh(db_link)
+    await db.commit()
+    await db.refresh(db_link)
 
     return {
         "id": str(db_link.id),
@@ -247,100 +348,122 @@ async def add_link_to_lab(
     }
 
 
-@router.post("/{lab_id}/deploy")
-async def deploy_lab(
+@router.patch("/{lab_id}/links/{link_id}")
+async def update_link(
     lab_id: UUID,
-    db: Session = Depends(get_db),
+    link_id: UUID,
+    update: LinkUpdate,
+    db: AsyncSession = Depends(get_async_db),
     runtime: RuntimeManager = Depends(get_runtime)
 ):
     """
-    Deploy all nodes in a lab
-    """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
+    Change link impairment (bandwidth, delay, jitter, loss, reordering, ...)
 
-    if not lab:
-        raise HTTPException(status_code=404, detail="Lab not found")
+    Only the fields sent are changed; send null to clear one.  On a wired
+    link the qdiscs of both ends are replaced in place without bringing the
+    veth down, so the call is cheap enough to drive impairment schedules.
+    """
+    link = await db.scalar(
+        select(Link)
+        .options(selectinload(Link.source_node), selectinload(Link.target_node))
+        .where(Link.id == link_id, Link.lab_id == lab_id)
+    )
 
-    if lab.status == "running":
-        return {"message": "Lab is already running", "status": "running"}
+    if not link:
+        raise HTTPException(status_code=404, detail="Link not found")
 
     try:
-        # Update lab status
-        lab.status = "deploying"
-        db.commit()
-
-        # Deploy each node
-        deployed_nodes = []
-        for node in lab.nodes:
-            image = db.query(Image).filter(Image.id == node.image_id).first()
-            if not image:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Image not found for node {node.name}"
-                )
-
-            result = await runtime.deploy_node(node, image, db)
-            deployed_nodes.append({
-                "node": node.name,
-                "container_id": result["container_id"],
-                "status": result["status"]
-            })
-
-        # Create links
-        deployed_links = []
-        for link in lab.links:
-            result = await runtime.create_link(link, db)
-            deployed_links.append({
-                "link_id": str(link.id),
-                "status": result["status"]
-            })
-
-        # Update lab status
-        lab.status = "running"
-        lab.deployed_at = datetime.utcnow()
-        db.commit()
-
-        return {
-            "message": "Lab deployed successfully",
-            "status": "running",
-            "nodes": deployed_nodes,
-            "links": deployed_links
-        }
-
-    except Exception as e:
-        lab.status = "error"
-        db.commit()
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post("/{lab_id}/destroy")
+        result = await runtime.update_link_impairment(link, update.model_dump(exclude_unset=True), db)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    return {"id": str(link.id), **result}
+
+
+@router.post("/{lab_id}/deploy", status_code=202)
+async def deploy_lab(
+    lab_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Queue a deployment of all nodes in a lab
+
+    A running lab is reconciled instead: only nodes and links that changed
+    since the last deploy are created, removed or re-impaired.  Returns a
+    job ID immediately; poll GET /jobs/{job_id} for progress and the result.
+    """
+    lab = await _get_lab(lab_id, db)
+
+    return await _enqueue(lab, "reconcile" if lab.status == "running" else "deploy", db)
+
+
+@router.post("/{lab_id}/destroy", status_code=202)
 async def destroy_lab(
     lab_id: UUID,
-    db: Session = Depends(get_db),
-    runtime: RuntimeManager = Depends(get_runtime)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Destroy all running nodes in a lab
+    Queue the destruction of all running nodes in a lab
+
+    Containers are removed concurrently; the job result reports the teardown
+    time and any containers that could not be removed.
     """
-    lab = db.query(Lab).filter(Lab.id == lab_id).first()
+    lab = await _get_lab(lab_id, db)
+
+    return await _enqueue(lab, "destroy", db)
 
-    if not lab:
-        raise HTTPException(status_code=404, detail="Lab not found")
 
+
+@router.websocket("/{lab_id}/events")
+async def lab_events(websocket: WebSocket, lab_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Push channel of lab state changes
+
+    Sends one JSON delta per change, with only the fields that changed:
+
+    - `{"type": "node", "id", "status"?, "mgmt_ip"?, "host"?}`
+    - `{"type": "link", "id", "status"}`
+    - `{"type": "lab", "id", "status"}`
+    - `{"type": "job", "id", "kind"?, "status"?, "progress"}`
+
+    Created and deleted rows carry `"op": "created"` / `"op": "deleted"`.
+    A `{"type": "resync"}` means deltas were dropped for a slow client,
+    which should re-fetch GET /labs/{lab_id}.  Deltas come from the
+    in-process event bus, so an open channel costs no database queries.
+    """
+    await websocket.accept()
+
+    lab = await db.get(Lab, lab_id)
+    # Hand the connection back to the pool; the channel may stay open for hours
+    await db.close()
+    if not lab:
+        await websocket.send_json({"error": "Lab not found"})
+        await websocket.close(code=1008)
+        return
+
+    subscription = get_lab_event_bus().subscribe(lab_id)
+    await websocket.send_json({"type": "subscribed", "id": str(lab_id), "status": lab.status})
+
+    async def drain_client() -> None:
+        # Nothing is expected from the client; reading notices it leaving
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    async def push() -> None:
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    tasks = [asyncio.create_task(drain_client()), asyncio.create_task(push())]
     try:
-        # Destroy each node
-        for node in lab.nodes:
-            if node.container_id:
-                await runtime.destroy_node(node, db)
-
-        # Update lab status
-        lab.status = "stopped"
-        db.commit()
-
-        return {
-            "message": "Lab destroyed successfully",
-            "status": "stopped"
-        }
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        subscription.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,128 @@
+"""
+Runtime API endpoints
+Container runtime statistics, hosts, capacity, warm pool, image pull and orphan collection management
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+from app.db.base import get_async_db
+from app.db.models import Image
+from app.runtime.manager import get_runtime, RuntimeManager
+from app.runtime.pool import PoolSpec
+
+router = APIRouter()
+
+
+class PoolSizeUpdate(BaseModel):
+    size: int = Field(ge=0, le=64)
+
+
+@router.get("/stats")
+async def get_runtime_stats(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    List NEON-managed containers and their states
+    """
+    return await runtime.get_runtime_stats()
+
+
+@router.get("/pool")
+async def get_pool_stats(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Warm pool sizes and hit/miss counters, overall and per image
+    """
+    return runtime.pool.stats()
+
+
+@router.put("/pool/{image_id}")
+async def set_pool_size(
+    image_id: UUID,
+    update: PoolSizeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    runtime: RuntimeManager = Depends(get_runtime)
+):
+    """
+    Set how many pre-booted containers to keep for an image (0 disables)
+    """
+    image = await db.get(Image, image_id)
+
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    image.warm_pool_size = update.size
+    await db.commit()
+
+    await runtime.pool.resize(PoolSpec.from_image(image))
+
+    return runtime.pool.image_stats(str(image.id))
+
+
+@router.get("/pulls")
+async def list_pulls(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Progress of image pulls (background pre-pulls and deploy-triggered pulls)
+    """
+    pulls = runtime.puller.progress()
+    return {"count": len(pulls), "pulls": pulls}
+
+
+@router.post("/pulls", status_code=202)
+async def prefetch_images(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Pull every active catalog image in the background
+    """
+    scheduled = await runtime.puller.prefetch_catalog()
+    return {"scheduled": scheduled}
+
+
+@router.get("/gc")
+async def get_gc_report(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Report of the last orphan collection pass
+    """
+    if runtime.orphans.last_report is None:
+        raise HTTPException(status_code=404, detail="No collection pass has run yet")
+    return runtime.orphans.last_report
+
+
+@router.post("/gc")
+async def collect_orphans(
+    dry_run: bool = Query(True, description="Only report what would be reclaimed"),
+    grace: Optional[int] = Query(None, ge=0, description="Seconds a resource must have been orphaned"),
+    runtime: RuntimeManager = Depends(get_runtime)
+):
+    """
+    Run an orphan collection pass now: containers no node references and
+    veths left in the host namespace
+    """
+    return await runtime.orphans.collect(dry_run=dry_run, grace=grace)
+
+
+@router.get("/hosts")
+async def list_hosts(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Docker hosts lab nodes are placed on, with their free capacity
+    """
+    free = await runtime.hosts.capacities()
+    return {
+        "sharded": runtime.hosts.sharded,
+        "hosts": [
+            {
+                "name": host.name,
+                "vtep": host.vtep,
+                "stand_in": host.kernel == "local" and host is not runtime.hosts.local,
+                "free": free[host.name].as_dict() if host.name in free else None
+            }
+            for host in runtime.hosts.hosts.values()
+        ]
+    }
+
+
+@router.get("/capacity")
+async def get_capacity(runtime: RuntimeManager = Depends(get_runtime)):
+    """
+    Host CPU/memory, allowed oversubscription, committed resources and headroom
+    """
+    return await runtime.capacity.headroom()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,7 @@ class Settings(BaseSettings):
 
     # API Keys
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_BASE_URL: Optional[str] = None  # None = api.anthropic.com; point at a local fake server in tests
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -19,6 +20,65 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_V1_PREFIX: str = "/api/v1"
 
+    # Runtime
+    DEPLOY_CONCURRENCY: int = 8  # max nodes created/started in parallel per deploy
+    DOCKER_RUNTIME: str = "sdk"  # "sdk" (docker-py in worker threads) or "async" (Engine API over httpx)
+    DOCKER_SOCKET: str = "/var/run/docker.sock"
+    DOCKER_API_VERSION: str = "1.41"
+    DOCKER_MAX_CONNECTIONS: int = 20  # pooled keep-alive connections to the Docker socket
+    NETLINK_ENABLED: bool = True  # use pyroute2 for links when installed, else ip/tc subprocesses
+    BATCH_LINK_WIRING: bool = True  # subprocess backend: wire a whole lab with ip/tc -batch
+    NODE_EVENT_WATCHER: bool = True  # track node readiness from the Docker events stream
+    WARM_POOL_ENABLED: bool = True  # keep Image.warm_pool_size pre-booted containers per image
+    WARM_POOL_REFILL_CONCURRENCY: int = 2  # warm containers created in parallel
+    IMAGE_PREPULL: bool = True  # pull every active catalog image in the background on startup
+    IMAGE_PULL_CONCURRENCY: int = 2  # background pulls in flight at once
+    ORPHAN_GC_ENABLED: bool = True  # periodically reclaim leaked containers and host veths
+    ORPHAN_GC_INTERVAL: int = 300  # seconds between collection passes
+    ORPHAN_GC_GRACE: int = 120  # seconds a resource must stay orphaned before it is reclaimed
+    ORPHAN_GC_DRY_RUN: bool = False  # periodic passes only report what they would reclaim
+
+    # Hosts
+    DOCKER_HOSTS: List[Dict[str, str]] = []  # extra engines: [{"name": "edge1", "url": "tcp://10.0.0.2:2375", "vtep": "10.0.0.2"}]; url "local" adds a stand-in on this engine
+    LOCAL_HOST_NAME: str = "local"
+    LOCAL_VTEP: Optional[str] = None  # underlay address of this host for VXLAN tunnels
+    HOST_HELPER_IMAGE: str = "nicolaka/netshoot:latest"  # privileged helper running ip/tc/nsenter on remote hosts
+    VXLAN_VNI_BASE: int = 4096  # lowest VNI handed out to cross-host links
+    PLACEMENT_IMBALANCE: float = 0.1  # a host may take this fraction more than its capacity share of a lab
+
+    # Capacity
+    CAPACITY_ADMISSION: str = "queue"  # "queue" waits for headroom, "refuse" fails the node, "off" disables checks
+    CAPACITY_CPU_RATIO: float = 2.0  # committed vCPUs allowed per host CPU
+    CAPACITY_MEMORY_RATIO: float = 1.0  # committed memory allowed per MB of host memory
+    CAPACITY_QUEUE_TIMEOUT: int = 300  # seconds a node waits for headroom before failing
+    CAPACITY_REFRESH_INTERVAL: float = 2.0  # seconds a running-container snapshot is reused
+
+    # Jobs
+    JOB_WORKERS: int = 2  # lab deploy/destroy/reconcile jobs executed in parallel per process
+    JOB_POLL_INTERVAL: float = 1.0  # seconds between queue polls when idle
+    JOB_HEARTBEAT_INTERVAL: float = 2.0  # seconds between progress/heartbeat writes of running jobs
+    JOB_STALE_AFTER: int = 30  # seconds without heartbeat before a running job is requeued
+
+    # Console
+    CONSOLE_CHUNK_SIZE: int = 4096  # bytes read from the exec socket per chunk
+    CONSOLE_QUEUE_DEPTH: int = 64  # chunks buffered per session before backpressure
+
+    # Lab events
+    LAB_EVENTS_QUEUE_DEPTH: int = 256  # deltas buffered per WebSocket subscriber before it is told to resync
+
+    # AI assistant
+    AI_TIMEOUT: float = 60.0  # seconds per read/write of an Anthropic API call
+    AI_CONNECT_TIMEOUT: float = 5.0  # seconds to open a connection
+    AI_MAX_RETRIES: int = 3  # retries of rate-limited, overloaded or failed calls
+    AI_RETRY_BASE_DELAY: float = 0.5  # seconds; backoff doubles per retry, fully jittered
+    AI_RETRY_MAX_DELAY: float = 8.0  # seconds; cap of one backoff (also caps retry-after)
+    AI_MAX_CONCURRENCY: int = 8  # Anthropic calls in flight per process; others wait
+    AI_MAX_CONNECTIONS: int = 10  # pooled keep-alive connections to the API
+    AI_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle pooled connection is kept
+
+    # Image catalog
+    IMAGE_CATALOG_TTL: int = 300  # seconds; bounds staleness for writes made by other processes (e.g. app.db.seed)
+
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -6,6 +6,7 @@ from app.db.models.node import Node
 from app.db.models.link import Link
 from app.db.models.template import Template
 from app.db.models.lab_session import LabSession
+from app.db.models.job import Job
 
 __all__ = [
     "Vendor",
@@ -18,4 +19,5 @@ __all__ = [
     "Link",
     "Template",
     "LabSession",
+    "Job",
 ]
@@ -35,6 +35,9 @@ class Image(Base):
     memory_recommended = Column(Integer, default=2048)  # MB
     disk_size = Column(Integer, default=4096)  # MB
 
+    # Warm pool: pre-booted containers kept ready for deploys
+    warm_pool_size = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Behavior
     startup_time = Column(Integer, default=30)  # seconds
     console_type = Column(String(20), default="ssh")
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+
+from app.db.base import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    lab_id = Column(UUID(as_uuid=True), ForeignKey("labs.id", ondelete="CASCADE"), index=True)
+
+    kind = Column(String(30), nullable=False)  # deploy, reconcile, destroy
+
+    # Status: queued, running, succeeded, failed, cancelled
+    status = Column(String(20), default="queued", nullable=False, index=True)
+    progress = Column(Integer, default=0)  # percent
+    cancel_requested = Column(Boolean, default=False)
+
+    result = Column(JSONB)
+    error = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))  # refreshed while running; stale means the worker died
+    finished_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    lab = relationship("Lab", back_populates="jobs")
+
+    # At most one queued or running job per lab, enforced by the database so
+    # that concurrent enqueues cannot both pass JobQueue.enqueue's check
+    __table_args__ = (
+        Index(
+            "ix_jobs_one_active_per_lab", "lab_id", unique=True,
+            postgresql_where=status.in_(("queued", "running"))
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Job(kind='{self.kind}', status='{self.status}')>"
@@ -34,6 +34,7 @@ class Lab(Base):
     nodes = relationship("Node", back_populates="lab", cascade="all, delete-orphan")
     links = relationship("Link", back_populates="lab", cascade="all, delete-orphan")
     sessions = relationship("LabSession", back_populates="lab", cascade="all, delete-orphan")
+    jobs = relationship("Job", back_populates="lab", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Lab(name='{self.name}', status='{self.status}')>"
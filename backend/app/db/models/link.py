@@ -11,7 +11,7 @@ class Link(Base):
     __tablename__ = "links"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    lab_id = Column(UUID(as_uuid=True), ForeignKey("labs.id", ondelete="CASCADE"))
+    lab_id = Column(UUID(as_uuid=True), ForeignKey("labs.id", ondelete="CASCADE"), index=True)
 
     # Endpoints
     source_node_id = Column(UUID(as_uuid=True), ForeignKey("nodes.id", ondelete="CASCADE"))
@@ -24,9 +24,16 @@ class Link(Base):
     delay_ms = Column(Integer, default=0)
     loss_percent = Column(Numeric(5, 2), default=0)
     jitter_ms = Column(Integer, default=0)
+    delay_correlation = Column(Numeric(5, 2))
+    delay_distribution = Column(String(20))  # uniform, normal, pareto, paretonormal
+    loss_correlation = Column(Numeric(5, 2))
+    reorder_percent = Column(Numeric(5, 2))
+    duplicate_percent = Column(Numeric(5, 2))
+    corrupt_percent = Column(Numeric(5, 2))
 
     # State: up, down
     status = Column(String(20), default="down")
+    vni = Column(Integer, unique=True)  # VXLAN network identifier when the ends are on different hosts
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -11,7 +11,7 @@ class Node(Base):
     __tablename__ = "nodes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    lab_id = Column(UUID(as_uuid=True), ForeignKey("labs.id", ondelete="CASCADE"))
+    lab_id = Column(UUID(as_uuid=True), ForeignKey("labs.id", ondelete="CASCADE"), index=True)
     image_id = Column(UUID(as_uuid=True), ForeignKey("images.id"))
 
     # Identity
@@ -29,6 +29,7 @@ class Node(Base):
     # Runtime state: stopped, starting, running, error
     status = Column(String(30), default="stopped", index=True)
     container_id = Column(String(100))
+    host = Column(String(100))  # Docker host the container runs on (None: local)
     mgmt_ip = Column(INET)
     console_port = Column(Integer)
 
@@ -5,7 +5,11 @@ FastAPI Application Entry Point
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.v1 import images, labs, chat, console
+from app.api.v1 import images, labs, chat, chaos, console, jobs, runtime
+from app.runtime.manager import get_runtime, shutdown_runtime
+from app.runtime.events import get_event_watcher
+from app.runtime.jobs import get_job_queue
+from app.services.ai_client import shutdown_ai_client
 
 # Create FastAPI app
 app = FastAPI(
@@ -62,6 +66,18 @@ app.include_router(
     tags=["labs"]
 )
 
+app.include_router(
+    chaos.router,
+    prefix=f"{settings.API_V1_PREFIX}/labs",
+    tags=["chaos"]
+)
+
+app.include_router(
+    jobs.router,
+    prefix=f"{settings.API_V1_PREFIX}/jobs",
+    tags=["jobs"]
+)
+
 app.include_router(
     chat.router,
     prefix=f"{settings.API_V1_PREFIX}/chat",
@@ -74,6 +90,12 @@ app.include_router(
     tags=["console"]
 )
 
+app.include_router(
+    runtime.router,
+    prefix=f"{settings.API_V1_PREFIX}/runtime",
+    tags=["runtime"]
+)
+
 
 # Startup event
 @app.on_event("startup")
@@ -82,12 +104,42 @@ async def startup_event():
     print(f"🚀 Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     print(f"📚 API Documentation: http://localhost:8000/docs")
 
+    if settings.NODE_EVENT_WATCHER:
+        await get_event_watcher().start()
+
+    try:
+        await get_job_queue().start()
+    except Exception as e:
+        print(f"⚠️  Job queue not started: {e}")
+
+    if settings.IMAGE_PREPULL:
+        try:
+            await get_runtime().puller.prefetch_catalog()
+        except Exception as e:
+            print(f"⚠️  Image pre-pull not started: {e}")
+
+    if settings.WARM_POOL_ENABLED:
+        try:
+            await get_runtime().pool.start()
+        except Exception as e:
+            print(f"⚠️  Warm pool not started: {e}")
+
+    if settings.ORPHAN_GC_ENABLED:
+        try:
+            get_runtime().orphans.start()
+        except Exception as e:
+            print(f"⚠️  Orphan collector not started: {e}")
+
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks"""
     print(f"👋 Shutting down {settings.PROJECT_NAME}")
+    await get_job_queue().stop()
+    await get_event_watcher().stop()
+    await shutdown_runtime()
+    await shutdown_ai_client()
 
 
 if __name__ == "__main__":
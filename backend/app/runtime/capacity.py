@@ -0,0 +1,217 @@
+"""
+Capacity Accountant for NEON
+Admission control of node deploys against the host's CPU and memory
+"""
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.models import Image, Node
+
+if TYPE_CHECKING:
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+# Used for containers created without resource labels (before they existed)
+DEFAULT_CPU = 1
+DEFAULT_MEMORY = 512
+
+
+class CapacityError(Exception):
+    """A deploy would oversubscribe the host beyond the configured ratios"""
+
+
+def node_resources(node: Node, image: Image) -> Tuple[int, int]:
+    """CPUs and memory (MB) a node's container is created with"""
+    cpu = node.cpu or image.cpu_recommended or DEFAULT_CPU
+    memory = node.memory or image.memory_recommended or DEFAULT_MEMORY
+    return cpu, memory
+
+
+@dataclass
+class Resources:
+    cpu: float = 0
+    memory: int = 0  # MB
+
+    def __add__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpu + other.cpu, self.memory + other.memory)
+
+    def __sub__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpu - other.cpu, self.memory - other.memory)
+
+    def fits(self, other: "Resources") -> bool:
+        """Whether `other` fits inside these resources"""
+        return other.cpu <= self.cpu and other.memory <= self.memory
+
+    def as_dict(self) -> Dict:
+        return {"cpu": round(self.cpu, 2), "memory": self.memory}
+
+
+def committed_resources(containers: List[Dict]) -> Resources:
+    """Sum the resource labels of running containers (DockerRuntime.list_containers format)"""
+    total = Resources()
+    for container in containers:
+        labels = container.get("labels") or {}
+        total += Resources(
+            float(labels.get("neon.cpu", DEFAULT_CPU)),
+            int(labels.get("neon.memory", DEFAULT_MEMORY))
+        )
+    return total
+
+
+class CapacityAccountant:
+    """
+    Tracks committed CPU and memory against the host's totals.
+
+    Committed resources are the `neon.cpu`/`neon.memory` labels of running
+    NEON containers (warm pool members included), read from one container
+    listing that is reused for CAPACITY_REFRESH_INTERVAL seconds, plus the
+    reservations of deploys admitted but not finished yet.  The host may be
+    oversubscribed up to CAPACITY_CPU_RATIO / CAPACITY_MEMORY_RATIO.
+    Depending on CAPACITY_ADMISSION a deploy that does not fit waits for
+    headroom ("queue", up to CAPACITY_QUEUE_TIMEOUT) or fails ("refuse").
+    """
+
+    def __init__(self, runtime: "RuntimeManager"):
+        self.runtime = runtime
+        self._host: Optional[Resources] = None
+        self._running = Resources()
+        self._refreshed_at: Optional[float] = None
+        self._reservations: Dict[int, Resources] = {}
+        self._next_id = 0
+        self._waiting = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def mode(self) -> str:
+        return settings.CAPACITY_ADMISSION
+
+    async def host(self) -> Resources:
+        if self._host is None:
+            info = await self.runtime._run(self.runtime.docker.host_info)
+            self._host = Resources(info["cpus"], info["memory"])
+        return self._host
+
+    async def limits(self) -> Resources:
+        host = await self.host()
+        return Resources(host.cpu * settings.CAPACITY_CPU_RATIO, int(host.memory * settings.CAPACITY_MEMORY_RATIO))
+
+    def reserved(self) -> Resources:
+        total = Resources()
+        for reservation in self._reservations.values():
+            total += reservation
+        return total
+
+    async def _refresh(self, force: bool = False) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            not force and self._refreshed_at is not None
+            and loop.time() - self._refreshed_at < settings.CAPACITY_REFRESH_INTERVAL
+        ):
+            return
+        containers = await self.runtime._run(
+            self.runtime.docker.list_containers,
+            {"label": ["neon.managed=true"], "status": ["running"]}
+        )
+        self._running = committed_resources(containers)
+        self._refreshed_at = loop.time()
+
+    async def headroom(self) -> Dict:
+        """Host totals, allowed limits, committed resources and what is left"""
+        await self._refresh()
+        host, limits = await self.host(), await self.limits()
+        committed = self._running + self.reserved()
+        return {
+            "admission": self.mode,
+            "host": host.as_dict(),
+            "ratios": {"cpu": settings.CAPACITY_CPU_RATIO, "memory": settings.CAPACITY_MEMORY_RATIO},
+            "limits": limits.as_dict(),
+            "committed": committed.as_dict(),
+            "running": self._running.as_dict(),
+            "reserved": self.reserved().as_dict(),
+            "headroom": (limits - committed).as_dict(),
+            "pending_deploys": len(self._reservations),
+            "waiting_deploys": self._waiting
+        }
+
+    async def check(self, cpu: float, memory: int) -> None:
+        """
+        Fail early when a whole deploy can never fit (or, with "refuse", does not fit now)
+
+        Raises:
+            CapacityError: the demand exceeds the limits or current headroom
+        """
+        if self.mode == "off":
+            return
+        demand = Resources(cpu, memory)
+        limits = await self.limits()
+        if not limits.fits(demand):
+            raise CapacityError(
+                f"Deploy needs {cpu} CPU / {memory} MB, host allows at most "
+                f"{limits.cpu:g} CPU / {limits.memory} MB"
+            )
+        if self.mode == "refuse":
+            await self._refresh(force=True)
+            free = limits - self._running - self.reserved()
+            if not free.fits(demand):
+                raise CapacityError(
+                    f"Deploy needs {cpu} CPU / {memory} MB, only "
+                    f"{free.cpu:g} CPU / {free.memory} MB available"
+                )
+
+    @asynccontextmanager
+    async def admit(self, name: str, cpu: float, memory: int) -> AsyncIterator[None]:
+        """
+        Reserve resources for one container for the duration of its deploy
+
+        Raises:
+            CapacityError: refused, or no headroom within CAPACITY_QUEUE_TIMEOUT
+        """
+        if self.mode == "off":
+            yield
+            return
+
+        demand = Resources(cpu, memory)
+        limits = await self.limits()
+        if not limits.fits(demand):
+            raise CapacityError(f"{name} needs more than the host allows ({cpu} CPU / {memory} MB)")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CAPACITY_QUEUE_TIMEOUT
+        async with self._changed:
+            force = False
+            while True:
+                await self._refresh(force)
+                if (limits - self._running - self.reserved()).fits(demand):
+                    break
+                remaining = deadline - loop.time()
+                if self.mode == "refuse" or remaining <= 0:
+                    raise CapacityError(f"No capacity for {name} ({cpu} CPU / {memory} MB)")
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait(),
+                        timeout=min(remaining, settings.CAPACITY_REFRESH_INTERVAL)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+                force = True
+
+            reservation = self._next_id
+            self._next_id += 1
+            self._reservations[reservation] = demand
+
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._reservations.pop(reservation, None)
+                # The container (if any) is running now: count it from the listing
+                self._refreshed_at = None
+                self._changed.notify_all()
@@ -0,0 +1,334 @@
+"""
+Chaos Timelines for NEON
+Runs declarative schedules of link failures and impairment changes against a lab
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+from app.db.base import SessionLocal
+from app.db.models import Lab, LabSession
+from app.runtime.network import Impairment
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("down", "up", "impair", "restore")
+
+
+@dataclass
+class ChaosEvent:
+    """One scheduled change to a link"""
+    at: float                # seconds after the timeline starts
+    link_id: str
+    action: str              # down, up, impair, restore
+    # Impairment fields for "impair", applied on top of the link's DB values
+    impairment: Dict = field(default_factory=dict)
+
+
+@dataclass
+class LinkTarget:
+    """A link resolved to its two ends, with the DB impairment to restore"""
+    link_id: str
+    name: str
+    ends: List[Tuple[str, str, int]]     # (container_id, interface, pid)
+    baseline: Impairment
+    current: Impairment
+    up: bool = True
+
+
+class ChaosTimeline:
+    """
+    Executes one schedule on the event loop.
+
+    Events are fired against monotonic loop time measured from the start of
+    the run, so drift does not accumulate across events; events sharing a
+    timestamp are applied concurrently.  Container PIDs are resolved before
+    the run starts, so applying an event is only the ip/tc call itself.
+    Every applied event is appended to the LabSession's details by a
+    background writer, keeping database round-trips off the timing path.
+    """
+
+    def __init__(
+        self,
+        runtime: "RuntimeManager",
+        lab_id: str,
+        session_id: str,
+        events: List[ChaosEvent],
+        targets: Dict[str, LinkTarget],
+        name: Optional[str] = None,
+        restore: bool = True
+    ):
+        self.runtime = runtime
+        self.lab_id = lab_id
+        self.session_id = session_id
+        self.name = name
+        self.events = sorted(events, key=lambda e: e.at)
+        self.targets = targets
+        self.restore = restore
+        self.status = "pending"  # pending, running, completed, cancelled, failed
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.log: List[Dict] = []
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def cancel(self) -> None:
+        """Stop before the next event (links are restored if `restore` is set)"""
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def wait(self) -> None:
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        writer = asyncio.create_task(self._writer())
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.started_at = time.time()
+        self.status = "running"
+        self._dirty.set()
+
+        try:
+            for at, group in groupby(self.events, key=lambda e: e.at):
+                delay = start + at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                fired = loop.time() - start
+                group = list(group)
+                results = await asyncio.gather(*(self._apply(event) for event in group))
+                for event, (ok, duration) in zip(group, results):
+                    self._record(event, fired, duration, ok)
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Chaos timeline for lab {self.lab_id} failed: {e}")
+            self.status = "failed"
+        finally:
+            if self.restore:
+                await self._restore_all()
+            self.finished_at = time.time()
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+            try:
+                await asyncio.to_thread(self._save, self.details())
+            except Exception as e:
+                logger.warning(f"Failed to save chaos log for lab {self.lab_id}: {e}")
+            logger.info(f"Chaos timeline for lab {self.lab_id} {self.status} ({len(self.log)} events)")
+
+    async def _apply(self, event: ChaosEvent) -> Tuple[bool, float]:
+        target = self.targets[event.link_id]
+        started = time.perf_counter()
+
+        if event.action in ("down", "up"):
+            ok = await self._set_state(target, event.action == "up")
+        elif event.action == "impair":
+            ok = await self._set_impairment(
+                target, Impairment(**{**target.baseline.as_dict(), **event.impairment})
+            )
+        else:  # restore
+            ok = await self._set_impairment(target, target.baseline)
+            ok = await self._set_state(target, True) and ok
+
+        return ok, (time.perf_counter() - started) * 1000
+
+    async def _set_state(self, target: LinkTarget, up: bool) -> bool:
+        run, network = self.runtime._run, self.runtime.network
+        results = await asyncio.gather(*(
+            run(network.set_link_state, container_id, iface, up, pid=pid)
+            for container_id, iface, pid in target.ends
+        ))
+        if all(results):
+            target.up = up
+        return all(results)
+
+    async def _set_impairment(self, target: LinkTarget, impairment: Impairment) -> bool:
+        run, network = self.runtime._run, self.runtime.network
+        previous = target.current.normalized()
+        results = await asyncio.gather(*(
+            run(network.set_impairment, container_id, iface, previous=previous, pid=pid, **impairment.as_dict())
+            for container_id, iface, pid in target.ends
+        ))
+        if all(results):
+            target.current = impairment
+        return all(results)
+
+    async def _restore_all(self) -> None:
+        touched = [t for t in self.targets.values() if not t.up or t.current != t.baseline]
+        await asyncio.gather(*(
+            self._apply(ChaosEvent(at=0, link_id=t.link_id, action="restore")) for t in touched
+        ))
+
+    def _record(self, event: ChaosEvent, fired: float, duration_ms: float, ok: bool) -> None:
+        self.log.append({
+            "at": event.at,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "offset_ms": round(fired * 1000, 3),
+            "drift_ms": round((fired - event.at) * 1000, 3),
+            "duration_ms": round(duration_ms, 3),
+            "link_id": event.link_id,
+            "link": self.targets[event.link_id].name,
+            "action": event.action,
+            "impairment": event.impairment or None,
+            "status": "ok" if ok else "error"
+        })
+        self._dirty.set()
+
+    async def _writer(self) -> None:
+        """Persist the log as it grows, coalescing events that land together"""
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            try:
+                await asyncio.to_thread(self._save, self.details())
+            except Exception as e:
+                logger.warning(f"Failed to save chaos log for lab {self.lab_id}: {e}")
+
+    def _save(self, details: Dict) -> None:
+        db = SessionLocal()
+        try:
+            session = db.query(LabSession).filter(LabSession.id == self.session_id).first()
+            if session:
+                session.details = details
+                db.commit()
+        finally:
+            db.close()
+
+    def details(self) -> Dict:
+        """Schedule, progress and the log of applied events (stored in LabSession.details)"""
+        return {
+            "name": self.name,
+            "status": self.status,
+            "restore": self.restore,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": [asdict(event) for event in self.events],
+            "log": list(self.log)
+        }
+
+
+class ChaosEngine:
+    """Runs at most one chaos timeline per lab"""
+
+    def __init__(self, runtime: "RuntimeManager"):
+        self.runtime = runtime
+        self.timelines: Dict[str, ChaosTimeline] = {}
+        self._starting: Set[str] = set()
+
+    def active(self, lab_id: str) -> Optional[ChaosTimeline]:
+        timeline = self.timelines.get(lab_id)
+        return timeline if timeline and timeline.running else None
+
+    async def start(
+        self,
+        lab: Lab,
+        events: List[ChaosEvent],
+        db: "AsyncSession",
+        name: Optional[str] = None,
+        restore: bool = True
+    ) -> ChaosTimeline:
+        """
+        Validate a schedule against a lab and start running it
+
+        `lab` must come with its links and their nodes loaded.
+
+        Raises:
+            ValueError: unknown or unwired link, invalid action or impairment,
+                or a timeline is already running for the lab
+        """
+        lab_id = str(lab.id)
+        if self.active(lab_id) or lab_id in self._starting:
+            raise ValueError("A chaos timeline is already running for this lab")
+
+        # Hold the lab until its timeline is registered: starting awaits the
+        # runtime and the database, and a second start must not slip in
+        self._starting.add(lab_id)
+        try:
+            return await self._start(lab, events, db, name, restore)
+        finally:
+            self._starting.discard(lab_id)
+
+    async def _start(
+        self,
+        lab: Lab,
+        events: List[ChaosEvent],
+        db: "AsyncSession",
+        name: Optional[str],
+        restore: bool
+    ) -> ChaosTimeline:
+        lab_id = str(lab.id)
+        links = {str(link.id): link for link in lab.links}
+        for event in events:
+            link = links.get(event.link_id)
+            if link is None:
+                raise ValueError(f"Link {event.link_id} is not part of this lab")
+            if link.status != "up" or not (link.source_node.container_id and link.target_node.container_id):
+                raise ValueError(f"Link {event.link_id} is not wired")
+            if event.action not in ACTIONS:
+                raise ValueError(f"Unknown action {event.action!r}")
+            if event.action == "impair":
+                Impairment(**{**Impairment.from_link(link).as_dict(), **event.impairment}).validate()
+
+        used = {event.link_id: links[event.link_id] for event in events}
+        container_ids = {
+            cid for link in used.values()
+            for cid in (link.source_node.container_id, link.target_node.container_id)
+        }
+        pids = await self.runtime._run(self.runtime.network.get_pids, container_ids)
+
+        targets = {}
+        for link in used.values():
+            baseline = Impairment.from_link(link)
+            targets[str(link.id)] = LinkTarget(
+                link_id=str(link.id),
+                name=(
+                    f"{link.source_node.name}:{link.source_interface} <-> "
+                    f"{link.target_node.name}:{link.target_interface}"
+                ),
+                ends=[
+                    (link.source_node.container_id, link.source_interface, pids[link.source_node.container_id]),
+                    (link.target_node.container_id, link.target_interface, pids[link.target_node.container_id])
+                ],
+                baseline=baseline,
+                current=baseline
+            )
+
+        session = LabSession(lab_id=lab.id, action="chaos", details={"name": name, "status": "pending"})
+        db.add(session)
+        await db.commit()
+
+        timeline = ChaosTimeline(
+            self.runtime, lab_id, str(session.id), events, targets, name=name, restore=restore
+        )
+        self.timelines[lab_id] = timeline
+        timeline.start()
+        logger.info(f"Started chaos timeline for lab {lab.name}: {len(events)} events")
+        return timeline
+
+    async def cancel(self, lab_id: str) -> Optional[ChaosTimeline]:
+        timeline = self.active(lab_id)
+        if timeline:
+            await timeline.cancel()
+        return timeline
+
+    async def stop(self) -> None:
+        """Cancel every running timeline (restoring their links)"""
+        await asyncio.gather(*(t.cancel() for t in self.timelines.values()))
@@ -0,0 +1,424 @@
+"""
+Deploy Engine for NEON
+Deploys lab nodes and links concurrently with a bounded parallelism limit
+"""
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.db.models import Lab, Node, Link, Image
+from app.runtime.capacity import CapacityError, node_resources
+from app.runtime.lab_events import publish_bulk_update
+from app.runtime.manager import RuntimeManager
+from app.runtime.network import Impairment, impairment
+from app.runtime.reconcile import list_lab_containers, observe_lab, plan_reconcile
+from app.runtime.sessions import committing, run_in_session
+
+logger = logging.getLogger(__name__)
+
+
+class DeployEngine:
+    """
+    Deploys the nodes of a lab in parallel.
+
+    Every node is deployed in its own task, gated by a semaphore so that at
+    most `concurrency` containers are being created/started at once.  A
+    failing node is recorded in the per-node results and marked as "error"
+    without affecting its siblings.
+
+    `progress`, when given, is called as progress(done, total) every time a
+    node, link or container finishes (see app.runtime.jobs).
+
+    All tasks share the job's sync session; its queries and commits run in
+    worker threads through app.runtime.sessions, never on the event loop.
+    The lab must come with its nodes and links loaded (see JobQueue._load_lab).
+    """
+
+    def __init__(
+        self,
+        runtime: RuntimeManager,
+        concurrency: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        self.runtime = runtime
+        self.concurrency = max(1, concurrency or settings.DEPLOY_CONCURRENCY)
+        self.progress = progress
+        self._done = 0
+        self._total = 0
+
+    def _expect(self, steps: int) -> None:
+        self._total += steps
+        self._report()
+
+    def _advance(self, steps: int = 1) -> None:
+        self._done += steps
+        self._report()
+
+    def _report(self) -> None:
+        if self.progress:
+            self.progress(self._done, max(self._total, self._done))
+
+    async def deploy_nodes(
+        self,
+        nodes: List[Node],
+        images: Dict,
+        db: Session
+    ) -> List[Dict]:
+        """
+        Deploy nodes concurrently
+
+        Args:
+            nodes: Nodes to deploy
+            images: Image models keyed by image ID
+            db: Database session
+
+        Returns:
+            Per-node results, in the same order as `nodes`
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _deploy(node: Node) -> Dict:
+            result = {
+                "node": node.name,
+                "node_id": str(node.id),
+                "container_id": None,
+                "status": "error"
+            }
+
+            image = images.get(node.image_id)
+            if not image:
+                async with committing(db):
+                    node.status = "error"
+                result["error"] = f"Image not found for node {node.name}"
+                return result
+
+            try:
+                # Admitted before taking a deploy slot, so a node waiting for
+                # headroom does not hold up nodes that fit
+                async with self.runtime.capacity.admit(node.name, *node_resources(node, image)):
+                    async with semaphore:
+                        deployed = await self.runtime.deploy_node(node, image, db)
+            except CapacityError as e:
+                async with committing(db):
+                    node.status = "error"
+                result["error"] = str(e)
+                return result
+            except Exception as e:
+                result["error"] = str(e)
+                return result
+
+            result["container_id"] = deployed["container_id"]
+            result["status"] = deployed["status"]
+            return result
+
+        async def _tracked(node: Node) -> Dict:
+            result = await _deploy(node)
+            self._advance()
+            return result
+
+        return list(await asyncio.gather(*(_tracked(node) for node in nodes)))
+
+    async def create_links(self, links: List[Link], db: Session) -> List[Dict]:
+        """
+        Wire links, skipping links with an undeployed endpoint
+
+        With the subprocess link backend and BATCH_LINK_WIRING enabled the
+        whole set is wired through batch scripts; otherwise (and when nodes
+        are spread over several hosts) links are wired concurrently one by one.
+
+        Returns:
+            Per-link results, in the same order as `links`
+        """
+        if settings.BATCH_LINK_WIRING and not self.runtime.network.netlink and not self.runtime.hosts.sharded:
+            ready = [
+                link for link in links
+                if link.source_node.container_id and link.target_node.container_id
+            ]
+            try:
+                batch_results = await self.runtime.create_links_batch(ready, db)
+            except Exception as e:
+                logger.error(f"Batch wiring failed: {e}")
+                batch_results = [
+                    {"link_id": str(link.id), "status": "error", "error": str(e)}
+                    for link in ready
+                ]
+            by_id = {r["link_id"]: r for r in batch_results}
+            self._advance(len(links))
+            return [
+                by_id.get(str(link.id)) or {
+                    "link_id": str(link.id),
+                    "status": "skipped",
+                    "error": "Both nodes must be deployed before creating links"
+                }
+                for link in links
+            ]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _create(link: Link) -> Dict:
+            if not link.source_node.container_id or not link.target_node.container_id:
+                return {
+                    "link_id": str(link.id),
+                    "status": "skipped",
+                    "error": "Both nodes must be deployed before creating links"
+                }
+
+            async with semaphore:
+                try:
+                    created = await self.runtime.create_link(link, db)
+                except Exception as e:
+                    return {"link_id": str(link.id), "status": "error", "error": str(e)}
+
+            return {"link_id": str(link.id), "status": created["status"]}
+
+        async def _tracked(link: Link) -> Dict:
+            result = await _create(link)
+            self._advance()
+            return result
+
+        return list(await asyncio.gather(*(_tracked(link) for link in links)))
+
+    @staticmethod
+    def _images(nodes: List[Node], db: Session) -> Dict:
+        """Resolve the images of many nodes in one query instead of one per node"""
+        image_ids = {node.image_id for node in nodes}
+        if not image_ids:
+            return {}
+        return {image.id: image for image in db.query(Image).filter(Image.id.in_(image_ids)).all()}
+
+    async def deploy_lab(self, lab: Lab, db: Session, create_links: bool = True) -> Dict:
+        """
+        Deploy every undeployed node of a lab, then wire its links
+
+        The lab only ends up in "error" when no node could be deployed at all;
+        partial failures leave it "running" and are reported per node.
+
+        Returns:
+            Deployment summary with per-node and per-link results
+
+        Raises:
+            CapacityError: the lab's nodes can never fit on the host (or, with
+                CAPACITY_ADMISSION "refuse", do not fit now); nothing is deployed
+        """
+        pending_nodes = [node for node in lab.nodes if not node.container_id]
+        images = await run_in_session(db, self._images, pending_nodes, db)
+        demand = [node_resources(node, images[node.image_id]) for node in pending_nodes if node.image_id in images]
+        await self.runtime.capacity.check(sum(cpu for cpu, _ in demand), sum(memory for _, memory in demand))
+
+        if self.runtime.hosts.sharded:
+            await self.runtime.hosts.assign(list(lab.nodes), list(lab.links), images)
+        async with committing(db):
+            lab.status = "deploying"
+
+        pending_links = [link for link in lab.links if link.status != "up"] if create_links else []
+        self._expect(len(pending_nodes) + len(pending_links))
+
+        node_results = await self.deploy_nodes(pending_nodes, images, db)
+
+        link_results = []
+        if create_links:
+            link_results = await self.create_links(pending_links, db)
+
+        failed_nodes = [r for r in node_results if r["status"] == "error"]
+        async with committing(db):
+            if pending_nodes and len(failed_nodes) == len(pending_nodes):
+                lab.status = "error"
+            else:
+                lab.status = "running"
+                lab.deployed_at = datetime.utcnow()
+
+        logger.info(
+            f"Deployed lab {lab.name}: {len(node_results) - len(failed_nodes)}/"
+            f"{len(node_results)} nodes, {len(link_results)} links"
+        )
+
+        return {
+            "status": lab.status,
+            "nodes": node_results,
+            "links": link_results,
+            "failed_nodes": [r["node"] for r in failed_nodes]
+        }
+
+    async def reconcile_lab(self, lab: Lab, db: Session) -> Dict:
+        """
+        Bring a running lab in line with its DB topology (see app.runtime.reconcile)
+
+        Only the difference is applied: orphan containers and stale veths are
+        removed, missing or outdated nodes are (re)deployed, stopped ones are
+        started, missing or miswired links are created and links whose
+        qdiscs drifted from the DB are re-impaired.  Everything that already
+        matches is left running untouched.
+
+        Returns:
+            Summary with the planned actions and per-node and per-link results
+        """
+        run, docker, network = self.runtime._run, self.runtime.docker, self.runtime.network
+
+        observed = await observe_lab(self.runtime, str(lab.id))
+        plan = plan_reconcile(list(lab.nodes), list(lab.links), observed)
+        if plan.empty:
+            logger.info(f"Lab {lab.name} already matches its topology")
+            return {"status": lab.status, "actions": plan.summary(), "nodes": [], "links": [], "failed_nodes": []}
+
+        async with committing(db):
+            lab.status = "deploying"
+        self._expect(sum(plan.summary().values()))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _bounded(fn, *args, **kwargs) -> bool:
+            async with semaphore:
+                try:
+                    result = await run(fn, *args, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Reconcile step {fn.__name__} failed: {e}")
+                    return False
+                return result is not False
+
+        # Stale state first, so recreated containers and links reuse names
+        await asyncio.gather(
+            *(_bounded(docker.remove_container, cid) for cid in plan.remove_containers),
+            *(_bounded(docker.remove_container, node.container_id) for node in plan.recreate_nodes),
+            *(_bounded(network.delete_interface, cid, iface) for cid, iface in plan.delete_interfaces)
+        )
+        # Recreated nodes are counted again when deployed below
+        self._advance(len(plan.remove_containers) + len(plan.delete_interfaces))
+
+        started = await asyncio.gather(
+            *(_bounded(docker.start_container, node.container_id) for node in plan.start_nodes)
+        )
+        self._advance(len(plan.start_nodes))
+        node_results = []
+        async with committing(db):
+            for node in plan.recreate_nodes:
+                node.container_id = None
+                node.mgmt_ip = None
+            for node, ok in zip(plan.start_nodes, started):
+                node.status = "running" if ok else "error"
+                node_results.append({
+                    "node": node.name,
+                    "node_id": str(node.id),
+                    "container_id": node.container_id,
+                    "status": node.status
+                })
+
+        to_deploy = plan.recreate_nodes + plan.deploy_nodes
+        images = await run_in_session(db, self._images, to_deploy, db)
+        if self.runtime.hosts.sharded:
+            await self.runtime.hosts.assign(list(lab.nodes), list(lab.links), images)
+        node_results += await self.deploy_nodes(to_deploy, images, db)
+
+        async with committing(db):
+            for link in plan.create_links:
+                link.status = "down"
+        link_results = await self.create_links(plan.create_links, db)
+
+        async def _reimpair(link: Link) -> Dict:
+            ends = await asyncio.gather(*(
+                _bounded(
+                    network.set_impairment, node.container_id, iface,
+                    previous=observed[node.container_id].impairments.get(iface, impairment()),
+                    **Impairment.from_link(link).as_dict()
+                )
+                for node, iface in (
+                    (link.source_node, link.source_interface),
+                    (link.target_node, link.target_interface)
+                )
+            ))
+            self._advance()
+            return {"link_id": str(link.id), "status": "reimpaired" if all(ends) else "error"}
+
+        link_results += await asyncio.gather(*(_reimpair(link) for link in plan.reimpair_links))
+
+        failed_nodes = [r for r in node_results if r["status"] == "error"]
+        async with committing(db):
+            lab.status = "running" if any(node.container_id for node in lab.nodes) else "error"
+            lab.deployed_at = datetime.utcnow()
+
+        logger.info(f"Reconciled lab {lab.name}: {plan.summary()}")
+
+        return {
+            "status": lab.status,
+            "actions": plan.summary(),
+            "nodes": node_results,
+            "links": link_results,
+            "failed_nodes": [r["node"] for r in failed_nodes]
+        }
+
+    async def destroy_lab(self, lab: Lab, db: Session) -> Dict:
+        """
+        Tear down every container of a lab concurrently
+
+        The lab's containers are listed once (by label and name prefix, so
+        orphans and claimed warm containers are included) and removed with
+        at most `concurrency` removals in flight; a container that is already
+        gone counts as removed.  Node and Link rows are reset with one UPDATE
+        each and committed once, and their deltas are published after the
+        commit.  Nodes whose container could not be removed keep their
+        container ID and leave the lab in "error".
+
+        Returns:
+            Summary with removed/failed containers and the teardown time
+        """
+        started = time.perf_counter()
+        run, docker = self.runtime._run, self.runtime.docker
+
+        # A running timeline would try to restore links on removed containers
+        await self.runtime.chaos.cancel(str(lab.id))
+
+        containers = await list_lab_containers(self.runtime, str(lab.id))
+        self._expect(len(containers))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _remove(container: Dict) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    await run(docker.remove_container, container["id"])
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 404:
+                        return {"container_id": container["id"], "name": container["name"], "error": str(e)}
+                finally:
+                    self._advance()
+            return None
+
+        results = await asyncio.gather(*(_remove(c) for c in containers.values()))
+        failed = [r for r in results if r]
+        failed_ids = [r["container_id"] for r in failed]
+
+        node_filter = [Node.lab_id == lab.id]
+        if failed_ids:
+            # NOT IN is never true for NULL, so nodes without a container need their own term
+            node_filter.append(or_(Node.container_id.is_(None), Node.container_id.notin_(failed_ids)))
+        node_values = {"container_id": None, "status": "stopped", "mgmt_ip": None}
+        link_values = {"status": "down"}
+
+        def _reset(model, values, *criteria) -> List:
+            return db.execute(
+                update(model).where(*criteria).values(**values)
+                .returning(model.id, model.lab_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+
+        reset_nodes = await run_in_session(db, _reset, Node, node_values, *node_filter)
+        reset_links = await run_in_session(db, _reset, Link, link_values, Link.lab_id == lab.id)
+        async with committing(db):
+            lab.status = "error" if failed else "stopped"
+        publish_bulk_update(Node, reset_nodes, node_values)
+        publish_bulk_update(Link, reset_links, link_values)
+
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            f"Destroyed lab {lab.name}: {len(containers) - len(failed)}/{len(containers)} "
+            f"containers removed in {duration_ms} ms"
+        )
+
+        return {
+            "status": lab.status,
+            "removed": len(containers) - len(failed),
+            "failed": failed,
+            "duration_ms": duration_ms
+        }
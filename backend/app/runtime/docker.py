@@ -4,7 +4,7 @@ Handles container lifecycle for network devices
 """
 import docker
 from docker.errors import DockerException, NotFound
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import logging
 import time
 
@@ -14,17 +14,45 @@ logger = logging.getLogger(__name__)
 class DockerRuntime:
     """Manages Docker containers for network emulation"""
 
-    def __init__(self):
-        """Initialize Docker client"""
+    def __init__(self, base_url: Optional[str] = None):
+        """
+        Initialize Docker client
+
+        Args:
+            base_url: Docker engine to manage (default: the local unix socket)
+        """
         try:
             # Use unix socket directly to avoid URL scheme issues
-            self.client = docker.DockerClient(base_url='unix://var/run/docker.sock')
+            self.client = docker.DockerClient(base_url=base_url or 'unix://var/run/docker.sock')
             self.client.ping()
             logger.info("Docker client initialized successfully")
         except DockerException as e:
             logger.error(f"Failed to initialize Docker client: {e}")
             raise
 
+    def image_exists(self, image: str) -> bool:
+        """Check whether an image is present locally"""
+        try:
+            self.client.images.get(image)
+            return True
+        except NotFound:
+            return False
+
+    def pull_image(self, image: str, on_progress: Optional[Callable[[Dict], None]] = None) -> None:
+        """
+        Pull an image and wait for completion
+
+        Args:
+            image: Docker image URI
+            on_progress: Called with each JSON progress message from the Engine
+        """
+        logger.info(f"Pulling image: {image}")
+        for message in self.client.api.pull(image, stream=True, decode=True):
+            if "error" in message:
+                raise DockerException(message["error"])
+            if on_progress:
+                on_progress(message)
+
     def create_container(
         self,
         image: str,
@@ -80,10 +108,15 @@ class DockerRuntime:
                 }
             }
 
-            # Add resource limits if specified
+            # Add resource limits if specified; the labels let the capacity
+            # accountant sum them from a container listing
             if cpu or memory:
                 container_config["nano_cpus"] = int((cpu or 1) * 1e9)
                 container_config["mem_limit"] = f"{memory or 512}m"
+                container_config["labels"].update({
+                    "neon.cpu": str(cpu or 1),
+                    "neon.memory": str(memory or 512)
+                })
 
             # Create container
             container = self.client.containers.create(**container_config, **kwargs)
@@ -116,15 +149,24 @@ class DockerRuntime:
             raise
 
     def remove_container(self, container_id: str, force: bool = True) -> None:
-        """Remove a container"""
+        """Remove a container (one DELETE, without fetching the container first)"""
         try:
-            container = self.client.containers.get(container_id)
-            container.remove(force=force)
+            self.client.api.remove_container(container_id, force=force)
             logger.info(f"Removed container {container_id[:12]}")
         except DockerException as e:
             logger.error(f"Failed to remove container {container_id[:12]}: {e}")
             raise
 
+    def rename_container(self, container_id: str, name: str) -> None:
+        """Rename a container"""
+        try:
+            container = self.client.containers.get(container_id)
+            container.rename(name)
+            logger.info(f"Renamed container {container_id[:12]} to {name}")
+        except DockerException as e:
+            logger.error(f"Failed to rename container {container_id[:12]}: {e}")
+            raise
+
     def get_container_status(self, container_id: str) -> str:
         """
         Get container status
@@ -222,6 +264,11 @@ class DockerRuntime:
             logger.error(f"Failed to connect container to network: {e}")
             raise
 
+    def host_info(self) -> Dict:
+        """CPU count and total memory (MB) of the Docker host"""
+        info = self.client.info()
+        return {"cpus": info["NCPU"], "memory": info["MemTotal"] // (1024 * 1024)}
+
     def list_neon_containers(self) -> List[Dict]:
         """List all NEON-managed containers"""
         try:
@@ -243,15 +290,32 @@ class DockerRuntime:
             logger.error(f"Failed to list containers: {e}")
             return []
 
+    def list_containers(self, filters: Dict) -> List[Dict]:
+        """List containers (including stopped ones) matching Docker filters"""
+        containers = self.client.containers.list(all=True, filters=filters)
+        return [
+            {
+                "id": c.id,
+                "name": c.name,
+                "status": c.status,
+                "image": c.attrs.get("Config", {}).get("Image"),
+                "labels": c.labels
+            }
+            for c in containers
+        ]
+
     def cleanup_lab(self, lab_id: str) -> None:
         """Remove all containers for a specific lab"""
         try:
-            containers = self.client.containers.list(
-                all=True,
-                filters={"label": f"neon.lab_id={lab_id}"}
-            )
+            # Containers claimed from the warm pool carry no lab label, only
+            # the lab's name prefix
+            containers = {
+                c.id: c
+                for filters in ({"label": f"neon.lab_id={lab_id}"}, {"name": f"neon_{lab_id}_"})
+                for c in self.client.containers.list(all=True, filters=filters)
+            }
 
-            for container in containers:
+            for container in containers.values():
                 try:
                     container.remove(force=True)
                     logger.info(f"Removed container {container.name}")
@@ -0,0 +1,443 @@
+"""
+Async Docker Runtime for NEON
+Talks to the Docker Engine API over the unix socket without blocking the event loop
+"""
+import httpx
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DockerAPIError(Exception):
+    """Error response from the Docker Engine API"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class DockerNotFound(DockerAPIError):
+    """Requested container, image or network does not exist"""
+
+
+def split_image_ref(image: str) -> Tuple[str, str]:
+    """
+    Split an image reference into repository and tag
+
+    'ghcr.io/nokia/srlinux:latest' -> ('ghcr.io/nokia/srlinux', 'latest')
+    'localhost:5000/frr'           -> ('localhost:5000/frr', 'latest')
+    """
+    if "@" in image:
+        repository, digest = image.split("@", 1)
+        return repository, digest
+
+    name, _, last = image.rpartition("/")
+    if ":" in last:
+        repo_last, tag = last.rsplit(":", 1)
+        return (f"{name}/{repo_last}" if name else repo_last), tag
+    return image, "latest"
+
+
+class AsyncDockerRuntime:
+    """
+    Manages Docker containers through the Engine HTTP API.
+
+    Exposes the same surface as DockerRuntime, but every method is a
+    coroutine.  All requests share one httpx connection pool bound to the
+    Docker unix socket, so connections are kept alive across calls.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        api_version: Optional[str] = None,
+        max_connections: Optional[int] = None
+    ):
+        """Initialize the pooled HTTP client (no I/O happens until first use)"""
+        self.socket_path = socket_path or settings.DOCKER_SOCKET
+        self.api_version = api_version or settings.DOCKER_API_VERSION
+        max_connections = max_connections or settings.DOCKER_MAX_CONNECTIONS
+
+        transport = httpx.AsyncHTTPTransport(uds=self.socket_path, retries=1)
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            base_url=f"http://docker/v{self.api_version}",
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Issue a request and raise DockerAPIError on non-2xx/3xx responses"""
+        response = await self.client.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            if response.status_code == 404:
+                raise DockerNotFound(response.status_code, message)
+            raise DockerAPIError(response.status_code, message)
+        return response
+
+    async def ping(self) -> bool:
+        """Check that the Docker daemon is reachable"""
+        response = await self._request("GET", "/_ping")
+        return response.text == "OK"
+
+    async def host_info(self) -> Dict:
+        """CPU count and total memory (MB) of the Docker host"""
+        info = (await self._request("GET", "/info")).json()
+        return {"cpus": info["NCPU"], "memory": info["MemTotal"] // (1024 * 1024)}
+
+    async def image_exists(self, image: str) -> bool:
+        """Check whether an image is present locally"""
+        try:
+            await self._request("GET", f"/images/{image}/json")
+            return True
+        except DockerNotFound:
+            return False
+
+    async def pull_image_stream(self, image: str) -> AsyncIterator[Dict]:
+        """
+        Pull an image, yielding the Engine's JSON progress messages
+
+        Raises:
+            DockerAPIError: if the pull fails
+        """
+        repository, tag = split_image_ref(image)
+        params = {"fromImage": repository, "tag": tag}
+
+        async with self.client.stream(
+            "POST", "/images/create", params=params, timeout=None
+        ) as response:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise DockerAPIError(response.status_code, body.decode(errors="replace"))
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise DockerAPIError(500, message["error"])
+                yield message
+
+    async def pull_image(self, image: str, on_progress: Optional[Callable[[Dict], None]] = None) -> None:
+        """Pull an image and wait for completion, reporting progress messages to `on_progress`"""
+        logger.info(f"Pulling image: {image}")
+        async for message in self.pull_image_stream(image):
+            if on_progress:
+                on_progress(message)
+
+    async def create_container(
+        self,
+        image: str,
+        name: str,
+        cpu: Optional[int] = None,
+        memory: Optional[int] = None,
+        environment: Optional[Dict[str, str]] = None,
+        network_mode: str = "bridge",
+        privileged: bool = True,
+        **kwargs
+    ) -> str:
+        """
+        Create a Docker container for a network device
+
+        Args:
+            image: Docker image URI (e.g., 'ghcr.io/nokia/srlinux:latest')
+            name: Container name
+            cpu: CPU count (optional, uses image default if not specified)
+            memory: Memory in MB (optional, uses image default if not specified)
+            environment: Environment variables
+            network_mode: Docker network mode
+            privileged: Run in privileged mode (required for network devices)
+            **kwargs: Extra labels (`labels`) or raw Engine API container fields
+
+        Returns:
+            Container ID
+        """
+        try:
+            if not await self.image_exists(image):
+                await self.pull_image(image)
+            else:
+                logger.info(f"Using existing image: {image}")
+
+            extra_labels = kwargs.pop("labels", {})
+
+            host_config = {
+                "NetworkMode": network_mode,
+                "Privileged": privileged
+            }
+            if cpu or memory:
+                host_config["NanoCpus"] = int((cpu or 1) * 1e9)
+                host_config["Memory"] = (memory or 512) * 1024 * 1024
+                # Summed from container listings by the capacity accountant
+                extra_labels = {"neon.cpu": str(cpu or 1), "neon.memory": str(memory or 512), **extra_labels}
+
+            body = {
+                "Image": image,
+                "Env": [f"{k}={v}" for k, v in (environment or {}).items()],
+                "Labels": {
+                    "neon.managed": "true",
+                    "neon.type": "network-device",
+                    **extra_labels,
+                },
+                "HostConfig": host_config,
+                **kwargs
+            }
+
+            response = await self._request(
+                "POST", "/containers/create", params={"name": name}, json=body
+            )
+            container_id = response.json()["Id"]
+            logger.info(f"Created container {name} ({container_id[:12]})")
+            return container_id
+
+        except DockerAPIError as e:
+            logger.error(f"Failed to create container {name}: {e}")
+            raise
+
+    async def start_container(self, container_id: str) -> None:
+        """Start a container"""
+        try:
+            await self._request("POST", f"/containers/{container_id}/start")
+            logger.info(f"Started container {container_id[:12]}")
+        except DockerAPIError as e:
+            logger.error(f"Failed to start container {container_id[:12]}: {e}")
+            raise
+
+    async def stop_container(self, container_id: str, timeout: int = 10) -> None:
+        """Stop a container"""
+        try:
+            await self._request(
+                "POST", f"/containers/{container_id}/stop",
+                params={"t": timeout}, timeout=timeout + 30
+            )
+            logger.info(f"Stopped container {container_id[:12]}")
+        except DockerAPIError as e:
+            logger.error(f"Failed to stop container {container_id[:12]}: {e}")
+            raise
+
+    async def remove_container(self, container_id: str, force: bool = True) -> None:
+        """Remove a container"""
+        try:
+            await self._request(
+                "DELETE", f"/containers/{container_id}",
+                params={"force": str(force).lower()}
+            )
+            logger.info(f"Removed container {container_id[:12]}")
+        except DockerAPIError as e:
+            logger.error(f"Failed to remove container {container_id[:12]}: {e}")
+            raise
+
+    async def rename_container(self, container_id: str, name: str) -> None:
+        """Rename a container"""
+        try:
+            await self._request("POST", f"/containers/{container_id}/rename", params={"name": name})
+            logger.info(f"Renamed container {container_id[:12]} to {name}")
+        except DockerAPIError as e:
+            logger.error(f"Failed to rename container {container_id[:12]}: {e}")
+            raise
+
+    async def inspect_container(self, container_id: str) -> Dict:
+        """Return the raw container inspect document"""
+        response = await self._request("GET", f"/containers/{container_id}/json")
+        return response.json()
+
+    async def get_container_status(self, container_id: str) -> str:
+        """
+        Get container status
+
+        Returns:
+            Status string: 'running', 'exited', 'created', 'restarting', 'paused'
+        """
+        try:
+            attrs = await self.inspect_container(container_id)
+            return attrs["State"]["Status"]
+        except DockerNotFound:
+            return "not_found"
+        except DockerAPIError as e:
+            logger.error(f"Failed to get status for {container_id[:12]}: {e}")
+            raise
+
+    async def get_container_ip(self, container_id: str, network: str = "bridge") -> Optional[str]:
+        """Get container IP address"""
+        try:
+            attrs = await self.inspect_container(container_id)
+
+            networks = attrs.get("NetworkSettings", {}).get("Networks", {})
+            if network in networks:
+                return networks[network].get("IPAddress")
+
+            # Fallback to first available network
+            for net_name, net_info in networks.items():
+                if ip := net_info.get("IPAddress"):
+                    return ip
+
+            return None
+
+        except DockerAPIError as e:
+            logger.error(f"Failed to get IP for {container_id[:12]}: {e}")
+            return None
+
+    async def wait_for_ready(
+        self,
+        container_id: str,
+        timeout: int = 300,
+        check_interval: int = 5
+    ) -> bool:
+        """
+        Wait for container to be ready
+
+        Args:
+            container_id: Container ID
+            timeout: Maximum wait time in seconds
+            check_interval: Time between checks in seconds
+
+        Returns:
+            True if container is ready, False if timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while loop.time() < deadline:
+            status = await self.get_container_status(container_id)
+
+            if status == "running":
+                return True
+
+            if status in ["exited", "not_found"]:
+                logger.error(f"Container {container_id[:12]} failed to start")
+                return False
+
+            await asyncio.sleep(check_interval)
+
+        logger.warning(f"Container {container_id[:12]} did not become ready within {timeout}s")
+        return False
+
+    async def create_network(self, name: str, driver: str = "bridge") -> str:
+        """Create a Docker network for lab isolation"""
+        try:
+            response = await self._request("POST", "/networks/create", json={
+                "Name": name,
+                "Driver": driver,
+                "Labels": {"neon.managed": "true"}
+            })
+            network_id = response.json()["Id"]
+            logger.info(f"Created network {name} ({network_id[:12]})")
+            return network_id
+        except DockerAPIError as e:
+            logger.error(f"Failed to create network {name}: {e}")
+            raise
+
+    async def connect_to_network(self, container_id: str, network_id: str) -> None:
+        """Connect container to a network"""
+        try:
+            await self._request(
+                "POST", f"/networks/{network_id}/connect",
+                json={"Container": container_id}
+            )
+            logger.info(f"Connected {container_id[:12]} to network {network_id[:12]}")
+        except DockerAPIError as e:
+            logger.error(f"Failed to connect container to network: {e}")
+            raise
+
+    async def _list_containers(self, filters: Dict[str, List[str]]) -> List[Dict]:
+        """List containers (including stopped ones) matching Engine API filters"""
+        response = await self._request(
+            "GET", "/containers/json",
+            params={"all": "true", "filters": json.dumps(filters)}
+        )
+        return response.json()
+
+    async def list_containers(self, filters: Dict[str, List[str]]) -> List[Dict]:
+        """List containers matching Engine API filters, in DockerRuntime's format"""
+        return [
+            {
+                "id": c["Id"],
+                "name": c["Names"][0].lstrip("/") if c.get("Names") else c["Id"][:12],
+                "status": c["State"],
+                "image": c["Image"],
+                "labels": c.get("Labels") or {}
+            }
+            for c in await self._list_containers(filters)
+        ]
+
+    async def events(
+        self,
+        filters: Dict[str, List[str]],
+        since: Optional[float] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream Docker events matching Engine API filters
+
+        Args:
+            filters: Engine API event filters (e.g. {"label": ["neon.managed=true"]})
+            since: Replay events from this UNIX timestamp (used on reconnect)
+        """
+        params = {"filters": json.dumps(filters)}
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+
+        async with self.client.stream("GET", "/events", params=params, timeout=None) as response:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise DockerAPIError(response.status_code, body.decode(errors="replace"))
+
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    async def list_neon_containers(self) -> List[Dict]:
+        """List all NEON-managed containers"""
+        try:
+            containers = await self._list_containers({"label": ["neon.managed=true"]})
+            return [
+                {
+                    "id": c["Id"],
+                    "name": c["Names"][0].lstrip("/") if c.get("Names") else c["Id"][:12],
+                    "status": c["State"],
+                    "image": c["Image"]
+                }
+                for c in containers
+            ]
+        except (DockerAPIError, httpx.HTTPError) as e:
+            logger.error(f"Failed to list containers: {e}")
+            return []
+
+    async def cleanup_lab(self, lab_id: str) -> None:
+        """Remove all containers for a specific lab"""
+        try:
+            # Containers claimed from the warm pool carry no lab label, only
+            # the lab's name prefix
+            by_label, by_name = await asyncio.gather(
+                self._list_containers({"label": [f"neon.lab_id={lab_id}"]}),
+                self._list_containers({"name": [f"neon_{lab_id}_"]})
+            )
+        except (DockerAPIError, httpx.HTTPError) as e:
+            logger.error(f"Failed to cleanup lab {lab_id}: {e}")
+            return
+
+        containers = {c["Id"]: c for c in by_label + by_name}
+
+        async def _remove(container: Dict) -> None:
+            try:
+                await self.remove_container(container["Id"])
+            except DockerAPIError:
+                pass
+
+        await asyncio.gather(*(_remove(c) for c in containers.values()))
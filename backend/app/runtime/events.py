@@ -0,0 +1,199 @@
+"""
+Node Event Watcher for NEON
+Tracks node readiness from the Docker events stream instead of polling
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from app.db.base import SessionLocal
+from app.db.models import Node
+from app.runtime.docker_async import AsyncDockerRuntime, DockerAPIError
+
+logger = logging.getLogger(__name__)
+
+EVENT_FILTERS = {
+    "type": ["container"],
+    "label": ["neon.managed=true"],
+    "event": ["start", "die", "stop", "health_status"],
+}
+
+
+class NodeEventWatcher:
+    """
+    Single background subscriber to Docker events for NEON containers.
+
+    Node.status and Node.mgmt_ip are updated as start/die/stop/health events
+    arrive, and coroutines can await readiness of a container without a
+    polling loop.  After a dropped stream the watcher reconnects and replays
+    missed events with the Engine's `since` parameter.
+    """
+
+    def __init__(self, docker: Optional[AsyncDockerRuntime] = None):
+        self.docker = docker or AsyncDockerRuntime()
+        self._task: Optional[asyncio.Task] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._last_event_time: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background event loop"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Node event watcher started")
+
+    async def stop(self) -> None:
+        """Stop the background event loop and release waiters"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for futures in self._waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+        self._waiters.clear()
+        await self.docker.close()
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                async for event in self.docker.events(EVENT_FILTERS, since=self._last_event_time):
+                    backoff = 1
+                    if "timeNano" in event:
+                        self._last_event_time = event["timeNano"] / 1e9
+                    try:
+                        await self.handle_event(event)
+                    except Exception as e:
+                        logger.error(f"Failed to handle Docker event {event.get('Action')}: {e}")
+                # Stream ended cleanly (daemon restart); resubscribe
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Docker event stream lost ({e}); reconnecting in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def handle_event(self, event: Dict) -> None:
+        """Translate one Docker event into a node status update"""
+        action = event.get("Action", "")
+        actor = event.get("Actor", {})
+        container_id = actor.get("ID") or event.get("id")
+        attributes = actor.get("Attributes", {})
+        node_id = attributes.get("neon.node_id")
+
+        status: Optional[str] = None
+        mgmt_ip: Optional[str] = None
+        ready: Optional[bool] = None
+
+        if action == "start":
+            try:
+                attrs = await self.docker.inspect_container(container_id)
+            except DockerAPIError:
+                return
+            mgmt_ip = await self.docker.get_container_ip(container_id)
+            if attrs.get("State", {}).get("Health"):
+                # Image has a healthcheck: wait for health_status: healthy
+                status = "starting"
+            else:
+                status, ready = "running", True
+
+        elif action.startswith("health_status"):
+            health = action.split(":", 1)[-1].strip()
+            if health == "healthy":
+                status, ready = "running", True
+            elif health == "unhealthy":
+                status, ready = "error", False
+
+        elif action == "die":
+            exit_code = attributes.get("exitCode", "0")
+            status = "stopped" if exit_code == "0" else "error"
+            ready = False
+
+        elif action == "stop":
+            status, ready = "stopped", False
+
+        if ready is not None:
+            self._resolve(container_id, ready)
+
+        if status:
+            await asyncio.to_thread(self._update_node, node_id, container_id, status, mgmt_ip)
+
+    @staticmethod
+    def _update_node(node_id: Optional[str], container_id: str, status: str, mgmt_ip: Optional[str]) -> None:
+        """Persist a status change, ignoring events from a node's previous container"""
+        db = SessionLocal()
+        try:
+            if node_id:
+                node = db.query(Node).filter(Node.id == node_id).first()
+            else:
+                # Warm-pool containers have no node label once claimed
+                node = db.query(Node).filter(Node.container_id == container_id).first()
+            if not node or node.container_id != container_id:
+                return
+            # A deliberate stop/destroy wins over the die event it triggers
+            if node.status == "stopped" and status == "error":
+                return
+            node.status = status
+            if mgmt_ip:
+                node.mgmt_ip = mgmt_ip
+            elif status != "running":
+                node.mgmt_ip = None
+            db.commit()
+            logger.info(f"Node {node.name} is {status}" + (f" (IP: {mgmt_ip})" if mgmt_ip else ""))
+        finally:
+            db.close()
+
+    def _resolve(self, container_id: str, ready: bool) -> None:
+        for future in self._waiters.pop(container_id, []):
+            if not future.done():
+                future.set_result(ready)
+
+    async def wait_for_ready(self, container_id: str, timeout: float = 300) -> bool:
+        """
+        Wait until a container is running (and healthy, if it has a healthcheck)
+
+        Returns:
+            True if ready, False if it died or the timeout expired
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(container_id, []).append(future)
+
+        # The container may already be up: check once after registering
+        try:
+            attrs = await self.docker.inspect_container(container_id)
+            state = attrs.get("State", {})
+            health = state.get("Health", {}).get("Status")
+            if state.get("Status") == "running" and health in (None, "healthy"):
+                self._resolve(container_id, True)
+            elif state.get("Status") in ("exited", "dead"):
+                self._resolve(container_id, False)
+        except DockerAPIError:
+            self._resolve(container_id, False)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            waiters = self._waiters.get(container_id, [])
+            if future in waiters:
+                waiters.remove(future)
+            return False
+
+
+# Singleton instance (lazy initialization)
+_event_watcher = None
+
+
+def get_event_watcher() -> NodeEventWatcher:
+    """Return the process-wide node event watcher"""
+    global _event_watcher
+    if _event_watcher is None:
+        _event_watcher = NodeEventWatcher()
+    return _event_watcher
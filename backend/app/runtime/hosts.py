@@ -0,0 +1,396 @@
+"""
+Docker Hosts for NEON
+Spreads lab nodes across several Docker engines and routes runtime calls to the owning host
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import asyncio
+import inspect
+import logging
+import subprocess
+import threading
+
+import docker
+from docker.errors import NotFound
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Image, Link, Node
+from app.runtime.capacity import DEFAULT_CPU, DEFAULT_MEMORY, Resources, committed_resources, node_resources
+from app.runtime.docker import DockerRuntime
+from app.runtime.network import NetworkManager
+from app.runtime.placement import cut_size, place
+
+logger = logging.getLogger(__name__)
+
+# Container running ip/tc/nsenter on remote hosts (see HostShell)
+HELPER_NAME = "neon_host_helper"
+
+
+class HostShell:
+    """
+    Runs ip/tc/nsenter commands on a remote Docker host
+
+    Commands are executed in a privileged helper container that shares the
+    host's PID and network namespaces, so `nsenter -t <pid>` with the PIDs
+    Docker reports reaches the lab containers there.  Mirrors the subset of
+    subprocess.run used by NetworkManager.
+    """
+
+    def __init__(self, client: docker.DockerClient):
+        self.client = client
+        self._helper = None
+        self._lock = threading.Lock()
+
+    def _container(self):
+        with self._lock:
+            if self._helper is None:
+                try:
+                    helper = self.client.containers.get(HELPER_NAME)
+                    if helper.status != "running":
+                        helper.start()
+                except NotFound:
+                    helper = self.client.containers.run(
+                        settings.HOST_HELPER_IMAGE,
+                        ["sleep", "infinity"],
+                        name=HELPER_NAME,
+                        detach=True,
+                        privileged=True,
+                        pid_mode="host",
+                        network_mode="host",
+                        restart_policy={"Name": "unless-stopped"}
+                    )
+                    logger.info(f"Started host helper {helper.id[:12]}")
+                self._helper = helper
+            return self._helper
+
+    def run(
+        self,
+        args: List[str],
+        check: bool = False,
+        capture_output: bool = False,
+        text: bool = False,
+        input: Optional[str] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        subprocess.run on the remote host
+
+        Raises:
+            subprocess.CalledProcessError: `check` is set and the command failed
+        """
+        command, environment = list(args), None
+        if input is not None:
+            # exec has no stdin without attaching a socket: pass it through the environment
+            command = ["sh", "-c", 'printf "%s" "$NEON_STDIN" | "$@"', "sh"] + command
+            environment = {"NEON_STDIN": input}
+
+        exit_code, (stdout, stderr) = self._container().exec_run(command, demux=True, environment=environment)
+        stdout, stderr = stdout or b"", stderr or b""
+        if text:
+            stdout, stderr = stdout.decode(), stderr.decode()
+
+        if check and exit_code != 0:
+            raise subprocess.CalledProcessError(exit_code, args, stdout, stderr)
+        return subprocess.CompletedProcess(args, exit_code, stdout, stderr)
+
+
+@dataclass
+class DockerHost:
+    """A Docker engine lab nodes can be placed on"""
+    name: str
+    docker: Any  # DockerRuntime or AsyncDockerRuntime
+    network: NetworkManager
+    vtep: Optional[str] = None  # underlay address VXLAN tunnels terminate on
+    # Hosts with the same kernel share namespaces (the local host and its
+    # stand-ins); their tunnels are built inside the container namespaces
+    kernel: str = "local"
+
+
+class HostRegistry:
+    """
+    The Docker engines of this deployment.
+
+    The local engine is always registered; DOCKER_HOSTS adds more, each
+    with its own DockerRuntime and a NetworkManager that runs its commands
+    through a HostShell.  An entry with url "local" is a stand-in: it
+    shares this engine and kernel under another name, which exercises
+    placement and VXLAN stitching on a single machine.  Nodes record their
+    host in `Node.host`; container IDs are mapped to hosts from there.
+    """
+
+    def __init__(self, docker: Any, network: NetworkManager):
+        self.local = DockerHost(settings.LOCAL_HOST_NAME, docker, network, vtep=settings.LOCAL_VTEP)
+        self.hosts: Dict[str, DockerHost] = {self.local.name: self.local}
+        self._owners: Dict[str, str] = {}
+        # Engine (kernel) -> CPUs and memory, read once
+        self._engine_info: Dict[str, Resources] = {}
+
+        for entry in settings.DOCKER_HOSTS:
+            try:
+                host = self._connect(entry)
+            except Exception as e:
+                logger.error(f"Failed to register Docker host {entry.get('name')}: {e}")
+                continue
+            self.hosts[host.name] = host
+            logger.info(f"Registered Docker host {host.name} ({entry.get('url', 'local')})")
+
+    def _connect(self, entry: Dict[str, str]) -> DockerHost:
+        name, url = entry["name"], entry.get("url", "local")
+        if url == "local":
+            return DockerHost(name, self.local.docker, self.local.network, vtep=self.local.vtep)
+        runtime = DockerRuntime(base_url=url)
+        network = NetworkManager(client=runtime.client, runner=HostShell(runtime.client))
+        return DockerHost(name, runtime, network, vtep=entry.get("vtep"), kernel=url)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.hosts) > 1
+
+    def engines(self) -> List[DockerHost]:
+        """One host per distinct engine (stand-ins share the local one)"""
+        return list({host.kernel: host for host in reversed(list(self.hosts.values()))}.values())
+
+    def get(self, name: Optional[str]) -> DockerHost:
+        """
+        Host by name (None: the local host)
+
+        Raises:
+            ValueError: no such host is registered
+        """
+        if not name:
+            return self.local
+        host = self.hosts.get(name)
+        if host is None:
+            raise ValueError(f"Unknown Docker host {name!r}")
+        return host
+
+    def host_of(self, node: Node) -> DockerHost:
+        return self.get(node.host)
+
+    def bind(self, container_id: str, host: DockerHost) -> None:
+        """Record where a container runs"""
+        self._owners[container_id] = host.name
+
+    def cached_owner(self, container_id: str) -> Optional[DockerHost]:
+        name = self._owners.get(container_id)
+        return self.hosts.get(name) if name else None
+
+    def owner(self, container_id: str) -> DockerHost:
+        """Host a container runs on, from its node (blocking; containers of no node are local)"""
+        host = self.cached_owner(container_id)
+        if host is not None:
+            return host
+        db = SessionLocal()
+        try:
+            row = db.query(Node.host).filter(Node.container_id == container_id).first()
+        finally:
+            db.close()
+        host = self.hosts.get(row[0]) if row and row[0] else None
+        host = host or self.local
+        self._owners[container_id] = host.name
+        return host
+
+    async def _limits(self, engine: DockerHost) -> Resources:
+        """CPU and memory an engine may commit (host totals times the capacity ratios)"""
+        if engine.kernel not in self._engine_info:
+            info = await _call(engine.docker.host_info)
+            self._engine_info[engine.kernel] = Resources(info["cpus"], info["memory"])
+        host = self._engine_info[engine.kernel]
+        return Resources(host.cpu * settings.CAPACITY_CPU_RATIO, int(host.memory * settings.CAPACITY_MEMORY_RATIO))
+
+    async def capacities(self) -> Dict[str, Resources]:
+        """
+        Free CPU and memory per host: limits minus running NEON containers
+
+        Stand-ins split the free capacity of the engine they share.
+        """
+        free: Dict[str, Resources] = {}
+        for engine in self.engines():
+            try:
+                limits = await self._limits(engine)
+                running = await _call(
+                    engine.docker.list_containers,
+                    {"label": ["neon.managed=true"], "status": ["running"]}
+                )
+                left = limits - committed_resources(running)
+                left = Resources(max(0.0, left.cpu), max(0, left.memory))
+            except Exception as e:
+                logger.warning(f"Failed to read capacity of host {engine.name}: {e}")
+                left = Resources()
+            sharing = [host for host in self.hosts.values() if host.kernel == engine.kernel]
+            for host in sharing:
+                free[host.name] = Resources(left.cpu / len(sharing), left.memory // len(sharing))
+        return free
+
+    async def assign(self, nodes: List[Node], links: List[Link], images: Dict[Any, Image]) -> None:
+        """
+        Give every node without a host one; the caller commits
+
+        The lab's link graph is partitioned over the hosts (see
+        app.runtime.placement) with each node weighted by its CPU and memory
+        (node overrides, else the image's recommendation).  Nodes that
+        already have a host stay where they are.
+        """
+        unplaced = [node for node in nodes if node.host not in self.hosts]
+        if not unplaced:
+            return
+
+        demand = {}
+        for node in unplaced:
+            image = images.get(node.image_id)
+            demand[node.id] = (
+                node_resources(node, image) if image is not None
+                else (node.cpu or DEFAULT_CPU, node.memory or DEFAULT_MEMORY)
+            )
+        capacity = {name: (free.cpu, free.memory) for name, free in (await self.capacities()).items()}
+        edges = [(link.source_node_id, link.target_node_id) for link in links]
+        pinned = {node.id: node.host for node in nodes if node.host in self.hosts}
+
+        assignment = await asyncio.to_thread(
+            place, [node.id for node in unplaced], edges, demand, capacity, pinned, settings.PLACEMENT_IMBALANCE
+        )
+        for node in unplaced:
+            node.host = assignment[node.id]
+
+        spread = {name: sum(1 for h in assignment.values() if h == name) for name in self.hosts}
+        crossing = cut_size(edges, {**pinned, **assignment})
+        logger.info(f"Placed {len(unplaced)} nodes: {spread}, {crossing}/{len(edges)} links cross hosts")
+
+    async def close(self) -> None:
+        """Close the connections to remote hosts"""
+        for host in self.hosts.values():
+            if host.kernel == "local":
+                continue
+            if host.network.netlink:
+                host.network.netlink.close()
+            close = getattr(host.docker, "close", None)
+            if close:
+                await _call(close)
+
+
+async def _call(fn: Callable, *args, **kwargs) -> Any:
+    """Await coroutine methods, run blocking ones in a worker thread"""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+class _Routed:
+    """Base of the sharded facades: calls keyed by container ID go to its host"""
+
+    component = ""  # "docker" or "network"
+
+    def __init__(self, registry: HostRegistry):
+        self.registry = registry
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything not routed explicitly is served by the local host
+        return getattr(getattr(self.registry.local, self.component), name)
+
+    async def _host(self, container_id: str) -> DockerHost:
+        host = self.registry.cached_owner(container_id)
+        if host is None:
+            host = await asyncio.to_thread(self.registry.owner, container_id)
+        return host
+
+    async def _route(self, method: str, container_id: str, *args, **kwargs) -> Any:
+        host = await self._host(container_id)
+        return await _call(getattr(getattr(host, self.component), method), container_id, *args, **kwargs)
+
+
+class ShardedDocker(_Routed):
+    """DockerRuntime surface over every registered host; listings are merged"""
+
+    component = "docker"
+
+    async def start_container(self, container_id: str, *args, **kwargs) -> None:
+        return await self._route("start_container", container_id, *args, **kwargs)
+
+    async def stop_container(self, container_id: str, *args, **kwargs) -> None:
+        return await self._route("stop_container", container_id, *args, **kwargs)
+
+    async def remove_container(self, container_id: str, *args, **kwargs) -> None:
+        return await self._route("remove_container", container_id, *args, **kwargs)
+
+    async def rename_container(self, container_id: str, *args, **kwargs) -> None:
+        return await self._route("rename_container", container_id, *args, **kwargs)
+
+    async def get_container_status(self, container_id: str) -> str:
+        return await self._route("get_container_status", container_id)
+
+    async def get_container_ip(self, container_id: str, *args, **kwargs) -> Optional[str]:
+        return await self._route("get_container_ip", container_id, *args, **kwargs)
+
+    async def wait_for_ready(self, container_id: str, *args, **kwargs) -> bool:
+        return await self._route("wait_for_ready", container_id, *args, **kwargs)
+
+    async def _merged(self, method: str, *args) -> List[Dict]:
+        listed = await asyncio.gather(*(
+            _call(getattr(engine.docker, method), *args) for engine in self.registry.engines()
+        ))
+        merged = {}
+        for containers in listed:
+            for container in containers:
+                owner = self.registry.cached_owner(container["id"])
+                merged[container["id"]] = {**container, "host": (owner or self.registry.local).name}
+        return list(merged.values())
+
+    async def list_containers(self, filters: Dict) -> List[Dict]:
+        return await self._merged("list_containers", filters)
+
+    async def list_neon_containers(self) -> List[Dict]:
+        return await self._merged("list_neon_containers")
+
+    async def host_info(self) -> Dict:
+        """CPUs and memory summed over all engines"""
+        infos = await asyncio.gather(*(_call(engine.docker.host_info) for engine in self.registry.engines()))
+        return {"cpus": sum(i["cpus"] for i in infos), "memory": sum(i["memory"] for i in infos)}
+
+    async def cleanup_lab(self, lab_id: str) -> None:
+        await asyncio.gather(*(_call(engine.docker.cleanup_lab, lab_id) for engine in self.registry.engines()))
+
+
+class ShardedNetwork(_Routed):
+    """NetworkManager surface over every registered host"""
+
+    component = "network"
+
+    async def get_pids(self, container_ids: Iterable[str]) -> Dict[str, int]:
+        """Resolve PIDs with one batch per host"""
+        by_host: Dict[str, List[str]] = {}
+        for cid in set(container_ids):
+            by_host.setdefault((await self._host(cid)).name, []).append(cid)
+        resolved = await asyncio.gather(*(
+            _call(self.registry.hosts[name].network.get_pids, cids) for name, cids in by_host.items()
+        ))
+        return {cid: pid for pids in resolved for cid, pid in pids.items()}
+
+    async def create_veth_link(self, container_a_id: str, *args, **kwargs) -> bool:
+        return await self._route("create_veth_link", container_a_id, *args, **kwargs)
+
+    async def delete_link(self, container_a_id: str, *args, **kwargs) -> bool:
+        return await self._route("delete_link", container_a_id, *args, **kwargs)
+
+    async def create_vxlan_endpoint(self, container_id: str, *args, **kwargs) -> bool:
+        return await self._route("create_vxlan_endpoint", container_id, *args, **kwargs)
+
+    async def set_impairment(self, container_id: str, *args, **kwargs) -> bool:
+        return await self._route("set_impairment", container_id, *args, **kwargs)
+
+    async def set_link_state(self, container_id: str, *args, **kwargs) -> bool:
+        return await self._route("set_link_state", container_id, *args, **kwargs)
+
+    async def get_impairments(self, container_id: str) -> Dict:
+        return await self._route("get_impairments", container_id)
+
+    async def delete_interface(self, container_id: str, *args, **kwargs) -> bool:
+        return await self._route("delete_interface", container_id, *args, **kwargs)
+
+    async def list_interfaces(self, container_id: str) -> List[str]:
+        return await self._route("list_interfaces", container_id)
+
+    async def list_veths(self, container_id: str) -> Dict:
+        return await self._route("list_veths", container_id)
+
+    async def list_vxlans(self, container_id: str) -> List[str]:
+        return await self._route("list_vxlans", container_id)
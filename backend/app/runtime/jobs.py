@@ -0,0 +1,381 @@
+"""
+Job Queue for NEON
+Runs lab deploy, reconcile and destroy operations as durable background jobs
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Job, Lab, Link, Node
+from app.runtime.deploy import DeployEngine
+from app.runtime.lab_events import get_lab_event_bus, publish_bulk_update
+from app.runtime.manager import get_runtime
+from app.runtime.sessions import run_in_session
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("deploy", "reconcile", "destroy")
+ACTIVE = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """
+    Durable queue of lab operations, executed by an in-process worker pool.
+
+    Jobs are rows in the `jobs` table.  Workers claim the oldest queued job
+    with SELECT ... FOR UPDATE SKIP LOCKED, so several API processes can
+    share one queue; at most one job per lab runs at a time.  Progress
+    reported by the DeployEngine is kept in memory and written together with
+    a heartbeat every JOB_HEARTBEAT_INTERVAL seconds.  A running job whose
+    heartbeat is older than JOB_STALE_AFTER (its process died) is queued
+    again, as are jobs interrupted by a shutdown; deploy and destroy are
+    idempotent, so a rerun picks up where the previous attempt stopped.
+    """
+
+    def __init__(self):
+        self.started = False
+        self._stopping = False
+        self._workers: List[asyncio.Task] = []
+        self._monitor: Optional[asyncio.Task] = None
+        self._running: Dict[uuid.UUID, asyncio.Task] = {}
+        # job ID -> (done, total) steps reported by the engine
+        self._progress: Dict[uuid.UUID, Tuple[int, int]] = {}
+        self._wake = asyncio.Event()
+
+    async def start(self) -> None:
+        """Requeue jobs of dead workers and start the worker pool"""
+        self._stopping = False
+        requeued = await asyncio.to_thread(self._requeue_stale)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted job(s)")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(1, settings.JOB_WORKERS))]
+        self._monitor = asyncio.create_task(self._heartbeat())
+        self.started = True
+        logger.info(f"Job queue started with {len(self._workers)} worker(s)")
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are interrupted and queued again"""
+        self._stopping = True
+        self.started = False
+        tasks = self._workers + ([self._monitor] if self._monitor else []) + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers, self._monitor = [], None
+
+    def enqueue(self, lab: Lab, kind: str, db: Session) -> Job:
+        """
+        Queue an operation on a lab
+
+        Raises:
+            ValueError: unknown kind, or the lab already has a queued or running job
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+
+        self._check_idle(lab, db)
+
+        job = Job(lab_id=lab.id, kind=kind, status="queued", progress=0, cancel_requested=False)
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent enqueue won the race (ix_jobs_one_active_per_lab)
+            db.rollback()
+            self._check_idle(lab, db)
+            raise ValueError("Lab already has an active job")
+        self._wake.set()
+        logger.info(f"Queued {kind} job {job.id} for lab {lab.name}")
+        return job
+
+    @staticmethod
+    def _check_idle(lab: Lab, db: Session) -> None:
+        active = db.query(Job).filter(Job.lab_id == lab.id, Job.status.in_(ACTIVE)).first()
+        if active:
+            raise ValueError(f"Lab already has a {active.status} {active.kind} job ({active.id})")
+
+    def cancel(self, job: Job, db: Session) -> Job:
+        """
+        Cancel a job: queued jobs never start, running jobs are interrupted
+
+        A running job on another process notices `cancel_requested` on its
+        next heartbeat.
+        """
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = _now()
+        elif job.status == "running":
+            job.cancel_requested = True
+            task = self._running.get(job.id)
+            if task:
+                task.cancel()
+        db.commit()
+        return job
+
+    def describe(self, job: Job) -> Dict:
+        """API representation of a job, with live progress for jobs running here"""
+        progress = job.progress or 0
+        if job.status == "running" and job.id in self._progress:
+            progress = self._percent(*self._progress[job.id])
+        return {
+            "id": str(job.id),
+            "lab_id": str(job.lab_id) if job.lab_id else None,
+            "kind": job.kind,
+            "status": job.status,
+            "progress": progress,
+            "cancel_requested": bool(job.cancel_requested),
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None
+        }
+
+    @staticmethod
+    def _percent(done: int, total: int) -> int:
+        return min(99, int(done * 100 / total)) if total else 0
+
+    @staticmethod
+    def _requeue_stale() -> int:
+        db = SessionLocal()
+        try:
+            cutoff = _now() - timedelta(seconds=settings.JOB_STALE_AFTER)
+            values = {"status": "queued", "progress": 0}
+            rows = db.execute(
+                update(Job).where(
+                    Job.status == "running",
+                    Job.heartbeat_at < cutoff
+                ).values(**values)
+                .returning(Job.id, Job.lab_id, Job.kind)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            publish_bulk_update(Job, rows, values)
+            return len(rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claim() -> Optional[Tuple[uuid.UUID, uuid.UUID, str]]:
+        db = SessionLocal()
+        try:
+            running = aliased(Job)
+            job = (
+                db.query(Job)
+                .filter(
+                    Job.status == "queued",
+                    ~exists().where(running.lab_id == Job.lab_id, running.status == "running")
+                )
+                .order_by(Job.created_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = "running"
+            job.started_at = job.heartbeat_at = _now()
+            db.commit()
+            return job.id, job.lab_id, job.kind
+        finally:
+            db.close()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Failed to claim job: {e}")
+                claimed = None
+
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            job_id = claimed[0]
+            task = asyncio.create_task(self._execute(*claimed))
+            self._running[job_id] = task
+            try:
+                # Shielded: cancelling the job must not take the worker down
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if self._stopping:
+                    raise
+
+    async def _execute(self, job_id: uuid.UUID, lab_id: uuid.UUID, kind: str) -> None:
+        """
+        Run one claimed job to completion, failure or cancellation
+
+        CancelledError is handled here rather than re-raised: the outcome is
+        recorded on the job row.  The job's session is only used from worker
+        threads (see app.runtime.sessions); objects keep their loaded values
+        across commits, so reading them never queries on the event loop.
+        """
+        self._progress[job_id] = (0, 0)
+        db = SessionLocal(expire_on_commit=False)
+        settle = False
+        try:
+            lab = await run_in_session(db, self._load_lab, db, lab_id)
+            if lab is None:
+                raise ValueError("Lab not found")
+
+            engine = DeployEngine(get_runtime(), progress=lambda done, total: self._report(job_id, lab_id, done, total))
+            if kind == "deploy":
+                result = await engine.deploy_lab(lab, db)
+            elif kind == "reconcile":
+                result = await engine.reconcile_lab(lab, db)
+            else:
+                result = await engine.destroy_lab(lab, db)
+
+            outcome = {"status": "failed" if result.get("status") == "error" else "succeeded", "result": result}
+            logger.info(f"Job {job_id} ({kind}) finished: {result.get('status')}")
+
+        except asyncio.CancelledError:
+            if self._stopping:
+                outcome = {"status": "queued"}
+                logger.info(f"Job {job_id} ({kind}) interrupted by shutdown, queued again")
+            else:
+                outcome, settle = {"status": "cancelled"}, True
+                logger.info(f"Job {job_id} ({kind}) cancelled")
+
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {e}")
+            outcome, settle = {"status": "failed", "error": str(e)}, True
+
+        try:
+            # Shielded: a second cancel (shutdown) must not leave the job row unfinished
+            await asyncio.shield(asyncio.to_thread(self._conclude, db, job_id, lab_id, settle, **outcome))
+        finally:
+            self._running.pop(job_id, None)
+            self._progress.pop(job_id, None)
+
+    @staticmethod
+    def _load_lab(db: Session, lab_id: uuid.UUID) -> Optional[Lab]:
+        """The lab with the nodes (and their images) and links the engine works on, loaded up front"""
+        return (
+            db.query(Lab)
+            .options(
+                selectinload(Lab.nodes).joinedload(Node.image),
+                selectinload(Lab.links).options(selectinload(Link.source_node), selectinload(Link.target_node))
+            )
+            .filter(Lab.id == lab_id)
+            .first()
+        )
+
+    @classmethod
+    def _conclude(
+        cls,
+        job_db: Session,
+        job_id: uuid.UUID,
+        lab_id: uuid.UUID,
+        settle: bool,
+        status: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Drop what the job left uncommitted, then record its outcome in a fresh session"""
+        job_db.close()
+        db = SessionLocal()
+        try:
+            if settle:
+                cls._settle_lab(db, lab_id)
+            cls._finish(db, job_id, status, result=result, error=error)
+        finally:
+            db.close()
+
+    def _report(self, job_id: uuid.UUID, lab_id: uuid.UUID, done: int, total: int) -> None:
+        previous = self._percent(*self._progress.get(job_id, (0, 0)))
+        self._progress[job_id] = (done, total)
+        percent = self._percent(done, total)
+        if percent != previous:
+            get_lab_event_bus().publish(lab_id, {"type": "job", "id": str(job_id), "progress": percent})
+
+    @staticmethod
+    def _settle_lab(db: Session, lab_id: uuid.UUID) -> None:
+        """Take an interrupted lab out of "deploying", based on what is deployed"""
+        lab = db.query(Lab).filter(Lab.id == lab_id).first()
+        if lab:
+            lab.status = "running" if any(node.container_id for node in lab.nodes) else "stopped"
+            db.commit()
+
+    @staticmethod
+    def _finish(
+        db: Session,
+        job_id: uuid.UUID,
+        status: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> None:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job is None:
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        if status == "queued":
+            job.progress = 0
+            job.started_at = job.heartbeat_at = None
+        else:
+            job.finished_at = _now()
+            if status == "succeeded":
+                job.progress = 100
+        db.commit()
+
+    async def _heartbeat(self) -> None:
+        """Persist progress of local jobs, pick up remote cancels and requeue dead jobs"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            progress = {job_id: self._percent(*steps) for job_id, steps in self._progress.items()}
+            try:
+                cancelled = await asyncio.to_thread(self._beat, progress)
+                await asyncio.to_thread(self._requeue_stale)
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+                continue
+            for job_id in cancelled:
+                task = self._running.get(job_id)
+                if task:
+                    task.cancel()
+
+    @staticmethod
+    def _beat(progress: Dict[uuid.UUID, int]) -> List[uuid.UUID]:
+        if not progress:
+            return []
+        db = SessionLocal()
+        try:
+            jobs = db.query(Job).filter(Job.id.in_(list(progress)), Job.status == "running").all()
+            now = _now()
+            for job in jobs:
+                job.progress = progress[job.id]
+                job.heartbeat_at = now
+            db.commit()
+            return [job.id for job in jobs if job.cancel_requested]
+        finally:
+            db.close()
+
+
+# Singleton instance (lazy initialization)
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,205 @@
+"""
+Lab Events for NEON
+In-process pub/sub of lab state deltas (node, link, lab and job status) for WebSocket subscribers
+"""
+import asyncio
+import logging
+import threading
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Job, Lab, Link, Node
+
+logger = logging.getLogger(__name__)
+
+# Columns whose committed changes are pushed, per model.  Job progress is
+# not among them: the queue publishes it live (heartbeat writes lag behind)
+TRACKED = {
+    Node: ("node", ("status", "mgmt_ip", "host")),
+    Link: ("link", ("status",)),
+    Lab: ("lab", ("status",)),
+    Job: ("job", ("status",)),
+}
+
+
+class Subscription:
+    """
+    Bounded queue of deltas for one subscriber
+
+    A subscriber that falls `depth` events behind loses its backlog and gets
+    a single `{"type": "resync"}` instead, telling it to re-fetch the lab.
+    """
+
+    def __init__(self, bus: "LabEventBus", lab_id: str, depth: int):
+        self.bus = bus
+        self.lab_id = lab_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+    def put(self, delta: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(delta)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class LabEventBus:
+    """
+    Fan-out of lab deltas to any number of subscribers per lab.
+
+    Deltas come from the runtime layer: every committed change to a tracked
+    column (see TRACKED) is published once per commit by the session hooks
+    below, and the job queue publishes live progress.  Publishing is cheap
+    when nobody listens and safe from worker threads (sync sessions run
+    under asyncio.to_thread); delivery always happens on the event loop,
+    so a dashboard costs a queue, never a database query.
+    """
+
+    def __init__(self, depth: Optional[int] = None):
+        self.depth = depth or settings.LAB_EVENTS_QUEUE_DEPTH
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, lab_id: Any) -> Subscription:
+        """Start receiving deltas of a lab; call close() on the subscription when done"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, str(lab_id), self.depth)
+        with self._lock:
+            self._subscribers.setdefault(subscription.lab_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.lab_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.lab_id]
+
+    def subscriber_count(self, lab_id: Any) -> int:
+        return len(self._subscribers.get(str(lab_id), ()))
+
+    def publish(self, lab_id: Any, delta: Dict[str, Any]) -> None:
+        """Send a delta to every subscriber of a lab (from any thread)"""
+        lab_id = str(lab_id)
+        if lab_id not in self._subscribers or self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._deliver(lab_id, delta)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, lab_id, delta)
+
+    def _deliver(self, lab_id: str, delta: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(lab_id, ()))
+        for subscription in subscribers:
+            subscription.put(delta)
+
+
+# Singleton instance (lazy initialization)
+_lab_event_bus: Optional[LabEventBus] = None
+
+
+def get_lab_event_bus() -> LabEventBus:
+    """Return the process-wide lab event bus"""
+    global _lab_event_bus
+    if _lab_event_bus is None:
+        _lab_event_bus = LabEventBus()
+    return _lab_event_bus
+
+
+def _value(value: Any) -> Any:
+    # UUIDs and INET addresses go out as strings
+    return value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def _delta(obj: Any, kind: str, columns: tuple, op: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Changed tracked columns of a flushed object, or None if nothing changed"""
+    state = inspect(obj)
+    if op is None:
+        changed = [c for c in columns if state.attrs[c].history.has_changes()]
+        if not changed:
+            return None
+    else:
+        changed = [] if op == "deleted" else list(columns)
+
+    delta = {"type": kind, "id": _value(obj.id)}
+    if op:
+        delta["op"] = op
+    for column in changed:
+        delta[column] = _value(getattr(obj, column))
+    if kind == "job" and op != "deleted":
+        delta["kind"] = obj.kind
+        delta["progress"] = obj.progress or 0
+    return delta
+
+
+def _collect_deltas(session: Session, flush_context) -> None:
+    """Record tracked changes of this flush (pre-flush history is still visible here)"""
+    if _lab_event_bus is None or not _lab_event_bus._subscribers:
+        return
+    pending: List = session.info.setdefault("lab_events", [])
+    for obj, op in chain(
+        ((o, "created") for o in session.new),
+        ((o, None) for o in session.dirty),
+        ((o, "deleted") for o in session.deleted)
+    ):
+        tracked = TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        lab_id = obj.id if isinstance(obj, Lab) else obj.lab_id
+        delta = _delta(obj, *tracked, op)
+        if delta is not None and lab_id is not None:
+            pending.append((lab_id, delta))
+
+
+def _publish_on_commit(session: Session) -> None:
+    pending = session.info.pop("lab_events", None)
+    if pending and _lab_event_bus is not None:
+        for lab_id, delta in pending:
+            _lab_event_bus.publish(lab_id, delta)
+
+
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("lab_events", None)
+
+
+def publish_bulk_update(model: type, rows: Iterable, values: Dict[str, Any]) -> None:
+    """
+    Publish the deltas of a committed bulk UPDATE
+
+    Bulk statements bypass the flush hooks, so the caller passes the rows it
+    changed (from RETURNING: id and lab_id, plus kind for jobs) and the
+    values it set; tracked columns among them are published per row.
+    """
+    if _lab_event_bus is None:
+        return
+    kind, columns = TRACKED[model]
+    changed = {column: _value(values[column]) for column in columns if column in values}
+    for row in rows:
+        delta = {"type": kind, "id": _value(row.id), **changed}
+        if kind == "job":
+            delta["kind"] = row.kind
+            delta["progress"] = values.get("progress") or 0
+        _lab_event_bus.publish(row.lab_id, delta)
+
+
+event.listen(Session, "after_flush", _collect_deltas)
+event.listen(Session, "after_commit", _publish_on_commit)
+event.listen(Session, "after_rollback", _discard_on_rollback)
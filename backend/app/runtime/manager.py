@@ -2,13 +2,30 @@
 Runtime Manager for NEON
 Coordinates container deployment and management
 """
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, List, Callable, Any
 from sqlalchemy.orm import Session
+import asyncio
+import inspect
 import logging
+import zlib
 
+from app.core.config import settings
 from app.db.models import Node, Link, Image
+from app.runtime.capacity import CapacityAccountant, node_resources
+from app.runtime.chaos import ChaosEngine
 from app.runtime.docker import DockerRuntime
-from app.runtime.network import NetworkManager
+from app.runtime.docker_async import AsyncDockerRuntime
+from app.runtime.events import get_event_watcher
+from app.runtime.hosts import HostRegistry, ShardedDocker, ShardedNetwork
+from app.runtime.network import Impairment, NetworkManager, impairment
+from app.runtime.orphans import OrphanCollector
+from app.runtime.pool import WarmPool, image_environment
+from app.runtime.pull import ImagePuller
+from app.runtime.sessions import committing, run_in_session
+from app.runtime.wiring import LinkEndpoints, plan_lab_wiring
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +35,36 @@ class RuntimeManager:
 
     def __init__(self):
         """Initialize runtime manager"""
-        self.docker = DockerRuntime()
+        if settings.DOCKER_RUNTIME == "async":
+            self.docker = AsyncDockerRuntime()
+        else:
+            self.docker = DockerRuntime()
         self.network = NetworkManager()
+        # With several Docker hosts registered, docker/network route every
+        # container call to the host the container runs on
+        self.hosts = HostRegistry(self.docker, self.network)
+        if self.hosts.sharded:
+            self.docker = ShardedDocker(self.hosts)
+            self.network = ShardedNetwork(self.hosts)
+        self.puller = ImagePuller(self)
+        self.pool = WarmPool(self)
+        self.chaos = ChaosEngine(self)
+        self.capacity = CapacityAccountant(self)
+        self.orphans = OrphanCollector(self)
+        # Serializes impairment updates per link (see update_link_impairment)
+        self._link_locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    async def _run(fn: Callable, *args, **kwargs) -> Any:
+        """
+        Call a runtime method without blocking the event loop
+
+        Coroutine methods (AsyncDockerRuntime) are awaited directly; blocking
+        ones (docker SDK, subprocess) are run in a worker thread.
+        """
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args, **kwargs)
+        return await asyncio.to_thread(fn, *args, **kwargs)
 
     async def deploy_node(self, node: Node, image: Image, db: Session) -> Dict:
         """
@@ -33,28 +78,46 @@ class RuntimeManager:
         Returns:
             Deployment result with container_id and status
         """
+        container_id = None
         try:
             logger.info(f"Deploying node {node.name} with image {image.name}")
 
-            # Determine resource allocation
-            cpu = node.cpu or image.cpu_recommended or 1
-            memory = node.memory or image.memory_recommended or 512
+            name = f"neon_{node.lab_id}_{node.name}"
+            host = self.hosts.host_of(node)
+            local = host is self.hosts.local
 
-            # Prepare environment variables
-            environment = {}
-            if image.default_credentials:
-                environment.update({
-                    "DEFAULT_USER": image.default_credentials.get("username", "admin"),
-                    "DEFAULT_PASSWORD": image.default_credentials.get("password", "admin")
-                })
+            # A pre-booted container from the warm pool skips create/start
+            # and the image's boot time
+            container_id = await self.pool.claim(node, image, name) if local else None
+            if container_id:
+                mgmt_ip = await self._run(self.docker.get_container_ip, container_id)
+                async with committing(db):
+                    node.container_id = container_id
+                    node.status = "running"
+                    node.mgmt_ip = mgmt_ip
+
+                return {
+                    "container_id": container_id,
+                    "status": "running",
+                    "message": f"Node {node.name} deployed from warm pool"
+                }
+
+            # Wait for the image (joins a pre-pull already in flight);
+            # remote hosts pull it on create
+            if local:
+                await self.puller.ensure(image.image_uri)
+
+            # Determine resource allocation
+            cpu, memory = node_resources(node, image)
 
             # Create container
-            container_id = self.docker.create_container(
+            container_id = await self._run(
+                host.docker.create_container,
                 image=image.image_uri,
-                name=f"neon_{node.lab_id}_{node.name}",
+                name=name,
                 cpu=cpu,
                 memory=memory,
-                environment=environment,
+                environment=image_environment(image),
                 labels={
                     "neon.lab_id": str(node.lab_id),
                     "neon.node_id": str(node.id),
@@ -62,27 +125,44 @@ class RuntimeManager:
                 }
             )
 
+            # Record the container before starting it, so the event watcher
+            # can match the "start" event to this node
+            self.hosts.bind(container_id, host)
+            async with committing(db):
+                node.container_id = container_id
+                node.status = "starting"
+
             # Start container
-            self.docker.start_container(container_id)
+            await self._run(self.docker.start_container, container_id)
 
-            # Update node in database
-            node.container_id = container_id
-            node.status = "starting"
-            db.commit()
+            if host.kernel != "local":
+                # The event watcher only follows the local engine
+                mgmt_ip = await self._run(self.docker.get_container_ip, container_id)
+                async with committing(db):
+                    node.status = "running"
+                    node.mgmt_ip = mgmt_ip
 
-            # Wait for container to be ready (non-blocking for API response)
-            logger.info(f"Node {node.name} container started: {container_id[:12]}")
+            # Readiness is tracked by the event watcher (non-blocking for API response)
+            logger.info(f"Node {node.name} container started on {host.name}: {container_id[:12]}")
 
             return {
                 "container_id": container_id,
-                "status": "starting",
+                "status": node.status,
                 "message": f"Node {node.name} deployed successfully"
             }
 
         except Exception as e:
             logger.error(f"Failed to deploy node {node.name}: {e}")
-            node.status = "error"
-            db.commit()
+            if container_id:
+                # Created but never started: remove it so a retry can reuse the name
+                try:
+                    await self._run(self.docker.remove_container, container_id)
+                except Exception:
+                    pass
+            async with committing(db):
+                if container_id:
+                    node.container_id = None
+                node.status = "error"
             raise
 
     async def check_node_ready(self, node: Node, image: Image, db: Session) -> bool:
@@ -102,11 +182,11 @@ class RuntimeManager:
 
         try:
             # Check container status
-            status = self.docker.get_container_status(node.container_id)
+            status = await self._run(self.docker.get_container_status, node.container_id)
 
             if status == "running":
                 # Get management IP
-                mgmt_ip = self.docker.get_container_ip(node.container_id)
+                mgmt_ip = await self._run(self.docker.get_container_ip, node.container_id)
 
                 # Update node
                 node.status = "running"
@@ -128,13 +208,28 @@ class RuntimeManager:
             logger.error(f"Error checking node {node.name} status: {e}")
             return False
 
+    async def wait_for_node_ready(self, node: Node, timeout: int = 300) -> bool:
+        """
+        Wait for a deployed node's container to become ready
+
+        Uses the Docker events watcher when it is running, otherwise falls
+        back to polling the runtime.
+        """
+        if not node.container_id:
+            return False
+
+        watcher = get_event_watcher()
+        if watcher.running and self.hosts.get(node.host).kernel == "local":
+            return await watcher.wait_for_ready(node.container_id, timeout)
+        return await self._run(self.docker.wait_for_ready, node.container_id, timeout)
+
     async def stop_node(self, node: Node, db: Session) -> Dict:
         """Stop a running node"""
         try:
             if not node.container_id:
                 return {"status": "not_deployed", "message": "Node has no container"}
 
-            self.docker.stop_container(node.container_id)
+            await self._run(self.docker.stop_container, node.container_id)
 
             node.status = "stopped"
             db.commit()
@@ -154,7 +249,7 @@ class RuntimeManager:
             if not node.container_id:
                 return {"status": "not_deployed", "message": "Node has no container"}
 
-            self.docker.remove_container(node.container_id)
+            await self._run(self.docker.remove_container, node.container_id)
 
             node.container_id = None
             node.status = "stopped"
@@ -190,28 +285,30 @@ class RuntimeManager:
                     "message": "Both nodes must be deployed before creating links"
                 }
 
+            if self.hosts.host_of(source_node) is not self.hosts.host_of(target_node):
+                return await self._create_tunnel(link, db)
+
             # Create veth pair link
-            success = self.network.create_veth_link(
+            success = await self._run(
+                self.network.create_veth_link,
                 container_a_id=source_node.container_id,
                 container_a_iface=link.source_interface,
                 container_b_id=target_node.container_id,
                 container_b_iface=link.target_interface,
-                bandwidth=link.bandwidth,
-                delay_ms=link.delay_ms,
-                loss_percent=float(link.loss_percent) if link.loss_percent else None
+                **Impairment.from_link(link).as_dict()
             )
 
             if success:
-                link.status = "up"
-                db.commit()
+                async with committing(db):
+                    link.status = "up"
 
                 return {
                     "status": "created",
                     "message": "Link created successfully with veth pair"
                 }
             else:
-                link.status = "error"
-                db.commit()
+                async with committing(db):
+                    link.status = "error"
 
                 return {
                     "status": "error",
@@ -220,10 +317,186 @@ class RuntimeManager:
 
         except Exception as e:
             logger.error(f"Failed to create link: {e}")
-            link.status = "error"
-            db.commit()
+            async with committing(db):
+                link.status = "error"
             raise
 
+    def _allocate_vni(self, link: Link, db: Session) -> int:
+        """Stable VNI for a cross-host link, probing past ones other links hold"""
+        if link.vni:
+            return link.vni
+        span = 2 ** 24 - settings.VXLAN_VNI_BASE
+        taken = {vni for (vni,) in db.query(Link.vni).filter(Link.vni.isnot(None)).all()}
+        vni = settings.VXLAN_VNI_BASE + zlib.crc32(link.id.bytes) % span
+        while vni in taken:
+            vni = settings.VXLAN_VNI_BASE + (vni - settings.VXLAN_VNI_BASE + 1) % span
+        link.vni = vni
+        return vni
+
+    async def _create_tunnel(self, link: Link, db: Session) -> Dict:
+        """
+        Stitch a link whose nodes run on different hosts with a VXLAN tunnel
+
+        Each end becomes a VXLAN interface with the link's VNI.  Between
+        separate hosts the tunnel runs over the hosts' VTEP addresses; hosts
+        sharing a kernel (stand-ins) terminate it inside the containers,
+        over their management addresses.
+        """
+        ends = [
+            (link.source_node, link.source_interface),
+            (link.target_node, link.target_interface)
+        ]
+        hosts = [self.hosts.host_of(node) for node, _ in ends]
+        in_namespace = hosts[0].kernel == hosts[1].kernel
+
+        if in_namespace:
+            addresses = await asyncio.gather(*(
+                self._run(self.docker.get_container_ip, node.container_id) for node, _ in ends
+            ))
+        else:
+            addresses = [host.vtep for host in hosts]
+        if not all(addresses):
+            async with committing(db):
+                link.status = "error"
+            return {"status": "error", "message": "No tunnel address for one of the link's hosts"}
+
+        vni = await run_in_session(db, self._allocate_vni, link, db)
+        netem = Impairment.from_link(link).as_dict()
+        created = await asyncio.gather(*(
+            self._run(
+                self.network.create_vxlan_endpoint,
+                node.container_id,
+                iface,
+                vni,
+                remote=addresses[1 - i],
+                local=None if in_namespace else addresses[i],
+                in_namespace=in_namespace,
+                **netem
+            )
+            for i, (node, iface) in enumerate(ends)
+        ))
+
+        if all(created):
+            async with committing(db):
+                link.status = "up"
+            return {
+                "status": "created",
+                "message": f"Link created as VXLAN tunnel {vni} between {hosts[0].name} and {hosts[1].name}"
+            }
+
+        for (node, iface), ok in zip(ends, created):
+            if ok:
+                await self._run(self.network.delete_interface, node.container_id, iface)
+        async with committing(db):
+            link.status = "error"
+        return {"status": "error", "message": "Failed to create VXLAN tunnel"}
+
+    async def create_links_batch(self, links: List[Link], db: Session) -> List[Dict]:
+        """
+        Wire many links at once with ip/tc batch scripts
+
+        The number of spawned processes scales with the number of container
+        namespaces involved instead of the number of links.
+
+        Returns:
+            Per-link results, in the same order as `links`
+        """
+        if not links:
+            return []
+
+        container_ids = [
+            cid for link in links
+            for cid in (link.source_node.container_id, link.target_node.container_id)
+        ]
+        pids = await self._run(self.network.get_pids, container_ids)
+
+        endpoints = []
+        for link in links:
+            netem = Impairment.from_link(link).as_dict()
+            endpoints.append(LinkEndpoints(
+                link_id=str(link.id),
+                pid_a=pids[link.source_node.container_id],
+                iface_a=link.source_interface,
+                pid_b=pids[link.target_node.container_id],
+                iface_b=link.target_interface,
+                bandwidth=netem.pop("bandwidth"),
+                delay_ms=netem.pop("delay_ms"),
+                loss_percent=netem.pop("loss_percent"),
+                netem=netem
+            ))
+        plan = plan_lab_wiring(endpoints)
+        logger.info(f"Wiring {len(links)} links with {plan.process_count} batch processes")
+
+        wired = await self._run(self.network.apply_wiring_plan, plan)
+
+        results = []
+        async with committing(db):
+            for link in links:
+                ok = str(link.id) in wired
+                link.status = "up" if ok else "error"
+                results.append({"link_id": str(link.id), "status": "created" if ok else "error"})
+
+        return results
+
+    async def update_link_impairment(self, link: Link, changes: Dict, db: "AsyncSession") -> Dict:
+        """
+        Change the impairment of a link (see Impairment), live when it is up
+
+        Both ends are updated concurrently with in-place `tc qdisc replace`
+        (see NetworkManager.set_impairment).  The update is all-or-nothing:
+        if one end fails the other is put back to the previous impairment
+        and the DB is left unchanged.  Updates to the same link are
+        serialized so overlapping requests cannot interleave their ends.
+
+        Args:
+            link: Link database model
+            changes: New values for any Impairment field
+            db: Async database session of the API request
+
+        Returns:
+            Result with status "updated", "stored" (link not wired) or "error"
+
+        Raises:
+            ValueError: the resulting impairment is not valid (see Impairment.validate)
+        """
+        async with self._link_locks.setdefault(str(link.id), asyncio.Lock()):
+            old = Impairment.from_link(link).as_dict()
+            new = {**old, **changes}
+            Impairment(**new).validate()
+
+            ends = [
+                (link.source_node.container_id, link.source_interface),
+                (link.target_node.container_id, link.target_interface)
+            ]
+            live = link.status == "up" and all(container_id for container_id, _ in ends)
+
+            if live:
+                try:
+                    previous = impairment(**old)
+                except ValueError:
+                    previous = None  # unparseable stored rate: reinstall from scratch
+                applied = await asyncio.gather(*(
+                    self._run(self.network.set_impairment, container_id, iface, previous=previous, **new)
+                    for container_id, iface in ends
+                ))
+                if not all(applied):
+                    rollback = impairment(**new)
+                    await asyncio.gather(*(
+                        self._run(self.network.set_impairment, container_id, iface, previous=rollback, **old)
+                        for (container_id, iface), ok in zip(ends, applied) if ok
+                    ))
+                    return {"status": "error", "message": "Failed to update link impairment"}
+
+            for key, value in changes.items():
+                setattr(link, key, value)
+            await db.commit()
+
+            return {
+                "status": "updated" if live else "stored",
+                "message": "Link impairment updated" if live else "Link is not wired; applied on next deploy",
+                **new
+            }
+
     async def destroy_link(self, link: Link, db: Session) -> Dict:
         """
         Destroy a network link between nodes
@@ -243,13 +516,22 @@ class RuntimeManager:
                     "message": "Nodes are not deployed"
                 }
 
-            # Delete veth link
-            success = self.network.delete_link(
-                container_a_id=source_node.container_id,
-                container_a_iface=link.source_interface,
-                container_b_id=target_node.container_id,
-                container_b_iface=link.target_interface
-            )
+            if link.vni and self.hosts.host_of(source_node) is not self.hosts.host_of(target_node):
+                # Tunnel ends are independent interfaces: delete both
+                deleted = await asyncio.gather(
+                    self._run(self.network.delete_interface, source_node.container_id, link.source_interface),
+                    self._run(self.network.delete_interface, target_node.container_id, link.target_interface)
+                )
+                success = all(deleted)
+            else:
+                # Delete veth link
+                success = await self._run(
+                    self.network.delete_link,
+                    container_a_id=source_node.container_id,
+                    container_a_iface=link.source_interface,
+                    container_b_id=target_node.container_id,
+                    container_b_iface=link.target_interface
+                )
 
             if success:
                 link.status = "down"
@@ -269,10 +551,10 @@ class RuntimeManager:
             logger.error(f"Failed to destroy link: {e}")
             raise
 
-    def get_runtime_stats(self) -> Dict:
+    async def get_runtime_stats(self) -> Dict:
         """Get runtime statistics"""
         try:
-            containers = self.docker.list_neon_containers()
+            containers = await self._run(self.docker.list_neon_containers)
 
             return {
                 "total_containers": len(containers),
@@ -285,6 +567,19 @@ class RuntimeManager:
             logger.error(f"Failed to get runtime stats: {e}")
             return {"error": str(e)}
 
+    async def close(self) -> None:
+        """Release pooled runtime connections"""
+        await self.orphans.stop()
+        await self.chaos.stop()
+        await self.pool.stop()
+        await self.puller.stop()
+        close = getattr(self.docker, "close", None)
+        if close and inspect.iscoroutinefunction(close):
+            await close()
+        if self.network.netlink:
+            self.network.netlink.close()
+        await self.hosts.close()
+
 
 # Singleton instance (lazy initialization)
 _runtime_manager = None
@@ -296,3 +591,11 @@ def get_runtime() -> RuntimeManager:
     if _runtime_manager is None:
         _runtime_manager = RuntimeManager()
     return _runtime_manager
+
+
+async def shutdown_runtime() -> None:
+    """Close the runtime singleton if it was ever initialized"""
+    global _runtime_manager
+    if _runtime_manager is not None:
+        await _runtime_manager.close()
+        _runtime_manager = None
@@ -0,0 +1,232 @@
+"""
+Netlink Link Backend for NEON
+Creates veth links and qdiscs over netlink sockets instead of forking ip/tc
+"""
+import errno
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Dict
+
+# pyroute2 is optional: NetworkManager falls back to ip/tc subprocesses without it
+try:
+    from pyroute2 import IPRoute, NetlinkError, NetNS
+    netlink_available = True
+except ImportError:
+    netlink_available = False
+
+if TYPE_CHECKING:
+    from app.runtime.network import Impairment
+
+logger = logging.getLogger(__name__)
+
+TBF_HANDLE = 0x10000       # 1:
+TBF_CHILD = 0x10001        # 1:1
+NETEM_HANDLE = 0x100000    # 10:
+
+
+class NetlinkLinkBackend:
+    """
+    Drives veth creation, namespace moves, renames, link-up and qdisc setup
+    through netlink.
+
+    Network namespaces are addressed through file descriptors on
+    /proc/<pid>/ns/net, opened once per container PID and cached together
+    with a netlink socket bound to that namespace.  Netlink sockets are not
+    safe for concurrent use, so every operation holds a single lock; each
+    operation is a handful of syscalls, far cheaper than a fork/exec.
+    """
+
+    def __init__(self):
+        if not netlink_available:
+            raise RuntimeError("pyroute2 is not installed")
+        self.ipr = IPRoute()
+        self._ns_fds: Dict[int, int] = {}
+        self._ns_sockets: Dict[int, "NetNS"] = {}
+        self._lock = threading.RLock()
+
+    def _ns_fd(self, pid: int) -> int:
+        """
+        Return a cached fd for the network namespace of `pid`
+
+        PIDs are recycled when containers exit, so a cached fd is only reused
+        while it still refers to the namespace currently behind the PID.
+        """
+        path = f"/proc/{pid}/ns/net"
+        fd = self._ns_fds.get(pid)
+        if fd is not None and os.fstat(fd).st_ino != os.stat(path).st_ino:
+            self.release(pid)
+            fd = None
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY)
+            self._ns_fds[pid] = fd
+        return fd
+
+    def _ns(self, pid: int) -> "NetNS":
+        """Return a cached netlink socket inside the network namespace of `pid`"""
+        self._ns_fd(pid)  # revalidates the cache entry for this PID
+        ns = self._ns_sockets.get(pid)
+        if ns is None:
+            ns = NetNS(f"/proc/{pid}/ns/net")
+            self._ns_sockets[pid] = ns
+        return ns
+
+    @staticmethod
+    def _index(sock, ifname: str) -> int:
+        indexes = sock.link_lookup(ifname=ifname)
+        if not indexes:
+            raise LookupError(f"Interface {ifname} not found")
+        return indexes[0]
+
+    def release(self, pid: int) -> None:
+        """Drop cached namespace handles for a (possibly exited) container"""
+        with self._lock:
+            fd = self._ns_fds.pop(pid, None)
+            if fd is not None:
+                os.close(fd)
+            ns = self._ns_sockets.pop(pid, None)
+            if ns is not None:
+                ns.close()
+
+    def close(self) -> None:
+        """Release every cached namespace and the host socket"""
+        for pid in list(self._ns_fds) + list(self._ns_sockets):
+            self.release(pid)
+        self.ipr.close()
+
+    def create_veth_link(
+        self,
+        pid_a: int,
+        veth_a: str,
+        iface_a: str,
+        pid_b: int,
+        veth_b: str,
+        iface_b: str
+    ) -> None:
+        """
+        Create a veth pair with one end in each container, renamed and up
+
+        The peer is created directly inside container B's namespace, so only
+        end A needs an explicit move.
+
+        Raises:
+            Exception: any netlink error; a half-created pair is removed first
+        """
+        with self._lock:
+            try:
+                self.ipr.link(
+                    "add",
+                    ifname=veth_a,
+                    kind="veth",
+                    peer={"ifname": veth_b, "net_ns_fd": self._ns_fd(pid_b)}
+                )
+                self.ipr.link(
+                    "set",
+                    index=self._index(self.ipr, veth_a),
+                    net_ns_fd=self._ns_fd(pid_a)
+                )
+
+                for pid, veth, iface in ((pid_a, veth_a, iface_a), (pid_b, veth_b, iface_b)):
+                    ns = self._ns(pid)
+                    index = self._index(ns, veth)
+                    ns.link("set", index=index, ifname=iface)
+                    ns.link("set", index=index, state="up")
+
+            except Exception:
+                self._cleanup_pair(pid_a, veth_a, iface_a)
+                raise
+
+    def _cleanup_pair(self, pid_a: int, veth_a: str, iface_a: str) -> None:
+        """Best-effort removal of end A (wherever it ended up) after a failure"""
+        candidates = [(self.ipr, veth_a)]
+        try:
+            ns = self._ns(pid_a)
+            candidates += [(ns, veth_a), (ns, iface_a)]
+        except OSError:
+            pass
+
+        for sock, name in candidates:
+            try:
+                sock.link("del", index=self._index(sock, name))
+                return
+            except Exception:
+                continue
+
+    def delete_link(self, pid: int, iface: str) -> None:
+        """Delete one end of a veth pair (the kernel removes the peer)"""
+        with self._lock:
+            ns = self._ns(pid)
+            ns.link("del", index=self._index(ns, iface))
+
+    def set_state(self, pid: int, iface: str, state: str) -> None:
+        """Set an interface "up" or "down" inside a container"""
+        with self._lock:
+            ns = self._ns(pid)
+            ns.link("set", index=self._index(ns, iface), state=state)
+
+    def clear_tc(self, pid: int, iface: str) -> None:
+        """Remove the root qdisc of an interface, if NEON installed one"""
+        with self._lock:
+            ns = self._ns(pid)
+            try:
+                ns.tc("del", index=self._index(ns, iface))
+            except NetlinkError as e:
+                # ENOENT/EINVAL: only the default qdisc is attached
+                if e.code not in (errno.ENOENT, errno.EINVAL):
+                    raise
+
+    def update_tc(self, pid: int, interface: str, previous: Dict, impairment: "Impairment") -> None:
+        """Move a live interface to a new impairment in place (see Impairment.update_commands)"""
+        had_netem = any(value for key, value in previous.items() if key != "rate")
+        if not (impairment.bandwidth or impairment.netem_args()):
+            if had_netem or previous.get("rate"):
+                self.clear_tc(pid, interface)
+            return
+
+        self.apply_tc(pid, interface, impairment, command="replace")
+        if impairment.bandwidth and not impairment.netem_args() and previous.get("rate") and had_netem:
+            with self._lock:
+                ns = self._ns(pid)
+                # Swap netem for a FIFO: deleting it would leave tbf's class dropping everything
+                ns.tc("replace", "pfifo", index=self._index(ns, interface), parent=TBF_CHILD)
+
+    def apply_tc(self, pid: int, interface: str, impairment: "Impairment", command: str = "add") -> None:
+        """
+        Install the same qdisc layout as NetworkManager._apply_tc:
+        root tbf -> child netem when both are requested, otherwise one root qdisc.
+        `command` is "add" for a fresh interface or "replace" to change one in place.
+        Delay distributions are not supported here (NetworkManager uses tc for them).
+        """
+        netem = {}
+        if impairment.delay_ms:
+            netem["delay"] = int(float(impairment.delay_ms) * 1000)  # usec
+            if impairment.jitter_ms:
+                netem["jitter"] = int(float(impairment.jitter_ms) * 1000)
+                if impairment.delay_correlation:
+                    netem["delay_corr"] = float(impairment.delay_correlation)
+            if impairment.reorder_percent:
+                netem.update(prob_reorder=float(impairment.reorder_percent), gap=1)
+        if impairment.loss_percent:
+            netem["loss"] = float(impairment.loss_percent)
+            if impairment.loss_correlation:
+                netem["loss_corr"] = float(impairment.loss_correlation)
+        if impairment.duplicate_percent:
+            netem["duplicate"] = float(impairment.duplicate_percent)
+        if impairment.corrupt_percent:
+            netem["prob_corrupt"] = float(impairment.corrupt_percent)
+
+        with self._lock:
+            ns = self._ns(pid)
+            index = self._index(ns, interface)
+
+            if impairment.bandwidth:
+                burst, latency = impairment.tbf_parameters()
+                ns.tc(
+                    command, "tbf", index,
+                    handle=TBF_HANDLE if netem else 0,
+                    rate=impairment.bandwidth, burst=burst, latency=f"{latency}ms"
+                )
+            if netem:
+                if impairment.bandwidth:
+                    netem.update(parent=TBF_CHILD, handle=NETEM_HANDLE)
+                ns.tc(command, "netem", index, **netem)
@@ -1,22 +1,499 @@
 """
 Network Link Management for NEON
-Handles veth pairs and network connections between containers
+Handles veth pairs, VXLAN tunnels and network connections between containers
 """
+import math
+import re
 import subprocess
 import logging
-from typing import Optional
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
 import docker
-from docker.errors import DockerException, NotFound
+from docker.errors import DockerException
+
+from app.core.config import settings
+from app.runtime.netlink import NetlinkLinkBackend, netlink_available
+
+if TYPE_CHECKING:
+    from app.runtime.wiring import WiringPlan
 
 logger = logging.getLogger(__name__)
 
 
+def veth_name(pid: int, interface: str) -> str:
+    """Host-side name of a veth end, truncated to the 15 char IFNAMSIZ limit"""
+    return f"veth{pid}_{interface.replace('/', '_')}"[:15]
+
+
+# Cross-host links (see app.runtime.hosts): IANA VXLAN port, and an MTU that
+# leaves room for the 50 byte VXLAN/UDP/IP outer headers on a 1500 underlay
+VXLAN_PORT = 4789
+VXLAN_MTU = 1450
+
+
+def vxlan_commands(
+    pid: int,
+    interface: str,
+    vni: int,
+    remote: str,
+    local: Optional[str] = None,
+    in_namespace: bool = False
+) -> List[List[str]]:
+    """
+    Commands creating one end of a VXLAN-stitched link inside a container
+
+    By default the VXLAN device is created in the host namespace, so its UDP
+    socket stays on the host's underlay (`remote` is the peer host's VTEP
+    address), and is then moved into the container.  With `in_namespace`
+    the device is created inside the container and tunnels over the
+    container's own eth0 (`remote` is the peer container's address); this
+    is used when both ends share one kernel, where two host-side devices
+    with the same VNI and port would collide.
+    """
+    ns = ["nsenter", "-t", str(pid), "-n"]
+    spec = ["type", "vxlan", "id", str(vni), "remote", remote, "dstport", str(VXLAN_PORT)]
+    if local:
+        spec += ["local", local]
+
+    if in_namespace:
+        commands = [ns + ["ip", "link", "add", interface] + spec]
+    else:
+        tmp = f"vx{vni}"
+        commands = [
+            ["ip", "link", "add", tmp] + spec,
+            ["ip", "link", "set", tmp, "netns", str(pid)],
+            ns + ["ip", "link", "set", tmp, "name", interface],
+        ]
+    return commands + [
+        ns + ["ip", "link", "set", interface, "mtu", str(VXLAN_MTU)],
+        ns + ["ip", "link", "set", interface, "up"],
+    ]
+
+
+# tc rate units in bits per second; "bps" means bytes per second to tc
+_RATE_UNITS = {
+    "": 1, "bit": 1, "kbit": 1e3, "mbit": 1e6, "gbit": 1e9, "tbit": 1e12,
+    "kibit": 1024, "mibit": 1024 ** 2, "gibit": 1024 ** 3, "tibit": 1024 ** 4,
+    "bps": 8, "kbps": 8e3, "mbps": 8e6, "gbps": 8e9, "tbps": 8e12,
+    "kibps": 8 * 1024, "mibps": 8 * 1024 ** 2, "gibps": 8 * 1024 ** 3, "tibps": 8 * 1024 ** 4,
+}
+
+# Delay distribution tables shipped with iproute2 (/usr/lib/tc/*.dist)
+DELAY_DISTRIBUTIONS = ("uniform", "normal", "pareto", "paretonormal")
+
+# tbf sizing: the bucket must hold at least one timer tick worth of tokens
+# (HZ may be as low as 250), or the qdisc cannot reach its configured rate
+TBF_TIMER_HZ = 250
+TBF_MIN_BURST_BYTES = 4000      # the former fixed 32kbit
+TBF_MIN_LATENCY_MS = 50
+
+
+def parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Convert a tc rate string ('100mbit', '1Gbit', '1Gbps') to bits per second"""
+    if not rate:
+        return None
+    match = re.fullmatch(r"([\d.]+)\s*([a-zA-Z]*)", rate.strip())
+    if not match or match.group(2).lower() not in _RATE_UNITS:
+        raise ValueError(f"Invalid rate: {rate}")
+    return float(match.group(1)) * _RATE_UNITS[match.group(2).lower()]
+
+
+def _parse_time_ms(value: str) -> float:
+    """Convert a tc time ('10ms', '10.0ms', '1s', '500us') to milliseconds"""
+    match = re.fullmatch(r"([\d.]+)(us|ms|s)?", value)
+    if not match:
+        raise ValueError(f"Invalid time: {value}")
+    scale = {"us": 0.001, "ms": 1, "s": 1000}[match.group(2) or "us"]
+    return float(match.group(1)) * scale
+
+
+def tbf_parameters(bandwidth: str) -> Tuple[int, int]:
+    """
+    Size the tbf bucket for a rate
+
+    Returns:
+        (burst in bytes, latency in ms): burst covers one timer tick at the
+        rate, latency lets the queue hold at least two bursts
+    """
+    rate = parse_rate(bandwidth)
+    burst = max(int(rate / 8 / TBF_TIMER_HZ), TBF_MIN_BURST_BYTES)
+    latency = max(TBF_MIN_LATENCY_MS, math.ceil(2 * burst * 8 * 1000 / rate))
+    return burst, latency
+
+
+@dataclass(frozen=True)
+class Impairment:
+    """
+    Link impairment as installed by tc: tbf rate shaping plus a netem model
+
+    Field names match the Link columns.  Percentages are 0-100; a falsy
+    value means "not impaired" for that property.
+    """
+    bandwidth: Optional[str] = None
+    delay_ms: Optional[float] = None
+    loss_percent: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    delay_correlation: Optional[float] = None
+    delay_distribution: Optional[str] = None
+    loss_correlation: Optional[float] = None
+    reorder_percent: Optional[float] = None
+    duplicate_percent: Optional[float] = None
+    corrupt_percent: Optional[float] = None
+
+    @classmethod
+    def from_link(cls, link) -> "Impairment":
+        values = {}
+        for f in fields(cls):
+            value = getattr(link, f.name, None)
+            # Numeric columns come back as Decimal
+            values[f.name] = float(value) if isinstance(value, Decimal) else value
+        return cls(**values)
+
+    def as_dict(self) -> Dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def validate(self) -> None:
+        """
+        Reject combinations tc refuses
+
+        Raises:
+            ValueError: with the offending parameter
+        """
+        parse_rate(self.bandwidth)
+        if self.jitter_ms and not self.delay_ms:
+            raise ValueError("jitter_ms requires delay_ms")
+        if self.delay_distribution:
+            if self.delay_distribution not in DELAY_DISTRIBUTIONS:
+                raise ValueError(f"delay_distribution must be one of {', '.join(DELAY_DISTRIBUTIONS)}")
+            if not self.jitter_ms:
+                raise ValueError("delay_distribution requires jitter_ms")
+        if self.reorder_percent and not self.delay_ms:
+            raise ValueError("reorder_percent requires delay_ms")
+
+    def netem_args(self) -> List[str]:
+        """netem options, in the order tc expects them"""
+        args = []
+        if self.delay_ms:
+            args.extend(["delay", f"{self.delay_ms}ms"])
+            if self.jitter_ms:
+                args.append(f"{self.jitter_ms}ms")
+                if self.delay_correlation:
+                    args.append(f"{self.delay_correlation}%")
+                if self.delay_distribution:
+                    args.extend(["distribution", self.delay_distribution])
+        if self.loss_percent:
+            args.extend(["loss", f"{self.loss_percent}%"])
+            if self.loss_correlation:
+                args.append(f"{self.loss_correlation}%")
+        if self.duplicate_percent:
+            args.extend(["duplicate", f"{self.duplicate_percent}%"])
+        if self.reorder_percent and self.delay_ms:
+            args.extend(["reorder", f"{self.reorder_percent}%"])
+        if self.corrupt_percent:
+            args.extend(["corrupt", f"{self.corrupt_percent}%"])
+        return args
+
+    def tbf_parameters(self) -> Tuple[int, int]:
+        return tbf_parameters(self.bandwidth)
+
+    def tbf_args(self) -> List[str]:
+        burst, latency = self.tbf_parameters()
+        return ["rate", self.bandwidth, "burst", str(burst), "latency", f"{latency}ms"]
+
+    def qdisc_commands(self, interface: str, action: str = "add") -> List[List[str]]:
+        """
+        Build the `tc` arguments (without the leading "tc") for this impairment
+
+        Linux only permits one root qdisc per interface.  When both bandwidth
+        limiting and netem impairment are requested we chain them:
+          root → tbf (rate limiting) → netem (delay / loss / ...) as a child qdisc.
+        When only one type is requested a single root qdisc suffices.
+
+        `action` is the qdisc verb: "add" on a fresh interface, "replace" to
+        update one in place (see update_commands).
+        """
+        netem_params = self.netem_args()
+
+        if self.bandwidth and netem_params:
+            # Chain: root tbf → child netem (handle 1: / parent 1:1)
+            return [
+                ["qdisc", action, "dev", interface, "root", "handle", "1:", "tbf"] + self.tbf_args(),
+                [
+                    "qdisc", action, "dev", interface,
+                    "parent", "1:1", "handle", "10:", "netem"
+                ] + netem_params
+            ]
+
+        if self.bandwidth:
+            return [["qdisc", action, "dev", interface, "root", "tbf"] + self.tbf_args()]
+
+        if netem_params:
+            return [["qdisc", action, "dev", interface, "root", "netem"] + netem_params]
+
+        return []
+
+    def update_commands(self, interface: str, previous: Dict[str, Optional[float]]) -> List[List[str]]:
+        """
+        Build the `tc` arguments that move a live interface from `previous`
+        (a normalized impairment, see normalized()) to this impairment
+
+        `qdisc replace` changes a qdisc in place when the kind at that handle
+        matches, and otherwise grafts the new qdisc over the old one in a
+        single kernel operation, so the veth stays up and traffic keeps
+        flowing throughout.  When a chained tbf → netem link becomes
+        bandwidth-only the netem child is swapped for a plain FIFO rather
+        than deleted: a tbf class without a child qdisc drops every packet.
+        The FIFO is grafted without a handle, since `replace` at handle 10:
+        is refused while a qdisc of another kind sits there.
+        """
+        had_netem = any(previous.get(key) for key in NETEM_KEYS)
+        had_any = had_netem or bool(previous.get("rate"))
+
+        commands = self.qdisc_commands(interface, action="replace")
+        if not commands:
+            return [["qdisc", "del", "dev", interface, "root"]] if had_any else []
+
+        if self.bandwidth and not self.netem_args() and previous.get("rate") and had_netem:
+            commands.append(["qdisc", "replace", "dev", interface, "parent", "1:1", "pfifo"])
+        return commands
+
+    def normalized(self) -> Dict[str, Optional[float]]:
+        """Comparable form, matching parse_qdiscs() output (tc does not report distributions)"""
+        result = {"rate": parse_rate(self.bandwidth)}
+        for key in NETEM_KEYS:
+            value = getattr(self, key)
+            result[key] = float(value) if value else None
+        return result
+
+
+# Normalized netem properties, as reported by `tc qdisc show`
+NETEM_KEYS = (
+    "delay_ms", "jitter_ms", "delay_correlation", "loss_percent", "loss_correlation",
+    "reorder_percent", "duplicate_percent", "corrupt_percent"
+)
+
+
+def tc_qdisc_commands(
+    interface: str,
+    bandwidth: Optional[str] = None,
+    delay_ms: Optional[int] = None,
+    loss_percent: Optional[float] = None,
+    action: str = "add",
+    **netem
+) -> List[List[str]]:
+    """tc arguments for a link impairment (see Impairment.qdisc_commands)"""
+    return Impairment(bandwidth, delay_ms, loss_percent, **netem).qdisc_commands(interface, action)
+
+
+def tc_update_commands(
+    interface: str,
+    previous: Dict[str, Optional[float]],
+    bandwidth: Optional[str] = None,
+    delay_ms: Optional[int] = None,
+    loss_percent: Optional[float] = None,
+    **netem
+) -> List[List[str]]:
+    """tc arguments to change a live impairment (see Impairment.update_commands)"""
+    return Impairment(bandwidth, delay_ms, loss_percent, **netem).update_commands(interface, previous)
+
+
+def impairment(
+    bandwidth: Optional[str] = None,
+    delay_ms: Optional[float] = None,
+    loss_percent: Optional[float] = None,
+    **netem
+) -> Dict[str, Optional[float]]:
+    """Normalized impairment of an interface, comparable with parse_qdiscs() output"""
+    return Impairment(bandwidth, delay_ms, loss_percent, **netem).normalized()
+
+
+def impairment_matches(desired: Dict, actual: Dict) -> bool:
+    """Compare two normalized impairments, allowing for tc's rounding when printing"""
+    for key in ("rate",) + NETEM_KEYS:
+        a, b = desired.get(key), actual.get(key)
+        if a is None or b is None:
+            if a != b:
+                return False
+        elif abs(a - b) > max(0.01 * abs(a), 1e-3):
+            return False
+    return True
+
+
+def parse_veths(output: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse `ip -o link show type veth` into (ifindex, peer ifindex) per interface
+
+    Lines look like "7: eth1@if12: <BROADCAST,...> ...", where 12 is the
+    index of the peer in the other end's namespace.
+    """
+    veths = {}
+    for line in output.splitlines():
+        match = re.match(r"(\d+):\s+([^@:\s]+)@if(\d+):", line)
+        if match:
+            veths[match.group(2)] = (int(match.group(1)), int(match.group(3)))
+    return veths
+
+
+def parse_host_veths(output: str) -> List[str]:
+    """
+    Names of NEON veth ends (see veth_name) in `ip -o link show type veth` output
+
+    A correctly wired link has both ends moved into container namespaces,
+    so any `veth<pid>_*` interface still in the host namespace was left by
+    a failed link creation.  Docker's own `veth<hex>` interfaces have no
+    underscore and are not matched.
+    """
+    names = []
+    for line in output.splitlines():
+        match = re.match(r"\d+:\s+(veth\d+_[^@:\s]+)", line)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def _percent(token: Optional[str]) -> Optional[float]:
+    if token is None or not token.endswith("%"):
+        return None
+    return float(token[:-1]) or None
+
+
+def _parse_netem(tokens: List[str], current: Dict[str, Optional[float]]) -> None:
+    """Read netem options, e.g. 'delay 10ms 2ms 25% loss 1% 30% duplicate 1%'"""
+    tokens = tokens + [None, None, None]
+    for i, token in enumerate(tokens):
+        if token == "delay":
+            current["delay_ms"] = _parse_time_ms(tokens[i + 1]) or None
+            if tokens[i + 2] and re.fullmatch(r"[\d.]+(us|ms|s)", tokens[i + 2]):
+                current["jitter_ms"] = _parse_time_ms(tokens[i + 2]) or None
+                current["delay_correlation"] = _percent(tokens[i + 3])
+        elif token == "loss":
+            offset = 2 if tokens[i + 1] == "random" else 1
+            current["loss_percent"] = _percent(tokens[i + offset])
+            current["loss_correlation"] = _percent(tokens[i + offset + 1])
+        elif token in ("duplicate", "reorder", "corrupt"):
+            current[f"{token}_percent"] = _percent(tokens[i + 1])
+
+
+def parse_qdiscs(output: str) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Parse `tc qdisc show` into a normalized impairment per interface
+
+    Only the tbf rate and netem options NEON installs are read; interfaces
+    without such qdiscs map to an empty impairment.
+    """
+    result: Dict[str, Dict[str, Optional[float]]] = {}
+    for line in output.splitlines():
+        tokens = line.split()
+        if len(tokens) < 5 or tokens[0] != "qdisc" or "dev" not in tokens:
+            continue
+        iface = tokens[tokens.index("dev") + 1]
+        current = result.setdefault(iface, impairment())
+        params = dict(zip(tokens, tokens[1:]))
+        if tokens[1] == "tbf" and "rate" in params:
+            current["rate"] = parse_rate(params["rate"])
+        elif tokens[1] == "netem":
+            _parse_netem(tokens, current)
+    return result
+
+
 class NetworkManager:
     """Manages network links between containers"""
 
-    def __init__(self):
-        """Initialize network manager"""
-        self.client = docker.from_env()
+    # Netlink backend, or None to use ip/tc/nsenter subprocesses
+    netlink: Optional[NetlinkLinkBackend] = None
+    # Runs ip/tc/nsenter on a remote Docker host (see app.runtime.hosts),
+    # or None to run them here
+    runner: Optional[Any] = None
+
+    def __init__(self, client: Optional[docker.DockerClient] = None, runner: Optional[Any] = None):
+        """
+        Initialize network manager
+
+        Args:
+            client: Docker client of the host the containers run on (default: local)
+            runner: Executes commands on that host; netlink is only used locally
+        """
+        self.client = client or docker.from_env()
+        self.runner = runner
+
+        if runner is not None:
+            logger.info("Using ip/tc commands on a remote host")
+        elif settings.NETLINK_ENABLED and netlink_available:
+            try:
+                self.netlink = NetlinkLinkBackend()
+                logger.info("Using netlink link backend")
+            except Exception as e:
+                logger.warning(f"Netlink unavailable, falling back to ip/tc subprocesses: {e}")
+        else:
+            logger.info("Using ip/tc subprocess link backend")
+
+    def _exec(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """subprocess.run, on the remote host when a runner is set"""
+        if self.runner is not None:
+            return self.runner.run(args, **kwargs)
+        return subprocess.run(args, **kwargs)
+
+    def _netlink_for(self, imp: Impairment) -> bool:
+        """Whether qdiscs for `imp` go through netlink; delay distribution
+        tables are only loaded by the tc binary"""
+        return bool(self.netlink) and not imp.delay_distribution
+
+    def _get_pid(self, container_id: str) -> int:
+        """Get the init PID of a container (its network namespace anchor)"""
+        container = self.client.containers.get(container_id)
+        return container.attrs['State']['Pid']
+
+    def get_pids(self, container_ids: Iterable[str]) -> Dict[str, int]:
+        """Resolve many container IDs to PIDs, one inspect per container"""
+        return {cid: self._get_pid(cid) for cid in set(container_ids)}
+
+    def _run_batch(self, prefix: List[str], tool: str, lines: List[str]) -> bool:
+        """
+        Feed a batch script to `ip`/`tc` in a single process
+
+        -force keeps going past failing lines so one bad link does not stop
+        the rest of the lab; callers verify the outcome afterwards.
+        """
+        if not lines:
+            return True
+        result = self._exec(
+            prefix + [tool, "-force", "-batch", "-"],
+            input="\n".join(lines) + "\n",
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            logger.warning(f"{tool} batch reported errors: {result.stderr.strip()}")
+        return result.returncode == 0
+
+    def apply_wiring_plan(self, plan: "WiringPlan") -> Set[str]:
+        """
+        Apply a lab WiringPlan (see app.runtime.wiring)
+
+        Runs one `ip -batch` in the host namespace, then one `ip -batch` and
+        one `tc -batch` per container namespace.
+
+        Returns:
+            IDs of links whose two interfaces exist after wiring
+        """
+        self._run_batch([], "ip", plan.host_ip)
+
+        interfaces: Dict[int, Set[str]] = {}
+        for pid, lines in plan.ns_ip.items():
+            ns = ["nsenter", "-t", str(pid), "-n"]
+            self._run_batch(ns, "ip", lines)
+            self._run_batch(ns, "tc", plan.ns_tc.get(pid, []))
+            try:
+                interfaces[pid] = set(self._ns_interfaces(pid))
+            except subprocess.CalledProcessError:
+                interfaces[pid] = set()
+
+        return {
+            link_id
+            for link_id, ((pid_a, iface_a), (pid_b, iface_b)) in plan.expected.items()
+            if iface_a in interfaces.get(pid_a, ()) and iface_b in interfaces.get(pid_b, ())
+        }
 
     def create_veth_link(
         self,
@@ -26,7 +503,8 @@ class NetworkManager:
         container_b_iface: str,
         bandwidth: Optional[str] = None,
         delay_ms: Optional[int] = None,
-        loss_percent: Optional[float] = None
+        loss_percent: Optional[float] = None,
+        **netem
     ) -> bool:
         """
         Create a veth pair link between two containers
@@ -39,78 +517,37 @@ class NetworkManager:
             bandwidth: Bandwidth limit (e.g., '1gbit', '100mbit')
             delay_ms: Network delay in milliseconds
             loss_percent: Packet loss percentage
+            **netem: Further Impairment fields (jitter_ms, reorder_percent, ...)
 
         Returns:
             True if successful, False otherwise
         """
         try:
             # Get container PIDs for namespace manipulation
-            container_a = self.client.containers.get(container_a_id)
-            container_b = self.client.containers.get(container_b_id)
-
-            pid_a = container_a.attrs['State']['Pid']
-            pid_b = container_b.attrs['State']['Pid']
+            pid_a = self._get_pid(container_a_id)
+            pid_b = self._get_pid(container_b_id)
 
             # Generate veth pair names (unique to avoid conflicts)
-            veth_a = f"veth{pid_a}_{container_a_iface.replace('/', '_')}"
-            veth_b = f"veth{pid_b}_{container_b_iface.replace('/', '_')}"
-
-            # Truncate to 15 chars (Linux interface name limit)
-            veth_a = veth_a[:15]
-            veth_b = veth_b[:15]
+            veth_a = veth_name(pid_a, container_a_iface)
+            veth_b = veth_name(pid_b, container_b_iface)
 
             logger.info(f"Creating veth pair: {veth_a} <-> {veth_b}")
 
-            # Create veth pair in host namespace
-            subprocess.run(
-                ["ip", "link", "add", veth_a, "type", "veth", "peer", "name", veth_b],
-                check=True,
-                capture_output=True
-            )
-
-            # Move veth_a into container A's namespace
-            subprocess.run(
-                ["ip", "link", "set", veth_a, "netns", str(pid_a)],
-                check=True,
-                capture_output=True
-            )
-
-            # Move veth_b into container B's namespace
-            subprocess.run(
-                ["ip", "link", "set", veth_b, "netns", str(pid_b)],
-                check=True,
-                capture_output=True
-            )
-
-            # Rename interfaces inside containers and bring them up
-            # Container A
-            subprocess.run(
-                ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "set", veth_a, "name", container_a_iface],
-                check=True,
-                capture_output=True
-            )
-            subprocess.run(
-                ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "set", container_a_iface, "up"],
-                check=True,
-                capture_output=True
-            )
-
-            # Container B
-            subprocess.run(
-                ["nsenter", "-t", str(pid_b), "-n", "ip", "link", "set", veth_b, "name", container_b_iface],
-                check=True,
-                capture_output=True
-            )
-            subprocess.run(
-                ["nsenter", "-t", str(pid_b), "-n", "ip", "link", "set", container_b_iface, "up"],
-                check=True,
-                capture_output=True
-            )
+            if self.netlink:
+                self.netlink.create_veth_link(
+                    pid_a, veth_a, container_a_iface,
+                    pid_b, veth_b, container_b_iface
+                )
+            else:
+                self._create_veth_link_subprocess(
+                    pid_a, veth_a, container_a_iface,
+                    pid_b, veth_b, container_b_iface
+                )
 
             # Apply traffic control if specified
-            if bandwidth or delay_ms or loss_percent:
-                self._apply_tc(pid_a, container_a_iface, bandwidth, delay_ms, loss_percent)
-                self._apply_tc(pid_b, container_b_iface, bandwidth, delay_ms, loss_percent)
+            if bandwidth or delay_ms or loss_percent or any(netem.values()):
+                self._apply_tc(pid_a, container_a_iface, bandwidth, delay_ms, loss_percent, **netem)
+                self._apply_tc(pid_b, container_b_iface, bandwidth, delay_ms, loss_percent, **netem)
 
             logger.info(f"Successfully created link: {container_a_id[:12]}:{container_a_iface} <-> {container_b_id[:12]}:{container_b_iface}")
             return True
@@ -125,21 +562,115 @@ class NetworkManager:
             logger.error(f"Unexpected error creating link: {e}")
             return False
 
+    def _create_veth_link_subprocess(
+        self,
+        pid_a: int,
+        veth_a: str,
+        container_a_iface: str,
+        pid_b: int,
+        veth_b: str,
+        container_b_iface: str
+    ) -> None:
+        """Create, move, rename and bring up a veth pair with ip/nsenter"""
+        # Create veth pair in host namespace
+        self._exec(
+            ["ip", "link", "add", veth_a, "type", "veth", "peer", "name", veth_b],
+            check=True,
+            capture_output=True
+        )
+
+        # Move veth_a into container A's namespace
+        self._exec(
+            ["ip", "link", "set", veth_a, "netns", str(pid_a)],
+            check=True,
+            capture_output=True
+        )
+
+        # Move veth_b into container B's namespace
+        self._exec(
+            ["ip", "link", "set", veth_b, "netns", str(pid_b)],
+            check=True,
+            capture_output=True
+        )
+
+        # Rename interfaces inside containers and bring them up
+        # Container A
+        self._exec(
+            ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "set", veth_a, "name", container_a_iface],
+            check=True,
+            capture_output=True
+        )
+        self._exec(
+            ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "set", container_a_iface, "up"],
+            check=True,
+            capture_output=True
+        )
+
+        # Container B
+        self._exec(
+            ["nsenter", "-t", str(pid_b), "-n", "ip", "link", "set", veth_b, "name", container_b_iface],
+            check=True,
+            capture_output=True
+        )
+        self._exec(
+            ["nsenter", "-t", str(pid_b), "-n", "ip", "link", "set", container_b_iface, "up"],
+            check=True,
+            capture_output=True
+        )
+
+    def create_vxlan_endpoint(
+        self,
+        container_id: str,
+        interface: str,
+        vni: int,
+        remote: str,
+        local: Optional[str] = None,
+        in_namespace: bool = False,
+        bandwidth: Optional[str] = None,
+        delay_ms: Optional[int] = None,
+        loss_percent: Optional[float] = None,
+        **netem
+    ) -> bool:
+        """
+        Create one end of a cross-host link as a VXLAN interface (see vxlan_commands)
+
+        The peer host creates the other end with the same VNI; impairment is
+        applied to this end the same way as on a veth.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            pid = self._get_pid(container_id)
+            for args in vxlan_commands(pid, interface, vni, remote, local, in_namespace):
+                self._exec(args, check=True, capture_output=True)
+
+            if bandwidth or delay_ms or loss_percent or any(netem.values()):
+                self._apply_tc(pid, interface, bandwidth, delay_ms, loss_percent, **netem)
+
+            logger.info(f"Created VXLAN endpoint {container_id[:12]}:{interface} (vni {vni} -> {remote})")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode() if isinstance(e.stderr, bytes) else e.stderr
+            logger.error(f"Failed to create VXLAN endpoint: {stderr or e}")
+            return False
+        except DockerException as e:
+            logger.error(f"Docker error creating VXLAN endpoint: {e}")
+            return False
+
     def _apply_tc(
         self,
         pid: int,
         interface: str,
         bandwidth: Optional[str] = None,
         delay_ms: Optional[int] = None,
-        loss_percent: Optional[float] = None
+        loss_percent: Optional[float] = None,
+        **netem
     ) -> None:
         """
         Apply traffic control (tc) to interface for network impairment.
-
-        Linux only permits one root qdisc per interface.  When both bandwidth
-        limiting and netem impairment are requested we chain them:
-          root → tbf (rate limiting) → netem (delay / loss) as a child qdisc.
-        When only one type is requested a single root qdisc suffices.
+        See Impairment.qdisc_commands() for the qdisc layout.
 
         Args:
             pid: Container PID
@@ -147,49 +678,171 @@ class NetworkManager:
             bandwidth: Bandwidth limit (e.g., '1gbit')
             delay_ms: Network delay in milliseconds
             loss_percent: Packet loss percentage
+            **netem: Further Impairment fields (jitter_ms, reorder_percent, ...)
         """
+        imp = Impairment(bandwidth, delay_ms, loss_percent, **netem)
+
+        if self._netlink_for(imp):
+            try:
+                self.netlink.apply_tc(pid, interface, imp)
+                logger.info(f"Applied tc to {interface} via netlink")
+            except Exception as e:
+                logger.warning(f"Failed to apply tc via netlink: {e}")
+            return
+
+        ns = ["nsenter", "-t", str(pid), "-n"]
+
         try:
-            netem_params = []
-            if delay_ms:
-                netem_params.extend(["delay", f"{delay_ms}ms"])
-            if loss_percent:
-                netem_params.extend(["loss", f"{loss_percent}%"])
+            for args in imp.qdisc_commands(interface):
+                self._exec(ns + ["tc"] + args, check=True, capture_output=True)
+            logger.info(f"Applied tc to {interface}: {' '.join(imp.netem_args())} rate={bandwidth}")
+
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Failed to apply tc: {e.stderr.decode() if e.stderr else str(e)}")
+
+    def set_impairment(
+        self,
+        container_id: str,
+        interface: str,
+        bandwidth: Optional[str] = None,
+        delay_ms: Optional[int] = None,
+        loss_percent: Optional[float] = None,
+        previous: Optional[Dict[str, Optional[float]]] = None,
+        pid: Optional[int] = None,
+        **netem
+    ) -> bool:
+        """
+        Change the impairment of an existing interface
+
+        With the `previous` impairment known the qdiscs are replaced in place
+        (see Impairment.update_commands), as one `tc -batch` process that stops at
+        the first error.  Without it whatever root qdisc the interface has is
+        removed and the requested layout installed afresh.
+
+        Args:
+            container_id: Container ID
+            interface: Interface name
+            bandwidth: Bandwidth limit (e.g., '1gbit')
+            delay_ms: Network delay in milliseconds
+            loss_percent: Packet loss percentage
+            previous: Impairment currently installed, if known
+            pid: Container PID, if already resolved (skips a Docker inspect)
+            **netem: Further Impairment fields (jitter_ms, reorder_percent, ...)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        imp = Impairment(bandwidth, delay_ms, loss_percent, **netem)
+        try:
+            pid = pid or self._get_pid(container_id)
+            if self._netlink_for(imp):
+                if previous is None:
+                    self.netlink.clear_tc(pid, interface)
+                    previous = impairment()
+                self.netlink.update_tc(pid, interface, previous, imp)
+                return True
 
             ns = ["nsenter", "-t", str(pid), "-n"]
+            if previous is None:
+                # Fails harmlessly when the interface only has the default qdisc
+                self._exec(ns + ["tc", "qdisc", "del", "dev", interface, "root"], capture_output=True)
+                previous = impairment()
+
+            lines = [" ".join(args) for args in imp.update_commands(interface, previous)]
+            if lines:
+                self._exec(
+                    ns + ["tc", "-batch", "-"],
+                    input="\n".join(lines) + "\n",
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
+            logger.info(
+                f"Set tc on {container_id[:12]}:{interface}: "
+                f"{' '.join(imp.netem_args())} rate={bandwidth}"
+            )
+            return True
 
-            if bandwidth and netem_params:
-                # Chain: root tbf → child netem (handle 1: / parent 1:1)
-                tbf_cmd = ns + [
-                    "tc", "qdisc", "add", "dev", interface,
-                    "root", "handle", "1:", "tbf",
-                    "rate", bandwidth, "burst", "32kbit", "latency", "50ms"
-                ]
-                subprocess.run(tbf_cmd, check=True, capture_output=True)
-
-                netem_cmd = ns + [
-                    "tc", "qdisc", "add", "dev", interface,
-                    "parent", "1:1", "handle", "10:", "netem"
-                ] + netem_params
-                subprocess.run(netem_cmd, check=True, capture_output=True)
-                logger.info(f"Applied tc tbf+netem to {interface}: rate={bandwidth} {' '.join(netem_params)}")
-
-            elif bandwidth:
-                cmd = ns + [
-                    "tc", "qdisc", "add", "dev", interface, "root", "tbf",
-                    "rate", bandwidth, "burst", "32kbit", "latency", "50ms"
-                ]
-                subprocess.run(cmd, check=True, capture_output=True)
-                logger.info(f"Applied tc tbf to {interface}: rate {bandwidth}")
-
-            elif netem_params:
-                cmd = ns + [
-                    "tc", "qdisc", "add", "dev", interface, "root", "netem"
-                ] + netem_params
-                subprocess.run(cmd, check=True, capture_output=True)
-                logger.info(f"Applied tc netem to {interface}: {' '.join(netem_params)}")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to set impairment on {interface}: {e.stderr.strip() if e.stderr else str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to set impairment on {interface}: {e}")
+            return False
+
+    def set_link_state(self, container_id: str, interface: str, up: bool, pid: Optional[int] = None) -> bool:
+        """
+        Bring an interface administratively up or down, keeping the veth and its qdiscs
+
+        Args:
+            container_id: Container ID
+            interface: Interface name
+            up: True for up, False for down
+            pid: Container PID, if already resolved (skips a Docker inspect)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        state = "up" if up else "down"
+        try:
+            pid = pid or self._get_pid(container_id)
+            if self.netlink:
+                self.netlink.set_state(pid, interface, state)
+            else:
+                self._exec(
+                    ["nsenter", "-t", str(pid), "-n", "ip", "link", "set", interface, state],
+                    check=True,
+                    capture_output=True
+                )
+            return True
 
         except subprocess.CalledProcessError as e:
-            logger.warning(f"Failed to apply tc: {e.stderr.decode() if e.stderr else str(e)}")
+            logger.error(f"Failed to set {interface} {state}: {e.stderr.decode() if e.stderr else str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to set {interface} {state}: {e}")
+            return False
+
+    def get_impairments(self, container_id: str) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Read the impairment of every interface in a container (see parse_qdiscs)
+
+        Args:
+            container_id: Container ID
+
+        Returns:
+            Normalized impairment keyed by interface name
+        """
+        pid = self._get_pid(container_id)
+        result = self._exec(
+            ["nsenter", "-t", str(pid), "-n", "tc", "qdisc", "show"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return parse_qdiscs(result.stdout)
+
+    def delete_interface(self, container_id: str, interface: str) -> bool:
+        """Delete one veth end inside a container (the kernel removes the peer)"""
+        try:
+            pid = self._get_pid(container_id)
+            if self.netlink:
+                self.netlink.delete_link(pid, interface)
+            else:
+                self._exec(
+                    ["nsenter", "-t", str(pid), "-n", "ip", "link", "delete", interface],
+                    check=True,
+                    capture_output=True
+                )
+            logger.info(f"Deleted interface {container_id[:12]}:{interface}")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to delete interface: {e.stderr.decode() if e.stderr else str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to delete interface: {e}")
+            return False
 
     def delete_link(
         self,
@@ -211,15 +864,17 @@ class NetworkManager:
             True if successful, False otherwise
         """
         try:
-            container_a = self.client.containers.get(container_a_id)
-            pid_a = container_a.attrs['State']['Pid']
+            pid_a = self._get_pid(container_a_id)
 
             # Deleting one end of veth pair automatically deletes the other
-            subprocess.run(
-                ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "delete", container_a_iface],
-                check=True,
-                capture_output=True
-            )
+            if self.netlink:
+                self.netlink.delete_link(pid_a, container_a_iface)
+            else:
+                self._exec(
+                    ["nsenter", "-t", str(pid_a), "-n", "ip", "link", "delete", container_a_iface],
+                    check=True,
+                    capture_output=True
+                )
 
             logger.info(f"Deleted link: {container_a_id[:12]}:{container_a_iface} <-> {container_b_id[:12]}:{container_b_iface}")
             return True
@@ -245,28 +900,81 @@ class NetworkManager:
             List of interface names
         """
         try:
-            container = self.client.containers.get(container_id)
-            pid = container.attrs['State']['Pid']
-
-            result = subprocess.run(
-                ["nsenter", "-t", str(pid), "-n", "ip", "-o", "link", "show"],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-
-            interfaces = []
-            for line in result.stdout.strip().split('\n'):
-                # Parse "2: eth0: <BROADCAST,MULTICAST,UP,LOWER_UP> ..."
-                parts = line.split(':')
-                if len(parts) >= 2:
-                    iface = parts[1].strip()
-                    # Skip loopback
-                    if iface != 'lo':
-                        interfaces.append(iface)
-
-            return interfaces
+            return self._ns_interfaces(self._get_pid(container_id))
 
         except (subprocess.CalledProcessError, DockerException) as e:
             logger.error(f"Failed to list interfaces: {e}")
             return []
+
+    def list_veths(self, container_id: str) -> Dict[str, Tuple[int, int]]:
+        """
+        List the veth interfaces of a container with their peers (see parse_veths)
+
+        Args:
+            container_id: Container ID
+
+        Returns:
+            (ifindex, peer ifindex) keyed by interface name
+        """
+        pid = self._get_pid(container_id)
+        result = self._exec(
+            ["nsenter", "-t", str(pid), "-n", "ip", "-o", "link", "show", "type", "veth"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return parse_veths(result.stdout)
+
+    def list_vxlans(self, container_id: str) -> List[str]:
+        """List the VXLAN interfaces (cross-host link ends) of a container"""
+        pid = self._get_pid(container_id)
+        result = self._exec(
+            ["nsenter", "-t", str(pid), "-n", "ip", "-o", "link", "show", "type", "vxlan"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return [
+            line.split(":")[1].strip().split("@")[0]
+            for line in result.stdout.splitlines() if line.count(":") >= 2
+        ]
+
+    def list_host_veths(self) -> List[str]:
+        """List NEON veth ends left in the host namespace (see parse_host_veths)"""
+        result = self._exec(
+            ["ip", "-o", "link", "show", "type", "veth"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        return parse_host_veths(result.stdout)
+
+    def delete_host_veths(self, names: List[str]) -> bool:
+        """
+        Delete host-namespace veths with one `ip -batch`
+
+        Deleting one end removes its peer too, so lines for already-removed
+        peers fail harmlessly; callers list again to see what is left.
+        """
+        return self._run_batch([], "ip", [f"link del {name}" for name in names])
+
+    def _ns_interfaces(self, pid: int) -> List[str]:
+        """List non-loopback interfaces in the network namespace of `pid`"""
+        result = self._exec(
+            ["nsenter", "-t", str(pid), "-n", "ip", "-o", "link", "show"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+
+        interfaces = []
+        for line in result.stdout.strip().split('\n'):
+            # Parse "2: eth0@if7: <BROADCAST,MULTICAST,UP,LOWER_UP> ..."
+            parts = line.split(':')
+            if len(parts) >= 2:
+                iface = parts[1].strip().split('@')[0]
+                # Skip loopback
+                if iface != 'lo':
+                    interfaces.append(iface)
+
+        return interfaces
@@ -0,0 +1,193 @@
+"""
+Orphan Collector for NEON
+Finds and reclaims containers and host veths leaked by crashed or failed deploys
+"""
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Node
+from app.runtime.pool import POOL_NAME_PREFIX
+
+if TYPE_CHECKING:
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+
+class OrphanCollector:
+    """
+    Periodic garbage collection of leaked runtime resources.
+
+    A container is orphaned when it carries `neon.managed=true` but no
+    Node.container_id references it (idle warm pool containers are skipped);
+    a veth is orphaned when a `veth<pid>_*` end is still in the host
+    namespace.  Deploys and link creation are not locked out, so a resource
+    is only reclaimed once it has been seen orphaned for `grace` seconds:
+    a container created moments before its node row is committed is not
+    removed from under the deploy.  Leaked qdiscs go away with their veth.
+    """
+
+    def __init__(self, runtime: "RuntimeManager"):
+        self.runtime = runtime
+        self.last_report: Optional[Dict] = None
+        # "container:<id>" / "veth:<name>" -> monotonic time first seen orphaned
+        self._suspects: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Run a collection pass every ORPHAN_GC_INTERVAL seconds"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"Orphan collector started (every {settings.ORPHAN_GC_INTERVAL}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.collect(dry_run=settings.ORPHAN_GC_DRY_RUN)
+            except Exception as e:
+                logger.error(f"Orphan collection failed: {e}")
+            await asyncio.sleep(max(1, settings.ORPHAN_GC_INTERVAL))
+
+    @staticmethod
+    def _known_container_ids() -> Set[str]:
+        db = SessionLocal()
+        try:
+            rows = db.query(Node.container_id).filter(Node.container_id.isnot(None)).all()
+            return {row[0] for row in rows}
+        finally:
+            db.close()
+
+    def _age(self, key: str, now: float) -> float:
+        return now - self._suspects.setdefault(key, now)
+
+    async def collect(self, dry_run: bool = False, grace: Optional[float] = None) -> Dict:
+        """
+        Run one collection pass
+
+        Args:
+            dry_run: Only report what would be reclaimed
+            grace: Seconds a resource must have been orphaned (default ORPHAN_GC_GRACE)
+
+        Returns:
+            Report of orphaned resources and what was done with each
+        """
+        grace = settings.ORPHAN_GC_GRACE if grace is None else grace
+        async with self._lock:
+            report = await self._collect(dry_run, grace)
+        self.last_report = report
+        return report
+
+    async def _collect(self, dry_run: bool, grace: float) -> Dict:
+        run, docker, network = self.runtime._run, self.runtime.docker, self.runtime.network
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc).isoformat()
+
+        # List before reading the nodes table: a container created after the
+        # read is then never mistaken for an orphan
+        containers, veths = await asyncio.gather(
+            run(docker.list_neon_containers),
+            run(network.list_host_veths)
+        )
+        known = await asyncio.to_thread(self._known_container_ids)
+
+        orphans = [
+            c for c in containers
+            if c["id"] not in known and not c["name"].startswith(POOL_NAME_PREFIX)
+        ]
+
+        now = time.monotonic()
+        candidates = {f"container:{c['id']}" for c in orphans} | {f"veth:{name}" for name in veths}
+        self._suspects = {key: seen for key, seen in self._suspects.items() if key in candidates}
+
+        container_entries = [
+            {
+                "id": c["id"],
+                "name": c["name"],
+                "status": c["status"],
+                "age_s": round(self._age(f"container:{c['id']}", now), 1)
+            }
+            for c in orphans
+        ]
+        veth_entries = [{"name": name, "age_s": round(self._age(f"veth:{name}", now), 1)} for name in veths]
+
+        ripe_containers = [e for e in container_entries if e["age_s"] >= grace]
+        ripe_veths = [e for e in veth_entries if e["age_s"] >= grace]
+        for entry in container_entries + veth_entries:
+            entry["action"] = "pending"
+        for entry in ripe_containers + ripe_veths:
+            entry["action"] = "would_reclaim" if dry_run else "reclaimed"
+
+        if not dry_run:
+            await asyncio.gather(
+                self._remove_containers(ripe_containers),
+                self._delete_veths(ripe_veths)
+            )
+            for entry in ripe_containers:
+                if entry["action"] == "reclaimed":
+                    self._suspects.pop(f"container:{entry['id']}", None)
+            for entry in ripe_veths:
+                if entry["action"] == "reclaimed":
+                    self._suspects.pop(f"veth:{entry['name']}", None)
+
+        report = {
+            "dry_run": dry_run,
+            "grace_s": grace,
+            "started_at": started_at,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "containers": container_entries,
+            "veths": veth_entries,
+            "reclaimed": {
+                "containers": sum(1 for e in container_entries if e["action"] == "reclaimed"),
+                "veths": sum(1 for e in veth_entries if e["action"] == "reclaimed")
+            }
+        }
+
+        if orphans or veths:
+            logger.info(
+                f"Orphan collection{' (dry run)' if dry_run else ''}: "
+                f"{len(orphans)} container(s), {len(veths)} veth(s) orphaned; "
+                f"reclaimed {report['reclaimed']['containers']} container(s), {report['reclaimed']['veths']} veth(s)"
+            )
+        return report
+
+    async def _remove_containers(self, entries: List[Dict]) -> None:
+        run, docker = self.runtime._run, self.runtime.docker
+        semaphore = asyncio.Semaphore(max(1, settings.DEPLOY_CONCURRENCY))
+
+        async def _remove(entry: Dict) -> None:
+            async with semaphore:
+                try:
+                    await run(docker.remove_container, entry["id"])
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 404:
+                        entry["action"] = "failed"
+                        entry["error"] = str(e)
+
+        await asyncio.gather(*(_remove(entry) for entry in entries))
+
+    async def _delete_veths(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+        run, network = self.runtime._run, self.runtime.network
+        try:
+            await run(network.delete_host_veths, [e["name"] for e in entries])
+            remaining = set(await run(network.list_host_veths))
+        except Exception as e:
+            logger.warning(f"Failed to delete orphaned veths: {e}")
+            remaining = {entry["name"] for entry in entries}
+
+        for entry in entries:
+            if entry["name"] in remaining:
+                entry["action"] = "failed"
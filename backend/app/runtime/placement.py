@@ -0,0 +1,311 @@
+"""
+Node Placement for NEON
+Partitions a lab's link graph over Docker hosts, minimizing cross-host links under per-host capacity
+"""
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+import heapq
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# CPU and memory (MB) of a node, or free on a host
+Demand = Tuple[float, float]
+
+# Refinement passes per bisection; each pass that gains nothing ends it early
+FM_PASSES = 8
+
+
+def cut_size(edges: Iterable[Tuple[Hashable, Hashable]], placement: Dict[Hashable, str]) -> int:
+    """Number of edges whose ends are placed on different hosts"""
+    return sum(
+        1 for a, b in edges
+        if a in placement and b in placement and placement[a] != placement[b]
+    )
+
+
+def place(
+    nodes: Sequence[Hashable],
+    edges: Iterable[Tuple[Hashable, Hashable]],
+    demand: Dict[Hashable, Demand],
+    capacity: Dict[str, Demand],
+    pinned: Optional[Dict[Hashable, str]] = None,
+    imbalance: float = 0.1
+) -> Dict[Hashable, str]:
+    """
+    Assign nodes to hosts so that few edges cross hosts
+
+    The hosts are split recursively into two groups of similar capacity.
+    At each split the nodes are bisected: a region is grown breadth-first
+    from a peripheral node up to the first group's share, then refined with
+    Fiduccia-Mattheyses passes (moving the node whose move removes the
+    most cut edges, keeping the best prefix of moves).  Each host's CPU
+    and memory stay within its capacity share of the demand plus
+    `imbalance` (spread over the levels of the recursion), and within its
+    free capacity when the demand fits at all.
+
+    Args:
+        nodes: Node IDs to place
+        edges: Links as (node ID, node ID); parallel links weigh more
+        demand: CPU and memory per node in `nodes`
+        capacity: Free CPU and memory per host
+        pinned: Host of nodes that are already placed; they are not moved
+            and, being deployed, do not count against capacity
+        imbalance: Allowed overshoot of a host group's share, as a fraction
+
+    Returns:
+        Host per node in `nodes`
+    """
+    pinned = {node: host for node, host in (pinned or {}).items() if host in capacity}
+    ids = list(dict.fromkeys([*nodes, *pinned]))
+    index = {node: i for i, node in enumerate(ids)}
+
+    adjacency: List[Dict[int, int]] = [{} for _ in ids]
+    for a, b in edges:
+        i, j = index.get(a), index.get(b)
+        if i is None or j is None or i == j:
+            continue
+        adjacency[i][j] = adjacency[i].get(j, 0) + 1
+        adjacency[j][i] = adjacency[j].get(i, 0) + 1
+
+    weights = [
+        (0.0, 0.0) if node in pinned else tuple(float(x) for x in demand.get(node, (1, 512)))
+        for node in ids
+    ]
+    fixed = [pinned.get(node) for node in ids]
+    result: List[Optional[str]] = list(fixed)
+
+    levels = max(1, math.ceil(math.log2(max(1, len(capacity)))))
+    level_imbalance = (1 + imbalance) ** (1 / levels) - 1
+    _Bisection(adjacency, weights, fixed, capacity, level_imbalance).split(list(range(len(ids))), list(capacity), result)
+    return {node: result[index[node]] for node in nodes}
+
+
+class _Bisection:
+    """Recursive bisection state shared by all levels of one place() call"""
+
+    def __init__(
+        self,
+        adjacency: List[Dict[int, int]],
+        weights: List[Tuple[float, float]],
+        fixed: List[Optional[str]],
+        capacity: Dict[str, Demand],
+        imbalance: float
+    ):
+        self.adjacency = adjacency
+        self.weights = weights
+        self.fixed = fixed
+        self.capacity = capacity
+        self.imbalance = imbalance
+
+    def _total(self, hosts: List[str]) -> List[float]:
+        return [sum(self.capacity[h][d] for h in hosts) for d in (0, 1)]
+
+    def _split_hosts(self, hosts: List[str]) -> Tuple[List[str], List[str]]:
+        """Two host groups of similar capacity (largest hosts dealt first)"""
+        total = self._total(hosts)
+        share = {h: sum(self.capacity[h][d] / total[d] for d in (0, 1) if total[d]) for h in hosts}
+        ordered = sorted(hosts, key=lambda h: (-share[h], h))
+        groups = ([ordered[0]], [ordered[1]])
+        load = [share[ordered[0]], share[ordered[1]]]
+        for host in ordered[2:]:
+            lighter = 0 if load[0] <= load[1] else 1
+            groups[lighter].append(host)
+            load[lighter] += share[host]
+        return groups
+
+    def split(self, vertices: List[int], hosts: List[str], result: List[Optional[str]]) -> None:
+        if len(hosts) == 1:
+            for v in vertices:
+                result[v] = hosts[0]
+            return
+        if not vertices:
+            return
+
+        left, right = self._split_hosts(hosts)
+        side = self._bisect(vertices, set(left), self._total(left), self._total(right))
+        self.split([v for v in vertices if side[v] == 0], left, result)
+        self.split([v for v in vertices if side[v] == 1], right, result)
+
+    def _bounds(self, vertices: List[int], cap: List[List[float]]) -> Tuple[List[float], List[List[float]], List[float]]:
+        """Left share of the demand per dimension, and upper load bounds per side"""
+        total = [sum(self.weights[v][d] for v in vertices) for d in (0, 1)]
+        heaviest = [max((self.weights[v][d] for v in vertices), default=0.0) for d in (0, 1)]
+        share, upper = [], [[0.0, 0.0], [0.0, 0.0]]
+        for d in (0, 1):
+            available = cap[0][d] + cap[1][d]
+            fraction = cap[0][d] / available if available else 0.5
+            share.append(fraction)
+            for s, part in ((0, fraction), (1, 1 - fraction)):
+                bound = part * total[d] + max(self.imbalance * part * total[d], heaviest[d])
+                if total[d] <= available:
+                    bound = max(part * total[d], min(bound, cap[s][d]))
+                upper[s][d] = bound
+        return share, upper, total
+
+    def _bisect(
+        self,
+        vertices: List[int],
+        left_hosts: set,
+        cap_left: List[float],
+        cap_right: List[float]
+    ) -> Dict[int, int]:
+        """Side (0 left, 1 right) per vertex, cut-minimized within the load bounds"""
+        adjacency, weights = self.adjacency, self.weights
+        members = set(vertices)
+        share, upper, total = self._bounds(vertices, [cap_left, cap_right])
+
+        side = {v: 1 for v in vertices}
+        locked = set()
+        load = [[0.0, 0.0], list(total)]
+        for v in vertices:
+            if self.fixed[v] is not None:
+                locked.add(v)
+                if self.fixed[v] in left_hosts:
+                    self._move(v, side, load)
+
+        # Grow the left region from a peripheral vertex, most-connected first,
+        # until it holds its share of the demand (averaged over CPU and memory)
+        dimensions = [d for d in (0, 1) if total[d]]
+        target = sum(share[d] for d in dimensions) / max(1, len(dimensions))
+        filled = lambda: sum(load[0][d] / total[d] for d in dimensions) / max(1, len(dimensions))
+        connection = {v: 0 for v in vertices}
+        heap: List[Tuple[int, int, int]] = []
+        counter = 0
+        for v in vertices:
+            if side[v] == 0:
+                for u, w in adjacency[v].items():
+                    if u in members and side[u] == 1:
+                        connection[u] += w
+        for u, c in connection.items():
+            if c and u not in locked:
+                heapq.heappush(heap, (-c, counter, u))
+                counter += 1
+
+        # New regions start away from nodes pinned to the right
+        pulled = {
+            v: sum(w for u, w in adjacency[v].items() if u in locked and side[u] == 1)
+            for v in vertices
+        }
+        remaining = sorted(
+            (v for v in self._peripheral_order(vertices, members) if v not in locked),
+            key=lambda v: pulled[v]
+        )
+        cursor = 0
+        while filled() < target:
+            v = None
+            while heap:
+                negative, _, u = heapq.heappop(heap)
+                if side[u] == 1 and -negative == connection[u]:
+                    v = u
+                    break
+            while v is None and cursor < len(remaining):
+                if side[remaining[cursor]] == 1:
+                    v = remaining[cursor]
+                cursor += 1
+            if v is None:
+                break
+            if any(load[0][d] + weights[v][d] > upper[0][d] for d in (0, 1)):
+                continue
+            self._move(v, side, load)
+            for u, w in adjacency[v].items():
+                if u in members and side[u] == 1 and u not in locked:
+                    connection[u] += w
+                    heapq.heappush(heap, (-connection[u], counter, u))
+                    counter += 1
+
+        for _ in range(FM_PASSES):
+            if not self._refine(vertices, members, side, load, upper, locked):
+                break
+        return side
+
+    def _peripheral_order(self, vertices: List[int], members: set) -> List[int]:
+        """Vertices in BFS order from a vertex far from the first one, per component"""
+        order, seen = [], set()
+        for start in vertices:
+            if start in seen:
+                continue
+            # Two sweeps: the last vertex reached from `start` is peripheral
+            component = self._bfs(start, members)
+            far = component[-1]
+            for v in self._bfs(far, members):
+                seen.add(v)
+                order.append(v)
+        return order
+
+    def _bfs(self, start: int, members: set) -> List[int]:
+        order, seen, queue = [], {start}, deque([start])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for u in self.adjacency[v]:
+                if u in members and u not in seen:
+                    seen.add(u)
+                    queue.append(u)
+        return order
+
+    def _move(self, v: int, side: Dict[int, int], load: List[List[float]]) -> None:
+        source = side[v]
+        for d in (0, 1):
+            load[source][d] -= self.weights[v][d]
+            load[1 - source][d] += self.weights[v][d]
+        side[v] = 1 - source
+
+    def _refine(
+        self,
+        vertices: List[int],
+        members: set,
+        side: Dict[int, int],
+        load: List[List[float]],
+        upper: List[List[float]],
+        locked: set
+    ) -> bool:
+        """
+        One Fiduccia-Mattheyses pass
+
+        Returns:
+            Whether the pass reduced the cut
+        """
+        adjacency, weights = self.adjacency, self.weights
+        gain: Dict[int, int] = {}
+        heap: List[Tuple[int, int]] = []
+        for v in vertices:
+            if v in locked:
+                continue
+            g = 0
+            for u, w in adjacency[v].items():
+                if u in members:
+                    g += w if side[u] != side[v] else -w
+            gain[v] = g
+            heap.append((-g, v))
+        heapq.heapify(heap)
+
+        moved: List[int] = []
+        done = set()
+        cut_change, best_change, best_length = 0, 0, 0
+        while heap:
+            negative, v = heapq.heappop(heap)
+            if v in done or -negative != gain[v]:
+                continue
+            done.add(v)
+            target = 1 - side[v]
+            if any(load[target][d] + weights[v][d] > upper[target][d] for d in (0, 1)):
+                continue
+
+            source = side[v]
+            self._move(v, side, load)
+            moved.append(v)
+            cut_change -= gain[v]
+            for u, w in adjacency[v].items():
+                if u not in gain or u in done:
+                    continue
+                gain[u] += 2 * w if side[u] == source else -2 * w
+                heapq.heappush(heap, (-gain[u], u))
+
+            if cut_change < best_change:
+                best_change, best_length = cut_change, len(moved)
+
+        for v in reversed(moved[best_length:]):
+            self._move(v, side, load)
+        return best_change < 0
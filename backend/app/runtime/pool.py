@@ -0,0 +1,273 @@
+"""
+Warm Container Pool for NEON
+Keeps pre-booted containers per image so node deploys skip the boot wait
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+import asyncio
+import logging
+import uuid
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models import Image, Node
+
+if TYPE_CHECKING:
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+POOL_LABEL = "neon.pool"
+POOL_NAME_PREFIX = "neon_pool_"
+
+
+def image_environment(image: Image) -> Dict[str, str]:
+    """Environment variables every container of an image is created with"""
+    environment = {}
+    if image.default_credentials:
+        environment.update({
+            "DEFAULT_USER": image.default_credentials.get("username", "admin"),
+            "DEFAULT_PASSWORD": image.default_credentials.get("password", "admin")
+        })
+    return environment
+
+
+@dataclass
+class PoolSpec:
+    """How warm containers of one image are created, and how many to keep"""
+    image_id: str
+    image_uri: str
+    cpu: int
+    memory: int
+    environment: Dict[str, str]
+    size: int = 0
+
+    @classmethod
+    def from_image(cls, image: Image) -> "PoolSpec":
+        return cls(
+            image_id=str(image.id),
+            image_uri=image.image_uri,
+            cpu=image.cpu_recommended or 1,
+            memory=image.memory_recommended or 512,
+            environment=image_environment(image),
+            size=image.warm_pool_size or 0
+        )
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    created: int = 0
+    failed: int = 0
+
+
+class WarmPool:
+    """
+    Pre-booted containers per image, claimed by RuntimeManager.deploy_node.
+
+    Warm containers are created with the image's recommended resources and
+    labelled only as pool members (no lab or node labels).  Docker labels
+    cannot be changed after creation, so a claimed container is renamed to
+    the node's `neon_<lab_id>_<node>` name and tracked through
+    Node.container_id from then on.  Each claim schedules a background
+    refill; pool sizes come from Image.warm_pool_size.
+    """
+
+    def __init__(self, runtime: "RuntimeManager"):
+        self.runtime = runtime
+        self.specs: Dict[str, PoolSpec] = {}
+        self.started = False
+        self._idle: Dict[str, Deque[str]] = {}
+        self._stats: Dict[str, PoolStats] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max(1, settings.WARM_POOL_REFILL_CONCURRENCY))
+
+    async def start(self) -> None:
+        """Load pool sizes, adopt warm containers left by a previous run and fill up"""
+        specs = await asyncio.to_thread(self._load_specs)
+        self.specs = {spec.image_id: spec for spec in specs}
+        await self._adopt()
+        self.started = True
+        for image_id in self.specs:
+            self._schedule_refill(image_id)
+        logger.info(f"Warm pool started for {len(self.specs)} image(s)")
+
+    async def stop(self) -> None:
+        """Stop refilling; idle containers are kept and adopted on next start"""
+        self.started = False
+        tasks = list(self._refills.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refills.clear()
+
+    @staticmethod
+    def _load_specs() -> List[PoolSpec]:
+        db = SessionLocal()
+        try:
+            images = db.query(Image).filter(
+                Image.is_active == True,
+                Image.warm_pool_size > 0
+            ).all()
+            return [PoolSpec.from_image(image) for image in images]
+        finally:
+            db.close()
+
+    async def _adopt(self) -> None:
+        run, docker = self.runtime._run, self.runtime.docker
+        containers = await run(docker.list_containers, {"label": [f"{POOL_LABEL}=true"]})
+
+        for container in containers:
+            if not container["name"].startswith(POOL_NAME_PREFIX):
+                continue  # already claimed by a node
+
+            image_id = container["labels"].get("neon.image_id")
+            spec = self.specs.get(image_id)
+            idle = self._idle.setdefault(image_id, deque())
+            if spec and container["status"] == "running" and len(idle) < spec.size:
+                idle.append(container["id"])
+            else:
+                await self._discard(container["id"])
+
+    def _schedule_refill(self, image_id: str) -> None:
+        task = self._refills.get(image_id)
+        if self.started and (task is None or task.done()):
+            self._refills[image_id] = asyncio.create_task(self._refill(image_id))
+
+    async def _refill(self, image_id: str) -> None:
+        stats = self._stats.setdefault(image_id, PoolStats())
+
+        while True:
+            spec = self.specs.get(image_id)
+            idle = self._idle.setdefault(image_id, deque())
+            if not spec or len(idle) >= spec.size:
+                return
+
+            async with self._semaphore:
+                try:
+                    container_id = await self._create_warm(spec)
+                except Exception as e:
+                    # Retried on the next claim rather than in a hot loop
+                    stats.failed += 1
+                    logger.error(f"Failed to create warm container for {spec.image_uri}: {e}")
+                    return
+
+            idle.append(container_id)
+            stats.created += 1
+
+    async def _create_warm(self, spec: PoolSpec) -> str:
+        run, docker = self.runtime._run, self.runtime.docker
+        await self.runtime.puller.ensure(spec.image_uri)
+        container_id = await run(
+            docker.create_container,
+            image=spec.image_uri,
+            name=f"{POOL_NAME_PREFIX}{spec.image_id[:8]}_{uuid.uuid4().hex[:8]}",
+            cpu=spec.cpu,
+            memory=spec.memory,
+            environment=spec.environment,
+            labels={POOL_LABEL: "true", "neon.image_id": spec.image_id}
+        )
+        try:
+            await run(docker.start_container, container_id)
+        except Exception:
+            await self._discard(container_id)
+            raise
+        return container_id
+
+    async def _discard(self, container_id: str) -> None:
+        try:
+            await self.runtime._run(self.runtime.docker.remove_container, container_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove warm container {container_id[:12]}: {e}")
+
+    async def claim(self, node: Node, image: Image, name: str) -> Optional[str]:
+        """
+        Take a running warm container for a node
+
+        Args:
+            node: Node being deployed (its cpu/memory overrides must match the pool's)
+            image: Node's image
+            name: Container name to give the claimed container
+
+        Returns:
+            Container ID, or None on a miss (the caller creates a container)
+        """
+        image_id = str(image.id)
+        spec = self.specs.get(image_id)
+        if not spec or spec.size == 0:
+            return None
+
+        stats = self._stats.setdefault(image_id, PoolStats())
+        if (node.cpu or spec.cpu) != spec.cpu or (node.memory or spec.memory) != spec.memory:
+            stats.misses += 1
+            return None
+
+        run, docker = self.runtime._run, self.runtime.docker
+        idle = self._idle.get(image_id)
+        try:
+            while idle:
+                container_id = idle.popleft()
+                try:
+                    if await run(docker.get_container_status, container_id) != "running":
+                        await self._discard(container_id)
+                        continue
+                    await run(docker.rename_container, container_id, name)
+                except Exception as e:
+                    logger.warning(f"Skipping warm container {container_id[:12]}: {e}")
+                    await self._discard(container_id)
+                    continue
+
+                stats.hits += 1
+                logger.info(f"Claimed warm container {container_id[:12]} for node {node.name}")
+                return container_id
+
+            stats.misses += 1
+            return None
+        finally:
+            self._schedule_refill(image_id)
+
+    async def resize(self, spec: PoolSpec) -> None:
+        """Apply a new pool size for an image (trims idle containers or refills)"""
+        idle = self._idle.setdefault(spec.image_id, deque())
+        if spec.size > 0:
+            self.specs[spec.image_id] = spec
+        else:
+            self.specs.pop(spec.image_id, None)
+
+        excess = []
+        while len(idle) > spec.size:
+            excess.append(idle.pop())
+        await asyncio.gather(*(self._discard(container_id) for container_id in excess))
+
+        self._schedule_refill(spec.image_id)
+
+    def image_stats(self, image_id: str) -> Dict:
+        spec = self.specs.get(image_id)
+        stats = self._stats.get(image_id, PoolStats())
+        requests = stats.hits + stats.misses
+        return {
+            "image_id": image_id,
+            "image_uri": spec.image_uri if spec else None,
+            "size": spec.size if spec else 0,
+            "idle": len(self._idle.get(image_id, ())),
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "hit_rate": round(stats.hits / requests, 3) if requests else None,
+            "created": stats.created,
+            "failed": stats.failed
+        }
+
+    def stats(self) -> Dict:
+        """Pool sizes and hit/miss counters, overall and per image"""
+        images = [self.image_stats(image_id) for image_id in sorted(set(self.specs) | set(self._stats))]
+        hits = sum(i["hits"] for i in images)
+        misses = sum(i["misses"] for i in images)
+        return {
+            "enabled": self.started,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "images": images
+        }
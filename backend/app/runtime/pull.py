@@ -0,0 +1,181 @@
+"""
+Image Pre-Pull Scheduler for NEON
+Pulls catalog images in the background and shares in-flight pulls with deploys
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.services.image_catalog import get_image_catalog
+
+if TYPE_CHECKING:
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+# Engine progress statuses that mean a layer needs no more work
+LAYER_DONE = {"Pull complete", "Already exists"}
+
+
+@dataclass
+class PullProgress:
+    """Progress of one image pull, aggregated from the Engine's per-layer messages"""
+    image_uri: str
+    status: str = "queued"  # queued, checking, pulling, complete, present, error
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    layers: Dict[str, Dict] = field(default_factory=dict)
+
+    def update(self, message: Dict) -> None:
+        """Apply one JSON progress message from the pull stream"""
+        layer_id = message.get("id")
+        status = message.get("status", "")
+        if not layer_id or status.startswith(("Pulling from", "Digest", "Status")):
+            return
+
+        layer = self.layers.setdefault(layer_id, {"status": status, "current": 0, "total": 0})
+        layer["status"] = status
+        detail = message.get("progressDetail") or {}
+        if status == "Downloading" and detail.get("total"):
+            layer["current"] = detail.get("current", 0)
+            layer["total"] = detail["total"]
+        elif status in ("Download complete", "Pull complete"):
+            layer["current"] = layer["total"]
+
+    def to_dict(self) -> Dict:
+        downloaded = sum(layer["current"] for layer in self.layers.values())
+        total = sum(layer["total"] for layer in self.layers.values())
+        return {
+            "image_uri": self.image_uri,
+            "status": self.status,
+            "error": self.error,
+            "layers": len(self.layers),
+            "layers_done": sum(1 for layer in self.layers.values() if layer["status"] in LAYER_DONE),
+            "layers_cached": sum(1 for layer in self.layers.values() if layer["status"] == "Already exists"),
+            "bytes_downloaded": downloaded,
+            "bytes_total": total,
+            "percent": round(100 * downloaded / total, 1) if total else None,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class ImagePuller:
+    """
+    Single owner of image pulls for the runtime.
+
+    Every pull for an image URI runs at most once at a time: callers that
+    need an image which is already being pulled await the same task.
+    Background pre-pulls of the catalog are bounded by
+    IMAGE_PULL_CONCURRENCY; pulls requested by a deploy start immediately.
+    Shared layers are deduplicated by the Docker daemon, and per-layer
+    progress (including layers that already existed locally) is kept for
+    the progress API.
+    """
+
+    def __init__(self, runtime: "RuntimeManager"):
+        self.runtime = runtime
+        self._pulls: Dict[str, asyncio.Task] = {}
+        self._progress: Dict[str, PullProgress] = {}
+        self._present: Set[str] = set()
+        self._semaphore = asyncio.Semaphore(max(1, settings.IMAGE_PULL_CONCURRENCY))
+
+    async def ensure(self, image_uri: str) -> None:
+        """
+        Make sure an image is present locally, joining an in-flight pull if any
+
+        Raises:
+            Exception: whatever the pull raised
+        """
+        if image_uri in self._present:
+            return
+        task = self._pulls.get(image_uri) or self._start(image_uri, bounded=False)
+        # Shielded: a cancelled deploy must not cancel a pull others wait on
+        await asyncio.shield(task)
+
+    def schedule(self, image_uris: Iterable[str]) -> List[str]:
+        """Queue background pulls; returns the URIs that were not already present"""
+        scheduled = []
+        for image_uri in dict.fromkeys(image_uris):
+            if image_uri in self._present:
+                continue
+            if image_uri not in self._pulls:
+                task = self._start(image_uri, bounded=True)
+                # Background pulls have no waiter; errors live in the progress record
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            scheduled.append(image_uri)
+        return scheduled
+
+    async def prefetch_catalog(self) -> List[str]:
+        """Schedule pulls for every active image in the catalog"""
+        image_uris = await asyncio.to_thread(self._catalog_image_uris)
+        scheduled = self.schedule(image_uris)
+        logger.info(f"Pre-pulling {len(scheduled)} of {len(image_uris)} catalog images")
+        return scheduled
+
+    @staticmethod
+    def _catalog_image_uris() -> List[str]:
+        db = SessionLocal()
+        try:
+            return [img.summary["image_uri"] for img in get_image_catalog().load_sync(db).images()]
+        finally:
+            db.close()
+
+    def _start(self, image_uri: str, bounded: bool) -> asyncio.Task:
+        progress = PullProgress(image_uri)
+        self._progress[image_uri] = progress
+        task = asyncio.create_task(self._pull(image_uri, progress, bounded))
+        self._pulls[image_uri] = task
+        task.add_done_callback(lambda _: self._pulls.pop(image_uri, None))
+        return task
+
+    async def _pull(self, image_uri: str, progress: PullProgress, bounded: bool) -> None:
+        if bounded:
+            async with self._semaphore:
+                await self._pull_now(image_uri, progress)
+        else:
+            await self._pull_now(image_uri, progress)
+
+    async def _pull_now(self, image_uri: str, progress: PullProgress) -> None:
+        run, docker = self.runtime._run, self.runtime.docker
+        progress.started_at = time.time()
+        try:
+            progress.status = "checking"
+            if await run(docker.image_exists, image_uri):
+                progress.status = "present"
+            else:
+                progress.status = "pulling"
+                await run(docker.pull_image, image_uri, on_progress=progress.update)
+                progress.status = "complete"
+            self._present.add(image_uri)
+        except Exception as e:
+            progress.status = "error"
+            progress.error = str(e)
+            logger.error(f"Failed to pull {image_uri}: {e}")
+            raise
+        finally:
+            progress.finished_at = time.time()
+
+    def forget(self, image_uri: str) -> None:
+        """Drop the 'present' mark for an image (e.g. after it was removed)"""
+        self._present.discard(image_uri)
+
+    def progress(self) -> List[Dict]:
+        """Progress of every pull since startup, most recent first"""
+        return sorted(
+            (p.to_dict() for p in self._progress.values()),
+            key=lambda p: p["started_at"] or float("inf"),
+            reverse=True
+        )
+
+    async def stop(self) -> None:
+        """Cancel in-flight pulls"""
+        tasks = list(self._pulls.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
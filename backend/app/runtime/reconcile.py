@@ -0,0 +1,191 @@
+"""
+Lab Reconciler for NEON
+Diffs a lab's desired topology (DB) against its containers and veth interfaces
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from app.db.models import Link, Node
+from app.runtime.network import Impairment, impairment, impairment_matches
+
+if TYPE_CHECKING:
+    from app.runtime.manager import RuntimeManager
+
+logger = logging.getLogger(__name__)
+
+# Interfaces Docker attaches to every container; never treated as lab links
+MGMT_INTERFACES = {"eth0"}
+
+
+@dataclass
+class ObservedContainer:
+    """A lab container as found on the host"""
+    id: str
+    name: str
+    status: str
+    image: Optional[str]
+    # interface -> (ifindex, peer ifindex); only read for running containers
+    veths: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    # interface -> normalized impairment (see network.parse_qdiscs)
+    impairments: Dict[str, Dict] = field(default_factory=dict)
+    # VXLAN interfaces (ends of links to nodes on other hosts)
+    tunnels: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ReconcilePlan:
+    """Minimal set of actions that brings a running lab to its DB state"""
+    remove_containers: List[str] = field(default_factory=list)
+    recreate_nodes: List[Node] = field(default_factory=list)
+    start_nodes: List[Node] = field(default_factory=list)
+    deploy_nodes: List[Node] = field(default_factory=list)
+    delete_interfaces: List[Tuple[str, str]] = field(default_factory=list)
+    create_links: List[Link] = field(default_factory=list)
+    reimpair_links: List[Link] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not any(self.summary().values())
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "removed_containers": len(self.remove_containers),
+            "recreated_nodes": len(self.recreate_nodes),
+            "started_nodes": len(self.start_nodes),
+            "deployed_nodes": len(self.deploy_nodes),
+            "deleted_interfaces": len(self.delete_interfaces),
+            "created_links": len(self.create_links),
+            "reimpaired_links": len(self.reimpair_links)
+        }
+
+
+async def list_lab_containers(runtime: "RuntimeManager", lab_id: str) -> Dict[str, Dict]:
+    """
+    List every container of a lab, running or not
+
+    Containers are matched by the `neon.lab_id` label and, for containers
+    claimed from the warm pool (which carry no lab label), by name prefix.
+
+    Returns:
+        Containers (in DockerRuntime.list_containers format) keyed by ID
+    """
+    run, docker = runtime._run, runtime.docker
+    listed = await asyncio.gather(
+        run(docker.list_containers, {"label": [f"neon.lab_id={lab_id}"]}),
+        run(docker.list_containers, {"name": [f"neon_{lab_id}_"]})
+    )
+    return {c["id"]: c for containers in listed for c in containers}
+
+
+async def observe_lab(runtime: "RuntimeManager", lab_id: str) -> Dict[str, ObservedContainer]:
+    """
+    Collect the containers of a lab and, for running ones, their veths and qdiscs
+
+    VXLAN tunnels are only listed when nodes are spread over several hosts.
+
+    Returns:
+        Observed containers keyed by container ID
+    """
+    run, network = runtime._run, runtime.network
+    observed = {
+        c["id"]: ObservedContainer(id=c["id"], name=c["name"], status=c["status"], image=c.get("image"))
+        for c in (await list_lab_containers(runtime, lab_id)).values()
+    }
+
+    sharded = runtime.hosts.sharded
+
+    async def _inspect(container: ObservedContainer) -> None:
+        try:
+            container.veths, container.impairments = await asyncio.gather(
+                run(network.list_veths, container.id),
+                run(network.get_impairments, container.id)
+            )
+            if sharded:
+                container.tunnels = await run(network.list_vxlans, container.id)
+        except Exception as e:
+            # Exited between listing and inspection: plan it as not running
+            logger.warning(f"Failed to inspect container {container.id[:12]}: {e}")
+            container.status = "unknown"
+
+    await asyncio.gather(*(_inspect(c) for c in observed.values() if c.status == "running"))
+    return observed
+
+
+def plan_reconcile(
+    nodes: List[Node],
+    links: List[Link],
+    observed: Dict[str, ObservedContainer]
+) -> ReconcilePlan:
+    """
+    Diff desired nodes/links against observed containers
+
+    - containers of the lab that no node references are removed
+    - nodes without a container are deployed; nodes whose container runs
+      another image are recreated; stopped containers are started
+    - a link is (re)created when an endpoint gets a fresh namespace, when
+      either interface is missing, or when the two interfaces are not each
+      other's veth peer (or, across hosts, not both VXLAN tunnels); a
+      half-present or miswired end is deleted first
+    - links that are wired correctly but whose qdiscs differ from the DB
+      are re-impaired in place
+    - veth interfaces no link accounts for are deleted
+    """
+    plan = ReconcilePlan()
+
+    referenced = {node.container_id for node in nodes if node.container_id}
+    plan.remove_containers = [cid for cid in observed if cid not in referenced]
+
+    live: Dict = {}
+    for node in nodes:
+        container = observed.get(node.container_id) if node.container_id else None
+        if container is None:
+            plan.deploy_nodes.append(node)
+        elif node.image is not None and container.image and container.image != node.image.image_uri:
+            plan.recreate_nodes.append(node)
+        elif container.status != "running":
+            plan.start_nodes.append(node)
+        else:
+            live[node.id] = container
+
+    expected: Dict = {}
+    deletes: Dict[Tuple[str, str], None] = {}
+    for link in links:
+        ends = [
+            (live.get(link.source_node_id), link.source_interface),
+            (live.get(link.target_node_id), link.target_interface)
+        ]
+        expected.setdefault(link.source_node_id, set()).add(link.source_interface)
+        expected.setdefault(link.target_node_id, set()).add(link.target_interface)
+
+        (a, iface_a), (b, iface_b) = ends
+        veth_a = a.veths.get(iface_a) if a else None
+        veth_b = b.veths.get(iface_b) if b else None
+        paired = veth_a and veth_b and veth_a[1] == veth_b[0] and veth_b[1] == veth_a[0]
+        tunneled = a and b and iface_a in a.tunnels and iface_b in b.tunnels
+        if paired or tunneled:
+            try:
+                desired = Impairment.from_link(link).normalized()
+            except ValueError as e:
+                logger.warning(f"Not comparing impairment of link {link.id}: {e}")
+                continue
+            if not all(
+                impairment_matches(desired, c.impairments.get(iface, impairment()))
+                for c, iface in ends
+            ):
+                plan.reimpair_links.append(link)
+            continue
+
+        plan.create_links.append(link)
+        for container, iface in ends:
+            if container and (iface in container.veths or iface in container.tunnels):
+                deletes[(container.id, iface)] = None
+
+    for node_id, container in live.items():
+        for iface in [*container.veths, *container.tunnels]:
+            if iface not in MGMT_INTERFACES and iface not in expected.get(node_id, ()):
+                deletes[(container.id, iface)] = None
+
+    plan.delete_interfaces = list(deletes)
+    return plan
@@ -0,0 +1,44 @@
+"""
+Job Sessions for NEON
+Sharing one sync database session between the coroutines of a job without blocking the event loop
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+import asyncio
+
+from sqlalchemy.orm import Session
+
+
+def _lock(db: Session) -> asyncio.Lock:
+    return db.info.setdefault("neon_lock", asyncio.Lock())
+
+
+async def _in_thread(fn: Callable, *args) -> Any:
+    work = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        # A thread cannot be interrupted: keep the session locked until it is done
+        await asyncio.wait({work})
+        raise
+
+
+async def run_in_session(db: Session, fn: Callable, *args) -> Any:
+    """Run blocking work on `db` (a query, a load) in a worker thread, one call per session at a time"""
+    async with _lock(db):
+        return await _in_thread(fn, *args)
+
+
+@asynccontextmanager
+async def committing(db: Session) -> AsyncIterator[None]:
+    """
+    Change objects of `db` in the block, then commit them in a worker thread
+
+    A deploy runs every node and link of a lab as a coroutine on one
+    session.  The block holds the session's lock until the commit is done,
+    so flushes never overlap and no coroutine changes an object while it is
+    being flushed.  Keep awaits out of the block.
+    """
+    async with _lock(db):
+        yield
+        await _in_thread(db.commit)
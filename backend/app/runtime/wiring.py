@@ -0,0 +1,81 @@
+"""
+Batched Lab Wiring for NEON
+Plans every veth pair and qdisc of a lab up front so that it can be applied
+with one `ip -batch` in the host namespace plus one `ip -batch`/`tc -batch`
+per container namespace
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from app.runtime.network import veth_name, tc_qdisc_commands
+
+
+@dataclass
+class LinkEndpoints:
+    """One link to wire, with both ends resolved to container PIDs"""
+    link_id: str
+    pid_a: int
+    iface_a: str
+    pid_b: int
+    iface_b: str
+    bandwidth: Optional[str] = None
+    delay_ms: Optional[int] = None
+    loss_percent: Optional[float] = None
+    # Further Impairment fields (jitter_ms, reorder_percent, ...)
+    netem: Dict = field(default_factory=dict)
+
+
+@dataclass
+class WiringPlan:
+    """Batch scripts for a whole lab, keyed by namespace PID"""
+    host_ip: List[str] = field(default_factory=list)
+    ns_ip: Dict[int, List[str]] = field(default_factory=dict)
+    ns_tc: Dict[int, List[str]] = field(default_factory=dict)
+    # link_id -> ((pid_a, iface_a), (pid_b, iface_b)), used to verify the result
+    expected: Dict[str, tuple] = field(default_factory=dict)
+
+    @property
+    def process_count(self) -> int:
+        """Number of ip/tc processes needed to apply the plan"""
+        return (1 if self.host_ip else 0) + len(self.ns_ip) + len(self.ns_tc)
+
+
+def plan_lab_wiring(links: List[LinkEndpoints]) -> WiringPlan:
+    """
+    Compute the batch scripts for a set of links
+
+    Host-side veth names normally follow veth_name(); if two ends would
+    truncate to the same name, the later one is disambiguated with its
+    position in the plan so a single collision cannot abort the batch.
+    """
+    plan = WiringPlan()
+    used_names: Set[str] = set()
+
+    def _unique(pid: int, iface: str, idx: int, end: str) -> str:
+        name = veth_name(pid, iface)
+        if name in used_names:
+            name = veth_name(pid, f"{end}{idx}")
+        used_names.add(name)
+        return name
+
+    for idx, link in enumerate(links):
+        veth_a = _unique(link.pid_a, link.iface_a, idx, "a")
+        veth_b = _unique(link.pid_b, link.iface_b, idx, "b")
+
+        plan.host_ip += [
+            f"link add {veth_a} type veth peer name {veth_b}",
+            f"link set {veth_a} netns {link.pid_a}",
+            f"link set {veth_b} netns {link.pid_b}",
+        ]
+
+        for pid, veth, iface in ((link.pid_a, veth_a, link.iface_a), (link.pid_b, veth_b, link.iface_b)):
+            plan.ns_ip.setdefault(pid, []).extend([
+                f"link set {veth} name {iface}",
+                f"link set {iface} up",
+            ])
+            for args in tc_qdisc_commands(iface, link.bandwidth, link.delay_ms, link.loss_percent, **link.netem):
+                plan.ns_tc.setdefault(pid, []).append(" ".join(args))
+
+        plan.expected[link.link_id] = ((link.pid_a, link.iface_a), (link.pid_b, link.iface_b))
+
+    return plan
@@ -0,0 +1,166 @@
+"""
+AI Client for NEON
+Process-wide async Anthropic client with connection reuse, retries and a concurrency limit
+"""
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import logging
+import random
+
+from app.core.config import settings
+
+try:
+    from anthropic import (
+        DEFAULT_CONNECTION_LIMITS, APIConnectionError, AsyncAnthropic, DefaultAsyncHttpxClient, Timeout
+    )
+    anthropic_available = True
+except ImportError:
+    anthropic_available = False
+
+logger = logging.getLogger(__name__)
+
+# Rate limited, overloaded (529) or transient server/proxy failures
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def retry_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based)
+
+    Full jitter: uniform between 0 and the exponential backoff, so clients
+    that failed together do not retry together.  A server `retry-after`
+    is a lower bound.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Connection errors and timeouts, rate limits, overload and 5xx responses"""
+    if anthropic_available and isinstance(error, APIConnectionError):  # includes APITimeoutError
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500)
+
+
+class AIClient:
+    """
+    One AsyncAnthropic client shared by every chat request.
+
+    The underlying httpx pool keeps connections alive between requests, so
+    only the first call pays for the TLS handshake.  At most
+    `max_concurrency` calls are in flight; others wait for a slot, which
+    keeps a burst of chats from tripping the API rate limit.  Failed calls
+    are retried with jittered exponential backoff when the error is
+    transient (see is_retryable); the SDK's own retries are disabled so
+    the two do not multiply.  A stream is only retried while opening:
+    once events have been handed out, a failure is raised to the caller.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_retries: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        client: Any = None
+    ):
+        self.max_retries = settings.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = settings.AI_RETRY_BASE_DELAY
+        self.retry_max_delay = settings.AI_RETRY_MAX_DELAY
+        self._slots = asyncio.Semaphore(max_concurrency or settings.AI_MAX_CONCURRENCY)
+        self._client = client or self._build(api_key, base_url)
+
+    @staticmethod
+    def _build(api_key: Optional[str], base_url: Optional[str]) -> "AsyncAnthropic":
+        if not anthropic_available:
+            raise RuntimeError("Anthropic library not installed. Run: pip install anthropic")
+
+        # Timeout and Limits come from the HTTP library the SDK is built on,
+        # which is not necessarily the httpx this project pins
+        timeout = Timeout(settings.AI_TIMEOUT, connect=settings.AI_CONNECT_TIMEOUT)
+        limits = type(DEFAULT_CONNECTION_LIMITS)
+        return AsyncAnthropic(
+            api_key=api_key or settings.ANTHROPIC_API_KEY,
+            base_url=base_url or settings.ANTHROPIC_BASE_URL,
+            timeout=timeout,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                timeout=timeout,
+                limits=limits(
+                    max_connections=settings.AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY
+                )
+            )
+        )
+
+    async def _retry_or_raise(self, error: Exception, attempt: int) -> None:
+        """Sleep before the next attempt, or re-raise when it should not be retried"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            raise error
+        delay = retry_delay(attempt, self.retry_base_delay, self.retry_max_delay, _retry_after(error))
+        logger.warning(f"Anthropic call failed ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def create(self, **params) -> Any:
+        """messages.create() with retries; takes the same parameters"""
+        async with self._slots:
+            for attempt in count():
+                try:
+                    return await self._client.messages.create(**params)
+                except Exception as error:
+                    await self._retry_or_raise(error, attempt)
+
+    @asynccontextmanager
+    async def stream(self, **params) -> AsyncIterator[Any]:
+        """messages.stream() with retries while opening; holds a slot until the stream closes"""
+        async with self._slots:
+            for attempt in count():
+                manager = self._client.messages.stream(**params)
+                try:
+                    stream = await manager.__aenter__()
+                except Exception as error:
+                    await self._retry_or_raise(error, attempt)
+                    continue
+                try:
+                    yield stream
+                finally:
+                    await manager.__aexit__(None, None, None)
+                return
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        await self._client.close()
+
+
+# Singleton instance (lazy initialization)
+_ai_client: Optional[AIClient] = None
+
+
+def get_ai_client() -> AIClient:
+    """Return the process-wide AI client"""
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = AIClient()
+    return _ai_client
+
+
+async def shutdown_ai_client() -> None:
+    """Close the process-wide AI client, if it was created"""
+    global _ai_client
+    if _ai_client is not None:
+        await _ai_client.close()
+        _ai_client = None
@@ -0,0 +1,97 @@
+"""
+Console Relay Service
+Pumps bytes between a container exec socket and a WebSocket without blocking the event loop
+"""
+import asyncio
+import codecs
+import logging
+import socket
+from typing import Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConsoleRelay:
+    """
+    Bidirectional relay between a browser terminal and a container shell.
+
+    The exec socket is switched to non-blocking mode and registered with the
+    asyncio loop as a reader/writer stream pair, so an idle console costs no
+    thread.  Memory per session is bounded: the StreamReader pauses the
+    socket once its buffer is full, and container output waits in a queue of
+    at most `queue_depth` chunks.  When the browser is slow the queue fills,
+    reading stops and the kernel pushes back on the container's pty; in the
+    other direction writes to the container wait for `drain()` before the
+    next WebSocket message is read.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        sock: socket.socket,
+        chunk_size: Optional[int] = None,
+        queue_depth: Optional[int] = None
+    ):
+        self.websocket = websocket
+        self.sock = sock
+        self.chunk_size = chunk_size or settings.CONSOLE_CHUNK_SIZE
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth or settings.CONSOLE_QUEUE_DEPTH)
+
+    async def run(self) -> None:
+        """Relay until either side closes"""
+        self.sock.setblocking(False)
+        reader, writer = await asyncio.open_connection(sock=self.sock, limit=self.chunk_size * 4)
+
+        tasks = [
+            asyncio.create_task(self._container_to_queue(reader)),
+            asyncio.create_task(self._queue_to_websocket()),
+            asyncio.create_task(self._websocket_to_container(writer)),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+    async def _container_to_queue(self, reader: asyncio.StreamReader) -> None:
+        # Incremental decoding keeps multi-byte characters split across reads intact
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                chunk = await reader.read(self.chunk_size)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    await self.queue.put(text)
+        except (OSError, ConnectionError) as e:
+            logger.info(f"Console container stream closed: {e}")
+        await self.queue.put(None)
+
+    async def _queue_to_websocket(self) -> None:
+        while True:
+            text = await self.queue.get()
+            if text is None:
+                break
+            await self.websocket.send_text(text)
+
+    async def _websocket_to_container(self, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                data = await self.websocket.receive_text()
+                writer.write(data.encode("utf-8"))
+                await writer.drain()
+        except WebSocketDisconnect:
+            pass
+        except (OSError, ConnectionError) as e:
+            logger.info(f"Console container stream closed: {e}")
@@ -0,0 +1,311 @@
+"""
+Image Catalog for NEON
+Versioned in-process cache of the active image catalog
+"""
+from dataclasses import dataclass
+from itertools import chain, count
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.db.models import Image, ImageInterface, ImageTag, Vendor
+
+logger = logging.getLogger(__name__)
+
+# Writes to any of these models change what the catalog serves
+CATALOG_MODELS = (Image, ImageInterface, ImageTag, Vendor)
+
+
+@dataclass
+class CatalogImage:
+    """Detached snapshot of one active image"""
+    id: UUID
+    name: str
+    display_name: str
+    type: str
+    runtime: str
+    vendor: Optional[str]
+    tags: Tuple[str, ...]
+    summary: Dict  # list_images representation, built once per catalog load
+
+    @classmethod
+    def from_model(cls, img: Image) -> "CatalogImage":
+        tags = tuple(tag.tag for tag in img.tags)
+        return cls(
+            id=img.id,
+            name=img.name,
+            display_name=img.display_name,
+            type=img.type,
+            runtime=img.runtime,
+            vendor=img.vendor.name if img.vendor else None,
+            tags=tags,
+            summary={
+                "id": str(img.id),
+                "name": img.name,
+                "display_name": img.display_name,
+                "version": img.version,
+                "type": img.type,
+                "runtime": img.runtime,
+                "image_uri": img.image_uri,
+                "vendor": {
+                    "name": img.vendor.name,
+                    "display_name": img.vendor.display_name,
+                    "logo_url": img.vendor.logo_url
+                } if img.vendor else None,
+                "cpu_recommended": img.cpu_recommended,
+                "memory_recommended": img.memory_recommended,
+                "startup_time": img.startup_time,
+                "console_type": img.console_type,
+                "default_credentials": img.default_credentials,
+                "tags": list(tags)
+            }
+        )
+
+    def matches(
+        self,
+        type: Optional[str] = None,
+        vendor: Optional[str] = None,
+        runtime: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> bool:
+        """Apply the list_images filters (search is a case-insensitive substring)"""
+        if type is not None and self.type != type:
+            return False
+        if vendor is not None and self.vendor != vendor:
+            return False
+        if runtime is not None and self.runtime != runtime:
+            return False
+        if tag is not None and tag not in self.tags:
+            return False
+        if search is not None:
+            needle = search.lower()
+            if needle not in self.name.lower() and needle not in self.display_name.lower():
+                return False
+        return True
+
+
+def load_catalog_images(db: Session) -> List[CatalogImage]:
+    """Load every active image with its vendor and tags in three statements"""
+    images = (
+        db.query(Image)
+        .options(selectinload(Image.vendor), selectinload(Image.tags))
+        .filter(Image.is_active == True)
+        .order_by(Image.created_at, Image.name)
+        .all()
+    )
+    return [CatalogImage.from_model(img) for img in images]
+
+
+@dataclass
+class _CatalogIndex:
+    """One loaded generation of the catalog; replaced as a whole on reload"""
+    images: List[CatalogImage]
+    by_id: Dict[UUID, CatalogImage]
+    by_name: Dict[str, List[CatalogImage]]
+    by_type: Dict[str, List[CatalogImage]]
+    by_vendor: Dict[str, List[CatalogImage]]
+    by_tag: Dict[str, List[CatalogImage]]
+
+    @classmethod
+    def build(cls, images: List[CatalogImage]) -> "_CatalogIndex":
+        by_name: Dict[str, List[CatalogImage]] = {}
+        by_type: Dict[str, List[CatalogImage]] = {}
+        by_vendor: Dict[str, List[CatalogImage]] = {}
+        by_tag: Dict[str, List[CatalogImage]] = {}
+        for img in images:
+            by_name.setdefault(img.name.lower(), []).append(img)
+            by_type.setdefault(img.type, []).append(img)
+            if img.vendor:
+                by_vendor.setdefault(img.vendor, []).append(img)
+            for tag in img.tags:
+                by_tag.setdefault(tag, []).append(img)
+        return cls(images, {img.id: img for img in images}, by_name, by_type, by_vendor, by_tag)
+
+
+class ImageCatalog:
+    """
+    In-memory copy of the active image catalog, indexed by id, name, type,
+    vendor and tag.
+
+    Callers load the catalog before reading it: `await catalog.load(db)`
+    with an AsyncSession, or `catalog.load_sync(db)` with a Session (in a
+    worker thread or under `AsyncSession.run_sync`).  Either reloads only
+    when the version was bumped (any committed write to Image/
+    ImageInterface/ImageTag/Vendor in this process) or the copy is older
+    than the TTL, which is how writes made by other processes such as
+    `app.db.seed` are picked up.  Reads need no session and serve the
+    last loaded copy.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        loader: Optional[Callable[[Session], List[CatalogImage]]] = None
+    ):
+        self.ttl = settings.IMAGE_CATALOG_TTL if ttl is None else ttl
+        self._loader = loader or load_catalog_images
+        # Concurrent loads of one kind wait for a single reload: threads on
+        # the threading lock, coroutines on the asyncio one (never held by a
+        # thread, so the event loop does not block on a worker's query)
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self._versions = count(1)
+        self.version = 0
+        self._loaded_version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._index: Optional[_CatalogIndex] = None
+
+    def invalidate(self) -> None:
+        """Force a reload on next load"""
+        self.version = next(self._versions)
+        logger.debug(f"Image catalog invalidated (version {self.version})")
+
+    def _stale(self) -> bool:
+        return (
+            self._loaded_version != self.version
+            or time.monotonic() - self._loaded_at >= self.ttl
+        )
+
+    def _install(self, images: List[CatalogImage], version: int) -> None:
+        # An invalidation during the query leaves the catalog stale
+        self._index = _CatalogIndex.build(images)
+        self._loaded_version = version
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded image catalog: {len(images)} images (version {version})")
+
+    def load_sync(self, db: Session) -> "ImageCatalog":
+        """
+        Reload through a sync session if stale
+
+        Returns:
+            The catalog itself, for chaining
+        """
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    version = self.version
+                    self._install(self._loader(db), version)
+        return self
+
+    async def load(self, db: AsyncSession) -> "ImageCatalog":
+        """
+        Reload through an async session if stale
+
+        Returns:
+            The catalog itself, for chaining
+        """
+        if self._stale():
+            async with self._async_lock:
+                if self._stale():
+                    version = self.version
+                    self._install(await db.run_sync(self._loader), version)
+        return self
+
+    def _current(self) -> _CatalogIndex:
+        if self._index is None:
+            raise RuntimeError("Image catalog not loaded; call load() or load_sync() first")
+        return self._index
+
+    def images(self) -> List[CatalogImage]:
+        """All active images, in catalog order"""
+        return self._current().images
+
+    def get(self, image_id: UUID) -> Optional[CatalogImage]:
+        """Look up an active image by ID"""
+        return self._current().by_id.get(image_id)
+
+    def filter(
+        self,
+        type: Optional[str] = None,
+        vendor: Optional[str] = None,
+        runtime: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> List[CatalogImage]:
+        """
+        Active images matching every given filter
+
+        Scans only the smallest index bucket among type/vendor/tag.
+        """
+        index = self._current()
+
+        candidates = index.images
+        for bucket_index, key in ((index.by_type, type), (index.by_vendor, vendor), (index.by_tag, tag)):
+            if key is not None:
+                bucket = bucket_index.get(key, [])
+                if len(bucket) < len(candidates):
+                    candidates = bucket
+
+        return [
+            img for img in candidates
+            if img.matches(type=type, vendor=vendor, runtime=runtime, tag=tag, search=search)
+        ]
+
+    def find(
+        self,
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+        vendor: Optional[str] = None
+    ) -> Optional[CatalogImage]:
+        """
+        Best image for a node spec
+
+        An exact (case-insensitive) name match wins; otherwise the first
+        image whose name contains `name`.  `type` and `vendor` must match
+        exactly when given.
+        """
+        if name:
+            exact = self._current().by_name.get(name.lower(), [])
+            for img in exact:
+                if img.matches(type=type, vendor=vendor):
+                    return img
+
+        needle = name.lower() if name else None
+        for img in self.filter(type=type, vendor=vendor):
+            if needle is None or needle in img.name.lower():
+                return img
+        return None
+
+
+# Singleton instance (lazy initialization)
+_image_catalog = None
+
+
+def get_image_catalog() -> ImageCatalog:
+    """Return the process-wide image catalog"""
+    global _image_catalog
+    if _image_catalog is None:
+        _image_catalog = ImageCatalog()
+    return _image_catalog
+
+
+def _track_catalog_writes(session: Session, flush_context) -> None:
+    """Flag sessions that flushed catalog changes (pre-flush state is still visible here)"""
+    if any(
+        isinstance(obj, CATALOG_MODELS)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info["image_catalog_dirty"] = True
+
+
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop("image_catalog_dirty", False) and _image_catalog is not None:
+        _image_catalog.invalidate()
+
+
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("image_catalog_dirty", None)
+
+
+event.listen(Session, "after_flush", _track_catalog_writes)
+event.listen(Session, "after_commit", _invalidate_on_commit)
+event.listen(Session, "after_rollback", _discard_on_rollback)
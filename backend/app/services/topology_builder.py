@@ -2,13 +2,16 @@
 Topology Builder Service
 Builds network topologies from AI-generated actions
 """
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Tuple, Union
 from uuid import UUID
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import logging
 import math
+import uuid
 
-from app.db.models import Lab, Node, Link, Image
+from app.db.models import Lab, Node, Link
+from app.services.image_catalog import get_image_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +19,28 @@ logger = logging.getLogger(__name__)
 class TopologyBuilder:
     """Service for building topologies from structured AI actions"""
 
+    @staticmethod
+    def _load_lab(lab_id: UUID, db: Session) -> Lab:
+        """
+        The lab with its current nodes and links
+
+        Rows are inserted with Core statements, which bypass the identity
+        map, and an async session keeps loaded values across commits, so
+        collections the session already holds are reloaded rather than reused.
+        """
+        lab = db.query(Lab).filter(Lab.id == lab_id).first()
+        if not lab:
+            raise ValueError(f"Lab {lab_id} not found")
+        db.expire(lab, ["nodes", "links"])
+        return lab
+
     def add_nodes(self, lab_id: UUID, nodes: List[Dict], db: Session) -> List[Dict]:
         """
         Add multiple nodes to a lab
 
+        Nodes get client-side UUIDs and are written with one executemany
+        INSERT (batched multi-row statements) instead of one flush per node.
+
         Args:
             lab_id: Lab UUID
             nodes: List of node specifications
@@ -35,42 +56,29 @@ class TopologyBuilder:
         Returns:
             List of created node summaries
         """
-        lab = db.query(Lab).filter(Lab.id == lab_id).first()
-        if not lab:
-            raise ValueError(f"Lab {lab_id} not found")
+        lab = self._load_lab(lab_id, db)
 
         created_nodes = []
+        node_rows = []
         existing_count = len(lab.nodes)
 
         # Calculate positions if not provided
         positions = self._calculate_grid_positions(len(nodes), existing_count)
 
-        for idx, node_spec in enumerate(nodes):
-            # Find image
-            image_query = db.query(Image).filter(Image.is_active == True)
-
-            # Match by name
-            if "image" in node_spec:
-                image_query = image_query.filter(Image.name.ilike(f"%{node_spec['image']}%"))
-
-            # Match by type
-            if "type" in node_spec:
-                image_query = image_query.filter(Image.type == node_spec["type"])
-
-            # Match by vendor (use has() correlated subquery; no explicit join needed)
-            if "vendor" in node_spec:
-                image_query = image_query.filter(
-                    Image.vendor.has(name=node_spec["vendor"])
-                )
+        catalog = get_image_catalog().load_sync(db)
 
-            image = image_query.first()
+        for idx, node_spec in enumerate(nodes):
+            # Find image in the cached catalog (match by name, type and vendor)
+            image = catalog.find(
+                name=node_spec.get("image"),
+                type=node_spec.get("type"),
+                vendor=node_spec.get("vendor")
+            )
             if not image:
                 logger.warning(f"No image found for spec: {node_spec}")
                 # Try fallback to first image of type
-                image = db.query(Image).filter(
-                    Image.type == node_spec.get("type", "router"),
-                    Image.is_active == True
-                ).first()
+                candidates = catalog.filter(type=node_spec.get("type", "router"))
+                image = candidates[0] if candidates else None
 
             if not image:
                 raise ValueError(f"Cannot find suitable image for node {node_spec.get('name')}")
@@ -78,39 +86,44 @@ class TopologyBuilder:
             # Get position
             position = node_spec.get("position", positions[idx])
 
-            # Create node
-            node = Node(
-                lab_id=lab_id,
-                image_id=image.id,
-                name=node_spec.get("name", f"{image.name}{existing_count + idx + 1}"),
-                hostname=node_spec.get("hostname"),
-                position_x=position.get("x", 100),
-                position_y=position.get("y", 100),
-                cpu=node_spec.get("cpu"),
-                memory=node_spec.get("memory"),
-                status="stopped"
-            )
-
-            db.add(node)
-            db.flush()  # Get node ID
+            # IDs are generated client-side so the whole batch is one executemany
+            row = {
+                "id": uuid.uuid4(),
+                "lab_id": lab_id,
+                "image_id": image.id,
+                "name": node_spec.get("name", f"{image.name}{existing_count + idx + 1}"),
+                "hostname": node_spec.get("hostname"),
+                "position_x": position.get("x", 100),
+                "position_y": position.get("y", 100),
+                "cpu": node_spec.get("cpu"),
+                "memory": node_spec.get("memory"),
+                "status": "stopped"
+            }
+            node_rows.append(row)
 
             created_nodes.append({
-                "id": str(node.id),
-                "name": node.name,
+                "id": str(row["id"]),
+                "name": row["name"],
                 "type": image.type,
                 "image": image.name,
-                "position": {"x": node.position_x, "y": node.position_y}
+                "position": {"x": row["position_x"], "y": row["position_y"]}
             })
 
-            logger.info(f"Created node {node.name} with image {image.name}")
-
+        if node_rows:
+            # executemany form: insertmanyvalues batches the rows within the
+            # driver's bind parameter limit (asyncpg allows 32767 per statement)
+            db.execute(insert(Node), node_rows)
         db.commit()
+
+        logger.info(f"Created {len(created_nodes)} nodes in lab {lab_id}")
         return created_nodes
 
     def add_links(self, lab_id: UUID, links: List[Dict], db: Session) -> List[Dict]:
         """
         Add multiple links between nodes
 
+        Like add_nodes, the whole batch is written with one executemany INSERT.
+
         Args:
             lab_id: Lab UUID
             links: List of link specifications
@@ -130,19 +143,18 @@ class TopologyBuilder:
         Returns:
             List of created link summaries
         """
-        lab = db.query(Lab).filter(Lab.id == lab_id).first()
-        if not lab:
-            raise ValueError(f"Lab {lab_id} not found")
+        lab = self._load_lab(lab_id, db)
 
         created_links = []
+        link_rows = []
 
         # Build node name to ID map
         nodes_by_name = {node.name: node for node in lab.nodes}
 
         # Seed used-interface tracking from links already persisted in the DB.
         # We maintain this dict ourselves so that interfaces assigned within
-        # this batch are visible to subsequent iterations (lab.links is a
-        # SQLAlchemy lazy collection that is NOT refreshed after each flush).
+        # this batch are visible to subsequent iterations (the batch is only
+        # inserted at the end, so lab.links never contains it).
         used_interfaces: Dict[str, set] = {}
         for existing_link in lab.links:
             src_id = str(existing_link.source_node_id)
@@ -186,32 +198,33 @@ class TopologyBuilder:
             props = link_spec.get("properties", {})
 
             # Create link
-            link = Link(
-                lab_id=lab_id,
-                source_node_id=source_node.id,
-                source_interface=source_iface,
-                target_node_id=target_node.id,
-                target_interface=target_iface,
-                bandwidth=props.get("bandwidth"),
-                delay_ms=props.get("delay_ms", 0),
-                loss_percent=props.get("loss_percent", 0.0),
-                jitter_ms=props.get("jitter_ms", 0),
-                status="down"
-            )
-
-            db.add(link)
-            db.flush()
+            row = {
+                "id": uuid.uuid4(),
+                "lab_id": lab_id,
+                "source_node_id": source_node.id,
+                "source_interface": source_iface,
+                "target_node_id": target_node.id,
+                "target_interface": target_iface,
+                "bandwidth": props.get("bandwidth"),
+                "delay_ms": props.get("delay_ms", 0),
+                "loss_percent": props.get("loss_percent", 0.0),
+                "jitter_ms": props.get("jitter_ms", 0),
+                "status": "down"
+            }
+            link_rows.append(row)
 
             created_links.append({
-                "id": str(link.id),
+                "id": str(row["id"]),
                 "source": f"{source_name}:{source_iface}",
                 "target": f"{target_name}:{target_iface}",
                 "properties": props
             })
 
-            logger.info(f"Created link: {source_name}:{source_iface} <-> {target_name}:{target_iface}")
-
+        if link_rows:
+            db.execute(insert(Link), link_rows)
         db.commit()
+
+        logger.info(f"Created {len(created_links)} links in lab {lab_id}")
         return created_links
 
     def create_topology_pattern(
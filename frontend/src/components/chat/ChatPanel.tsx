@@ -1,8 +1,8 @@
 import { useState, useRef, useEffect } from 'react';
 import { Send, Bot, User, CheckCircle2, XCircle, AlertCircle } from 'lucide-react';
-import axios from 'axios';
 
 interface ChatAction {
+  id?: string;
   type: string;
   description: string;
   data: any;
@@ -53,33 +53,90 @@ export function ChatPanel() {
     setInput('');
     setIsLoading(true);
 
+    const assistantId = (Date.now() + 1).toString();
+    setMessages((prev) => [
+      ...prev,
+      { id: assistantId, role: 'assistant', content: '', timestamp: new Date(), actions: [] },
+    ]);
+
+    const updateAssistant = (update: (message: Message) => Message) => {
+      setMessages((prev) => prev.map((m) => (m.id === assistantId ? update(m) : m)));
+    };
+
+    const handleEvent = (event: string, data: any) => {
+      switch (event) {
+        case 'text':
+          updateAssistant((m) => ({ ...m, content: m.content + data.text }));
+          break;
+        case 'tool_use':
+          updateAssistant((m) => ({
+            ...m,
+            actions: [
+              ...(m.actions || []),
+              { id: data.id, type: data.name, description: 'Running...', data: {}, status: 'pending' },
+            ],
+          }));
+          break;
+        case 'tool_result':
+          updateAssistant((m) => ({
+            ...m,
+            actions: (m.actions || []).map((a) => (a.id === data.id ? { ...data } : a)),
+          }));
+          break;
+        case 'error':
+          updateAssistant((m) => ({ ...m, content: `${m.content}\n\n${data.detail}`.trim() }));
+          break;
+        case 'done':
+          updateAssistant((m) => ({ ...m, content: m.content || data.response }));
+          break;
+      }
+    };
+
     try {
-      // Call the chat API with tool calling
-      const response = await axios.post('/api/v1/chat/', {
-        message: currentInput,
-        lab_id: null, // TODO: Get from current lab context
+      // Stream the chat response (Server-Sent Events) so text and tool
+      // results appear while the model is still generating
+      const response = await fetch('/api/v1/chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          message: currentInput,
+          lab_id: null, // TODO: Get from current lab context
+        }),
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat stream failed: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
 
-      const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        role: 'assistant',
-        content: response.data.response,
-        timestamp: new Date(),
-        actions: response.data.actions || [],
-      };
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        setIsLoading(false);
 
-      setMessages((prev) => [...prev, assistantMessage]);
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop() || '';
+
+        for (const frame of frames) {
+          let event = 'message';
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          }
+          if (data) handleEvent(event, JSON.parse(data));
+        }
+      }
     } catch (error) {
       console.error('Chat error:', error);
 
-      const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        role: 'assistant',
+      updateAssistant((m) => ({
+        ...m,
         content: 'Sorry, I encountered an error processing your request. Please make sure the backend is running and try again.',
-        timestamp: new Date(),
-      };
-
-      setMessages((prev) => [...prev, errorMessage]);
+      }));
     } finally {
       setIsLoading(false);
     }
@@ -116,7 +173,7 @@ export function ChatPanel() {
       </div>
 
       <div className="flex-1 overflow-y-auto p-4 space-y-4">
-        {messages.map((message) => (
+        {messages.filter((m) => m.content || m.actions?.length).map((message) => (
           <div
             key={message.id}
             className={`flex ${message.role === 'user' ? 'justify-end' : 'justify-start'}`}
@@ -0,0 +1,96 @@
+"""
+NEON Placement Benchmark
+Compares min-cut node placement with round-robin on generated topologies of up to 2,000 nodes
+
+Pure computation, no Docker or database needed:
+
+    python tests/benchmark_placement.py
+"""
+import importlib.util
+import pathlib
+import random
+import time
+
+SIZES = [100, 250, 500, 1000, 2000]
+HOST_COUNTS = [2, 4, 8]
+
+
+def _load_placement():
+    spec = importlib.util.spec_from_file_location(
+        "placement", pathlib.Path(__file__).parent.parent / "backend/app/runtime/placement.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def spine_leaf(count):
+    """Spines meshed to leaves, each leaf with a rack of hosts"""
+    spines = max(2, count // 100)
+    per_leaf = 15
+    leaves = max(1, (count - spines) // (per_leaf + 1))
+    nodes = [f"spine{i}" for i in range(spines)]
+    edges = []
+    for leaf in range(leaves):
+        name = f"leaf{leaf}"
+        nodes.append(name)
+        edges += [(name, spine) for spine in nodes[:spines]]
+        for h in range(per_leaf):
+            nodes.append(f"host{leaf}_{h}")
+            edges.append((name, f"host{leaf}_{h}"))
+    return nodes, edges
+
+
+def ring_of_pods(count, pod=20):
+    """Full-mesh pods connected in a ring"""
+    nodes, edges = [], []
+    pods = max(2, count // pod)
+    for p in range(pods):
+        members = [f"p{p}_r{i}" for i in range(pod)]
+        nodes += members
+        edges += [(a, b) for i, a in enumerate(members) for b in members[i + 1:]]
+        edges.append((members[0], f"p{(p + 1) % pods}_r1"))
+    return nodes, edges
+
+
+def isp(count, seed=7):
+    """Core ring, aggregation pairs and access trees with a few random shortcuts"""
+    rng = random.Random(seed)
+    nodes = [f"n{i}" for i in range(count)]
+    edges = [(nodes[i], nodes[(i - 1) // 3]) for i in range(1, count)]
+    edges += [(rng.choice(nodes), rng.choice(nodes)) for _ in range(count // 20)]
+    return nodes, edges
+
+
+def main():
+    placement = _load_placement()
+    rng = random.Random(1)
+    print(f"{'topology':<12} {'nodes':>6} {'links':>6} {'hosts':>5} | {'round-robin':>11} | "
+          f"{'min-cut':>7} {'time':>9} {'max load':>8}")
+
+    for size in SIZES:
+        for topology in (spine_leaf, ring_of_pods, isp):
+            nodes, edges = topology(size)
+            # Mixed images: most nodes small, some heavy (resource hints)
+            demand = {n: rng.choice([(1, 512)] * 4 + [(2, 2048), (4, 8192)]) for n in nodes}
+            for count in HOST_COUNTS:
+                hosts = {f"h{i}": (size, size * 4096) for i in range(count)}
+                names = sorted(hosts)
+                round_robin = {n: names[i % count] for i, n in enumerate(nodes)}
+
+                started = time.perf_counter()
+                result = placement.place(nodes, edges, demand, hosts)
+                elapsed = time.perf_counter() - started
+
+                cpu = {h: sum(demand[n][0] for n in nodes if result[n] == h) for h in hosts}
+                share = sum(cpu.values()) / count
+                print(
+                    f"{topology.__name__:<12} {len(nodes):>6} {len(edges):>6} {count:>5} | "
+                    f"{placement.cut_size(edges, round_robin):>11} | "
+                    f"{placement.cut_size(edges, result):>7} {elapsed * 1000:>6.1f} ms "
+                    f"{max(cpu.values()) / share:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
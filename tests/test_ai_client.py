@@ -0,0 +1,217 @@
+"""
+Unit tests for the shared Anthropic client (app/services/ai_client.py).
+Retries and concurrency run against a scripted SDK; the keep-alive test
+talks to a local fake Messages API server and needs the anthropic package.
+"""
+import asyncio
+import importlib.util
+import json
+import pathlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+for mod in ["app", "app.core"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+@pytest.fixture(autouse=True)
+def sdk_modules():
+    """Load ai_client against the installed anthropic/httpx (or none), not the MagicMock stubs other test modules install"""
+    saved = {name: sys.modules.pop(name) for name in ("anthropic", "httpx")
+             if isinstance(sys.modules.get(name), MagicMock)}
+    try:
+        yield
+    finally:
+        sys.modules.update(saved)
+
+
+def _load_ai_client(**overrides):
+    config = MagicMock()
+    values = dict(
+        ANTHROPIC_API_KEY="test-key", ANTHROPIC_BASE_URL=None, AI_TIMEOUT=5.0, AI_CONNECT_TIMEOUT=1.0,
+        AI_MAX_RETRIES=3, AI_RETRY_BASE_DELAY=0.0, AI_RETRY_MAX_DELAY=0.0, AI_MAX_CONCURRENCY=2,
+        AI_MAX_CONNECTIONS=4, AI_KEEPALIVE_EXPIRY=30.0,
+    )
+    values.update(overrides)
+    for name, value in values.items():
+        setattr(config.settings, name, value)
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "ai_client_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/services/ai_client.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+
+class ScriptedMessages:
+    """messages.create/stream that fail with the scripted errors first"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures:
+                raise self.failures.pop(0)
+            return {"echo": params["messages"]}
+        finally:
+            self.in_flight -= 1
+
+    def stream(self, **params):
+        messages = self
+
+        class Manager:
+            async def __aenter__(self):
+                messages.calls += 1
+                if messages.failures:
+                    raise messages.failures.pop(0)
+                return ["event"]
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Manager()
+
+
+class TestRetries:
+
+    def test_transient_errors_are_retried_until_success(self):
+        mod = _load_ai_client()
+        messages = ScriptedMessages([StatusError(529), StatusError(429, retry_after="0")])
+        client = mod.AIClient(client=SimpleNamespace(messages=messages))
+
+        result = asyncio.run(client.create(model="m", messages=["hi"]))
+
+        assert result == {"echo": ["hi"]}
+        assert messages.calls == 3
+
+    def test_client_errors_and_exhausted_retries_are_raised(self):
+        mod = _load_ai_client()
+        messages = ScriptedMessages([StatusError(400)])
+        client = mod.AIClient(client=SimpleNamespace(messages=messages))
+        with pytest.raises(StatusError):
+            asyncio.run(client.create(messages=[]))
+        assert messages.calls == 1
+
+        messages = ScriptedMessages([StatusError(503)] * 5)
+        client = mod.AIClient(max_retries=2, client=SimpleNamespace(messages=messages))
+        with pytest.raises(StatusError):
+            asyncio.run(client.create(messages=[]))
+        assert messages.calls == 3
+
+    def test_stream_is_retried_only_while_opening(self):
+        mod = _load_ai_client()
+        messages = ScriptedMessages([StatusError(529)])
+        client = mod.AIClient(client=SimpleNamespace(messages=messages))
+
+        async def read():
+            async with client.stream(messages=[]) as stream:
+                return list(stream)
+
+        assert asyncio.run(read()) == ["event"]
+        assert messages.calls == 2
+
+    def test_backoff_is_jittered_capped_and_honours_retry_after(self):
+        mod = _load_ai_client()
+        delays = [mod.retry_delay(3, base=0.5, cap=8.0) for _ in range(200)]
+
+        assert all(0 <= d <= 4.0 for d in delays) and len(set(delays)) > 100
+        assert mod.retry_delay(10, base=0.5, cap=8.0) <= 8.0
+        assert mod.retry_delay(0, base=0.5, cap=8.0, retry_after=3) >= 3
+
+
+class TestConcurrency:
+
+    def test_calls_beyond_the_limit_wait_for_a_slot(self):
+        mod = _load_ai_client(AI_MAX_CONCURRENCY=2)
+        messages = ScriptedMessages([])
+        client = mod.AIClient(client=SimpleNamespace(messages=messages))
+
+        async def burst():
+            return await asyncio.gather(*(client.create(messages=[i]) for i in range(6)))
+
+        assert len(asyncio.run(burst())) == 6
+        assert messages.peak == 2
+
+
+class FakeMessagesAPI(BaseHTTPRequestHandler):
+    """POST /v1/messages: 529 on the first call, then a canned reply"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append((self.client_address[1], body["model"]))
+        if len(type(self).requests) == 1:
+            status, reply = 529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}
+        else:
+            status, reply = 200, {
+                "id": "msg_1", "type": "message", "role": "assistant", "model": body["model"],
+                "content": [{"type": "text", "text": "hello"}], "stop_reason": "end_turn",
+                "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 1},
+            }
+        payload = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def real_sdk():
+    """Skip unless the anthropic package is installed"""
+    pytest.importorskip("anthropic")
+
+
+class TestFakeServer:
+
+    def test_retry_and_follow_up_reuse_one_connection(self, real_sdk):
+        FakeMessagesAPI.requests = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMessagesAPI)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        mod = _load_ai_client(ANTHROPIC_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}")
+
+        async def chat():
+            client = mod.AIClient()
+            try:
+                first = await client.create(model="m", max_tokens=10, messages=[{"role": "user", "content": "hi"}])
+                second = await client.create(model="m", max_tokens=10, messages=[{"role": "user", "content": "hi"}])
+                return first, second
+            finally:
+                await client.close()
+
+        try:
+            first, second = asyncio.run(chat())
+        finally:
+            server.shutdown()
+
+        assert first.content[0].text == second.content[0].text == "hello"
+        assert len(FakeMessagesAPI.requests) == 3  # 529, retry, follow-up
+        assert len({port for port, _ in FakeMessagesAPI.requests}) == 1
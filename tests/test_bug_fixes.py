@@ -111,8 +111,10 @@ class TestImageRouteOrdering:
     def _load_router(self):
         import importlib.util, pathlib
         # Stub app dependencies
-        for m in ["app", "app.db", "app.db.base", "app.db.models",
-                  "app.core", "app.core.config"]:
+        for m in ["sqlalchemy.ext", "sqlalchemy.ext.asyncio",
+                  "app", "app.db", "app.db.base", "app.db.models",
+                  "app.core", "app.core.config", "app.services",
+                  "app.services.image_catalog"]:
             sys.modules.setdefault(m, MagicMock())
 
         spec = importlib.util.spec_from_file_location(
@@ -150,8 +152,10 @@ class TestInterfaceAutoAssignment:
 
     def _load_builder(self):
         import importlib.util, pathlib
-        for m in ["app", "app.db", "app.db.base", "app.db.models",
-                  "app.core", "app.core.config"]:
+        for m in ["sqlalchemy.ext", "sqlalchemy.ext.asyncio",
+                  "app", "app.db", "app.db.base", "app.db.models",
+                  "app.core", "app.core.config", "app.services",
+                  "app.services.image_catalog"]:
             sys.modules.setdefault(m, MagicMock())
 
         # Build lightweight stub models
@@ -306,8 +310,10 @@ class TestSpineLeafTypeGuard:
 
     def _load_builder(self):
         import importlib.util, pathlib
-        for m in ["app", "app.db", "app.db.base", "app.db.models",
-                  "app.core", "app.core.config"]:
+        for m in ["sqlalchemy.ext", "sqlalchemy.ext.asyncio",
+                  "app", "app.db", "app.db.base", "app.db.models",
+                  "app.core", "app.core.config", "app.services",
+                  "app.services.image_catalog"]:
             sys.modules.setdefault(m, MagicMock())
         sys.modules["app.db.models"] = MagicMock()
 
@@ -358,6 +364,9 @@ class TestTcQdiscs:
     def _load_network(self):
         import importlib.util, pathlib
         sys.modules["docker"] = MagicMock()
+        for m in ["app", "app.core", "app.core.config", "app.runtime",
+                  "app.runtime.netlink"]:
+            sys.modules.setdefault(m, MagicMock())
 
         spec = importlib.util.spec_from_file_location(
             "net_mod",
@@ -0,0 +1,120 @@
+"""
+Unit tests for capacity admission control (app/runtime/capacity.py).
+Runs without Docker — host info and the container listing are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+for mod in ["app", "app.core", "app.db", "app.db.models"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_capacity(admission):
+    config = MagicMock()
+    config.settings.CAPACITY_ADMISSION = admission
+    config.settings.CAPACITY_CPU_RATIO = 2.0
+    config.settings.CAPACITY_MEMORY_RATIO = 1.0
+    config.settings.CAPACITY_QUEUE_TIMEOUT = 2
+    config.settings.CAPACITY_REFRESH_INTERVAL = 0.01
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "capacity_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/capacity.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakeDocker:
+    """A 4 CPU / 8 GB host with one 2 CPU / 4 GB container running"""
+
+    def __init__(self):
+        self.containers = [{"id": "c1", "labels": {"neon.cpu": "2", "neon.memory": "4096"}}]
+
+    async def host_info(self):
+        return {"cpus": 4, "memory": 8192}
+
+    async def list_containers(self, filters):
+        return list(self.containers)
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.docker = FakeDocker()
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return await fn(*args, **kwargs)
+
+
+class TestCapacity:
+
+    def test_committed_resources_default_unlabelled_containers(self):
+        mod = _load_capacity("queue")
+        total = mod.committed_resources([
+            {"labels": {"neon.cpu": "2", "neon.memory": "2048"}},
+            {"labels": {"neon.managed": "true"}},
+        ])
+        assert (total.cpu, total.memory) == (3, 2560)
+
+    def test_headroom_counts_running_and_reserved(self):
+        mod = _load_capacity("queue")
+        accountant = mod.CapacityAccountant(FakeRuntime())
+
+        async def scenario():
+            async with accountant.admit("R1", 1, 1024):
+                return await accountant.headroom()
+
+        report = asyncio.run(scenario())
+        assert report["limits"] == {"cpu": 8.0, "memory": 8192}
+        assert report["committed"] == {"cpu": 3.0, "memory": 5120}
+        assert report["headroom"] == {"cpu": 5.0, "memory": 3072}
+        assert report["pending_deploys"] == 1
+
+    def test_refuse_mode_fails_without_headroom(self):
+        mod = _load_capacity("refuse")
+        accountant = mod.CapacityAccountant(FakeRuntime())
+
+        async def scenario():
+            async with accountant.admit("R1", 1, 4096):
+                async with accountant.admit("R2", 1, 1024):
+                    pass
+
+        with pytest.raises(mod.CapacityError, match="No capacity for R2"):
+            asyncio.run(scenario())
+        assert accountant._reservations == {}
+
+    def test_queue_mode_waits_for_capacity_to_free_up(self):
+        mod = _load_capacity("queue")
+        runtime = FakeRuntime()
+        accountant = mod.CapacityAccountant(runtime)
+        admitted = []
+
+        async def deploy(name):
+            async with accountant.admit(name, 2, 6144):
+                admitted.append(name)
+
+        async def scenario():
+            waiting = asyncio.create_task(deploy("R2"))
+            await asyncio.sleep(0.05)
+            assert admitted == [] and accountant._waiting == 1
+            runtime.docker.containers.clear()  # lab destroyed
+            await asyncio.wait_for(waiting, timeout=1)
+
+        asyncio.run(scenario())
+        assert admitted == ["R2"]
+
+    def test_check_rejects_lab_larger_than_host(self):
+        mod = _load_capacity("queue")
+        accountant = mod.CapacityAccountant(FakeRuntime())
+
+        asyncio.run(accountant.check(6, 4096))
+        with pytest.raises(mod.CapacityError, match="host allows at most 8 CPU"):
+            asyncio.run(accountant.check(10, 1024))
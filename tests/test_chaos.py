@@ -0,0 +1,161 @@
+"""
+Unit tests for chaos timelines (app/runtime/chaos.py).
+Runs without Docker, root or PostgreSQL — the network layer is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "sqlalchemy", "sqlalchemy.orm",
+            "app", "app.core", "app.core.config", "app.db", "app.db.base", "app.db.models",
+            "app.runtime", "app.runtime.netlink"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_chaos():
+    sys.modules["app.runtime.network"] = _load("net_mod_chaos", "app/runtime/network.py")
+    return _load("chaos_mod", "app/runtime/chaos.py")
+
+
+class FakeNetwork:
+    """Records (seconds since creation, call) for every change"""
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.calls = []
+
+    def get_pids(self, container_ids):
+        return {cid: 100 + i for i, cid in enumerate(sorted(container_ids))}
+
+    def set_link_state(self, container_id, interface, up, pid=None):
+        self.calls.append((time.monotonic() - self.t0, container_id, "up" if up else "down"))
+        return True
+
+    def set_impairment(self, container_id, interface, previous=None, pid=None, **imp):
+        self.calls.append((time.monotonic() - self.t0, container_id, imp.get("delay_ms")))
+        return True
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.network = FakeNetwork()
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def _lab():
+    r1 = SimpleNamespace(name="R1", container_id="c1")
+    r2 = SimpleNamespace(name="R2", container_id="c2")
+    link = SimpleNamespace(
+        id=uuid.uuid4(), status="up", source_node=r1, source_interface="eth1",
+        target_node=r2, target_interface="eth1", bandwidth=None, delay_ms=10, loss_percent=None,
+    )
+    return SimpleNamespace(id=uuid.uuid4(), name="lab", links=[link]), str(link.id)
+
+
+class TestChaosTimeline:
+
+    def test_events_fire_on_schedule_and_links_are_restored(self):
+        chaos = _load_chaos()
+        lab, link_id = _lab()
+        runtime = FakeRuntime()
+        events = [
+            chaos.ChaosEvent(at=0.05, link_id=link_id, action="impair", impairment={"delay_ms": 200}),
+            chaos.ChaosEvent(at=0.02, link_id=link_id, action="down"),
+            chaos.ChaosEvent(at=0.08, link_id=link_id, action="up"),
+        ]
+
+        async def scenario():
+            timeline = await chaos.ChaosEngine(runtime).start(lab, events, MagicMock(commit=AsyncMock()), name="flap")
+            await timeline.wait()
+            return timeline
+
+        timeline = asyncio.run(scenario())
+
+        assert timeline.status == "completed"
+        assert [entry["action"] for entry in timeline.log] == ["down", "impair", "up"]
+        for entry in timeline.log:
+            assert entry["status"] == "ok"
+            assert 0 <= entry["drift_ms"] < 20, entry
+        # The 200 ms delay is put back to the stored 10 ms when the run ends
+        assert [c[2] for c in runtime.network.calls[-4:]] == [10, 10, "up", "up"]
+        assert timeline.details()["log"] == timeline.log
+
+    def test_cancel_restores_touched_links(self):
+        chaos = _load_chaos()
+        lab, link_id = _lab()
+        runtime = FakeRuntime()
+        events = [
+            chaos.ChaosEvent(at=0, link_id=link_id, action="down"),
+            chaos.ChaosEvent(at=30, link_id=link_id, action="up"),
+        ]
+
+        async def scenario():
+            engine = chaos.ChaosEngine(runtime)
+            timeline = await engine.start(lab, events, MagicMock(commit=AsyncMock()))
+            await asyncio.sleep(0.02)
+            await engine.cancel(str(lab.id))
+            return timeline
+
+        timeline = asyncio.run(scenario())
+
+        assert timeline.status == "cancelled"
+        assert len(timeline.log) == 1
+        assert [c[2] for c in runtime.network.calls if c[2] in ("up", "down")][-2:] == ["up", "up"]
+
+    def test_unknown_link_and_invalid_impairment_are_rejected(self):
+        chaos = _load_chaos()
+        lab, link_id = _lab()
+        engine = chaos.ChaosEngine(FakeRuntime())
+
+        for bad in (
+            chaos.ChaosEvent(at=1, link_id=str(uuid.uuid4()), action="down"),
+            chaos.ChaosEvent(at=1, link_id=link_id, action="impair", impairment={"delay_ms": 0, "jitter_ms": 5}),
+        ):
+            try:
+                asyncio.run(engine.start(lab, [bad], MagicMock(commit=AsyncMock())))
+            except ValueError:
+                continue
+            raise AssertionError(f"{bad} should be rejected")
+
+    def test_concurrent_starts_run_one_timeline(self):
+        chaos = _load_chaos()
+        lab, link_id = _lab()
+        engine = chaos.ChaosEngine(FakeRuntime())
+        events = [chaos.ChaosEvent(at=30, link_id=link_id, action="down")]
+
+        async def commit_then_fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("database went away")
+
+        async def scenario():
+            first, second = await asyncio.gather(
+                engine.start(lab, events, MagicMock(commit=commit_then_fail)),
+                engine.start(lab, events, MagicMock(commit=AsyncMock())),
+                return_exceptions=True
+            )
+            assert isinstance(first, RuntimeError)
+            assert isinstance(second, ValueError)
+
+            # The failed start gave the lab back
+            timeline = await engine.start(lab, events, MagicMock(commit=AsyncMock()))
+            assert engine.active(str(lab.id)) is timeline
+            await engine.cancel(str(lab.id))
+
+        asyncio.run(scenario())
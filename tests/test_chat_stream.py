@@ -0,0 +1,155 @@
+"""
+Unit tests for the SSE chat stream (app/api/v1/chat.py).
+Runs without the Anthropic API, FastAPI or PostgreSQL — the model stream is scripted.
+"""
+import asyncio
+import importlib.util
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Stubbed only while chat.py is imported (see _load_chat), so other test
+# modules still see the real packages where they are installed
+STUBBED = ["fastapi", "fastapi.responses", "sqlalchemy", "sqlalchemy.orm", "sqlalchemy.ext",
+           "sqlalchemy.ext.asyncio", "app", "app.db", "app.db.base", "app.db.models", "app.core",
+           "app.services", "app.services.topology_builder", "app.services.image_catalog",
+           "app.services.ai_tools", "app.services.ai_client", "app.runtime", "app.runtime.jobs"]
+
+
+class StubBaseModel:
+    """Just enough of pydantic.BaseModel for ChatMessage/ChatAction"""
+
+    def __init__(self, **data):
+        for name in getattr(type(self), "__annotations__", {}):
+            setattr(self, name, data.get(name, getattr(type(self), name, None)))
+
+    def model_dump(self):
+        return {name: getattr(self, name) for name in type(self).__annotations__}
+
+
+class ScriptedStream:
+    """Replays Messages streaming events; pauses at `gate` until released"""
+
+    def __init__(self, script, gate=None):
+        self.script = script
+        self.gate = gate
+        self.current_message_snapshot = SimpleNamespace(content=[])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for step in self.script:
+            if step == "gate":
+                await self.gate.wait()
+                continue
+            if isinstance(step, Exception):
+                raise step
+            if step.type == "content_block_start":
+                self.current_message_snapshot.content.append(step.content_block)
+            yield step
+
+
+def _tool_block(block_id, name, tool_input):
+    return SimpleNamespace(type="tool_use", id=block_id, name=name, input=tool_input)
+
+
+def _load_chat(script, gate=None):
+    config = MagicMock()
+    config.settings.ANTHROPIC_API_KEY = "test-key"
+    stubs = {name: MagicMock() for name in STUBBED}
+    stubs.update({"pydantic": SimpleNamespace(BaseModel=StubBaseModel), "app.core.config": config})
+
+    spec = importlib.util.spec_from_file_location(
+        "chat_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/api/v1/chat.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, stubs):
+        spec.loader.exec_module(mod)
+
+    async def fake_prompt(message, db):
+        return "system"
+
+    async def fake_close():
+        pass
+
+    mod._build_system_prompt = fake_prompt
+    mod.anthropic_available = True
+    mod.get_ai_client = lambda: SimpleNamespace(stream=lambda **kw: ScriptedStream(script, gate))
+    mod.AsyncSessionLocal = lambda: SimpleNamespace(close=fake_close)
+
+    executed = []
+
+    async def fake_execute(tool_name, tool_input, lab_id, db):
+        executed.append(tool_name)
+        return mod.ChatAction(type=tool_name, description="ok", data=tool_input, status="success")
+
+    mod.execute_tool_call = fake_execute
+    return mod, executed
+
+
+def _parse(chunk):
+    event, data = chunk.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+class TestChatStream:
+
+    def test_first_text_delta_is_sent_before_generation_finishes(self):
+        gate = asyncio.Event()
+        mod, _ = _load_chat([
+            SimpleNamespace(type="text", text="Building"),
+            "gate",
+            SimpleNamespace(type="text", text=" a ring"),
+        ], gate)
+
+        async def scenario():
+            stream = mod._chat_events(mod.ChatMessage(message="ring of 3"))
+            first = await asyncio.wait_for(stream.__anext__(), timeout=1)
+            gate.set()
+            rest = [chunk async for chunk in stream]
+            return [_parse(c) for c in [first] + rest]
+
+        events = asyncio.run(scenario())
+        assert events[0] == ("text", {"text": "Building"})
+        assert events[-1][0] == "done"
+        assert events[-1][1]["response"] == "Building a ring"
+
+    def test_tools_run_in_order_and_report_results(self):
+        add = _tool_block("tu_1", "add_nodes", {"nodes": [{"name": "R1"}]})
+        link = _tool_block("tu_2", "add_links", {"links": []})
+        mod, executed = _load_chat([
+            SimpleNamespace(type="content_block_start", index=0, content_block=add),
+            SimpleNamespace(type="content_block_stop", index=0),
+            SimpleNamespace(type="content_block_start", index=1, content_block=link),
+            SimpleNamespace(type="content_block_stop", index=1),
+        ])
+
+        async def scenario():
+            return [_parse(c) async for c in mod._chat_events(mod.ChatMessage(message="go"))]
+
+        events = asyncio.run(scenario())
+        names = [e for e, _ in events]
+        assert names.count("tool_use") == 2
+        assert [d["id"] for e, d in events if e == "tool_result"] == ["tu_1", "tu_2"]
+        assert executed == ["add_nodes", "add_links"]
+        assert [a["type"] for a in events[-1][1]["actions"]] == ["add_nodes", "add_links"]
+
+    def test_model_failure_emits_error_then_done(self):
+        mod, _ = _load_chat([
+            SimpleNamespace(type="text", text="Hi"),
+            RuntimeError("overloaded"),
+        ])
+
+        async def scenario():
+            return [_parse(c) async for c in mod._chat_events(mod.ChatMessage(message="go"))]
+
+        events = asyncio.run(scenario())
+        assert [e for e, _ in events] == ["text", "error", "done"]
+        assert "overloaded" in events[1][1]["detail"]
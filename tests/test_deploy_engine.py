@@ -0,0 +1,277 @@
+"""
+Unit tests for the concurrent deploy engine (app/runtime/deploy.py).
+Runs without Docker or PostgreSQL — the runtime manager is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+for mod in ["sqlalchemy", "sqlalchemy.orm", "app", "app.db", "app.db.models",
+            "app.core", "app.runtime", "app.runtime.manager", "app.runtime.network",
+            "app.runtime.reconcile", "app.runtime.lab_events"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_engine(concurrency=4):
+    return _load_module(concurrency).DeployEngine
+
+
+def _load_capacity(admission="off"):
+    config = MagicMock()
+    config.settings.CAPACITY_ADMISSION = admission
+    config.settings.CAPACITY_CPU_RATIO = 1.0
+    config.settings.CAPACITY_MEMORY_RATIO = 1.0
+    config.settings.CAPACITY_QUEUE_TIMEOUT = 5
+    config.settings.CAPACITY_REFRESH_INTERVAL = 0.01
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "capacity_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/capacity.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_sessions():
+    spec = importlib.util.spec_from_file_location(
+        "sessions_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/sessions.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_module(concurrency=4):
+    sys.modules["app.runtime.capacity"] = _load_capacity()
+    sys.modules["app.runtime.sessions"] = _load_sessions()
+    config = MagicMock()
+    config.settings.DEPLOY_CONCURRENCY = concurrency
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "deploy_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/deploy.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class StubNode:
+    def __init__(self, name, image_id):
+        self.id = uuid.uuid4()
+        self.name = name
+        self.image_id = image_id
+        self.container_id = None
+        self.status = "stopped"
+        self.cpu = None
+        self.memory = None
+
+
+class FakeRuntime:
+    """Records peak concurrency and fails nodes whose image is 'bad'"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.capacity = sys.modules["app.runtime.capacity"].CapacityAccountant(self)
+
+    async def deploy_node(self, node, image, db):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if image.name == "bad":
+                node.status = "error"
+                raise RuntimeError("pull access denied")
+            node.container_id = f"cid-{node.name}"
+            node.status = "starting"
+            return {"container_id": node.container_id, "status": "starting"}
+        finally:
+            self.active -= 1
+
+
+class TestDeployEngine:
+
+    def _images(self):
+        good, bad = MagicMock(), MagicMock()
+        good.name, bad.name = "frr", "bad"
+        return {"good": good, "bad": bad}
+
+    def test_parallelism_is_bounded(self):
+        Engine = _load_engine(concurrency=3)
+        runtime = FakeRuntime()
+        nodes = [StubNode(f"R{i}", "good") for i in range(10)]
+
+        results = asyncio.run(Engine(runtime).deploy_nodes(nodes, self._images(), MagicMock()))
+
+        assert [r["status"] for r in results] == ["starting"] * 10
+        assert 1 < runtime.peak <= 3, f"peak concurrency was {runtime.peak}"
+
+    def test_partial_failure_is_isolated(self):
+        Engine = _load_engine()
+        runtime = FakeRuntime()
+        nodes = [StubNode("R1", "good"), StubNode("R2", "bad"), StubNode("R3", "good")]
+
+        results = asyncio.run(Engine(runtime).deploy_nodes(nodes, self._images(), MagicMock()))
+
+        by_name = {r["node"]: r for r in results}
+        assert by_name["R1"]["status"] == "starting"
+        assert by_name["R3"]["status"] == "starting"
+        assert by_name["R2"]["status"] == "error"
+        assert "pull access denied" in by_name["R2"]["error"]
+
+    def test_missing_image_marks_only_that_node(self):
+        Engine = _load_engine()
+        nodes = [StubNode("R1", "good"), StubNode("R2", "missing")]
+
+        results = asyncio.run(Engine(FakeRuntime()).deploy_nodes(nodes, self._images(), MagicMock()))
+
+        assert results[0]["status"] == "starting"
+        assert results[1]["status"] == "error"
+        assert nodes[1].status == "error"
+
+    def test_commits_run_off_the_loop_one_at_a_time(self):
+        Engine = _load_engine()
+        nodes = [StubNode(f"R{i}", "missing") for i in range(6)]
+        db = RecordingSession()
+
+        async def deploy():
+            db.loop_thread = threading.get_ident()
+            return await Engine(FakeRuntime()).deploy_nodes(nodes, self._images(), db)
+
+        results = asyncio.run(deploy())
+
+        assert [r["status"] for r in results] == ["error"] * 6
+        assert len(db.threads) == 6 and db.loop_thread not in db.threads
+        assert db.peak == 1
+
+
+class RecordingSession:
+    """Sync session stand-in recording where and how concurrently commits run"""
+
+    def __init__(self):
+        self.info = {}
+        self.threads = []
+        self.active = 0
+        self.peak = 0
+        self.loop_thread = None
+
+    def commit(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.threads.append(threading.get_ident())
+        time.sleep(0.005)
+        self.active -= 1
+
+
+class NotFound(Exception):
+    status_code = 404
+
+
+class TeardownRuntime:
+    """Removes containers with a delay; 'gone' is already removed, 'stuck' fails"""
+
+    def __init__(self, containers):
+        self.containers = containers
+        self.active = 0
+        self.peak = 0
+        self.docker = self
+        self.chaos = MagicMock()
+        self.chaos.cancel = MagicMock(side_effect=lambda lab_id: asyncio.sleep(0))
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return await fn(*args, **kwargs)
+
+    async def remove_container(self, container_id):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if container_id == "gone":
+                raise NotFound("No such container")
+            if container_id == "stuck":
+                raise RuntimeError("device or resource busy")
+            self.containers.pop(container_id)
+        finally:
+            self.active -= 1
+
+
+class TestDestroyLab:
+
+    def _engine(self, runtime, concurrency=3, progress=None):
+        mod = _load_module(concurrency)
+
+        async def list_lab_containers(rt, lab_id):
+            return {cid: {"id": cid, "name": f"neon_{lab_id}_{cid}"} for cid in ["gone", "stuck", *rt.containers]}
+
+        mod.list_lab_containers = list_lab_containers
+        return mod.DeployEngine(runtime, progress=progress)
+
+    def test_removes_concurrently_with_one_commit(self):
+        runtime = TeardownRuntime({f"c{i}": {} for i in range(8)})
+        lab, db = MagicMock(), MagicMock()
+
+        result = asyncio.run(self._engine(runtime).destroy_lab(lab, db))
+
+        assert runtime.containers == {}
+        assert 1 < runtime.peak <= 3, f"peak concurrency was {runtime.peak}"
+        assert result["removed"] == 9
+        assert [f["container_id"] for f in result["failed"]] == ["stuck"]
+        assert result["status"] == lab.status == "error"
+        assert result["duration_ms"] >= 0
+        assert db.execute.call_count == 2
+        db.commit.assert_called_once()
+        runtime.chaos.cancel.assert_called_once_with(str(lab.id))
+
+    def test_publishes_node_and_link_deltas_after_commit(self):
+        runtime = TeardownRuntime({"c0": {}})
+        lab, node, link = MagicMock(id=uuid.uuid4()), uuid.uuid4(), uuid.uuid4()
+        db = MagicMock()
+        db.execute.side_effect = [
+            MagicMock(all=lambda: [SimpleNamespace(id=node, lab_id=lab.id)]),
+            MagicMock(all=lambda: [SimpleNamespace(id=link, lab_id=lab.id)]),
+        ]
+
+        with patch.dict(sys.modules):
+            spec = importlib.util.spec_from_file_location(
+                "lab_events_mod",
+                pathlib.Path(__file__).parent.parent / "backend/app/runtime/lab_events.py",
+            )
+            events = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(events)
+            events._lab_event_bus = events.LabEventBus(depth=8)
+            sys.modules["app.runtime.lab_events"] = events
+            engine = self._engine(runtime)
+
+        async def scenario():
+            subscription = events.get_lab_event_bus().subscribe(lab.id)
+            await engine.destroy_lab(lab, db)
+            assert db.commit.called
+            return [await subscription.get(), await subscription.get()]
+
+        assert asyncio.run(scenario()) == [
+            {"type": "node", "id": str(node), "status": "stopped", "mgmt_ip": None},
+            {"type": "link", "id": str(link), "status": "down"},
+        ]
+
+    def test_reports_progress_per_container(self):
+        runtime = TeardownRuntime({f"c{i}": {} for i in range(3)})
+        reports = []
+
+        asyncio.run(self._engine(runtime, progress=lambda done, total: reports.append((done, total)))
+                    .destroy_lab(MagicMock(), MagicMock()))
+
+        assert reports[0] == (0, 5)
+        assert reports[-1] == (5, 5)
+        assert [done for done, _ in reports] == sorted(done for done, _ in reports)
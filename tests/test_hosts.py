@@ -0,0 +1,177 @@
+"""
+Unit tests for multi-host sharding (app/runtime/hosts.py) and VXLAN link ends.
+Runs without Docker or root — hosts, engines and the helper container are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "app", "app.core", "app.db", "app.db.base",
+            "app.db.models", "app.runtime", "app.runtime.docker", "app.runtime.netlink"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_hosts(hosts=()):
+    config = MagicMock()
+    config.settings.LOCAL_HOST_NAME = "local"
+    config.settings.LOCAL_VTEP = None
+    config.settings.DOCKER_HOSTS = list(hosts)
+    config.settings.CAPACITY_CPU_RATIO = 1.0
+    config.settings.CAPACITY_MEMORY_RATIO = 1.0
+    config.settings.PLACEMENT_IMBALANCE = 0.1
+    sys.modules["app.core.config"] = config
+    sys.modules["app.runtime.network"] = MagicMock()
+    sys.modules["app.runtime.capacity"] = _load("capacity_mod_hosts", "app/runtime/capacity.py")
+    sys.modules["app.runtime.placement"] = _load("placement_mod_hosts", "app/runtime/placement.py")
+    return _load("hosts_mod", "app/runtime/hosts.py")
+
+
+def _node(name, host=None):
+    return SimpleNamespace(id=name, name=name, host=host, image_id=None, cpu=None, memory=None)
+
+
+def _link(a, b):
+    return SimpleNamespace(id=uuid.uuid4(), source_node_id=a.id, target_node_id=b.id)
+
+
+class FakeEngine:
+    """Docker and network surface of one host"""
+
+    def __init__(self, containers, cpus=4):
+        self.containers = containers
+        self.cpus = cpus
+
+    async def host_info(self):
+        return {"cpus": self.cpus, "memory": 8192}
+
+    async def list_neon_containers(self):
+        return [{"id": cid, "status": "running"} for cid in self.containers]
+
+    async def list_containers(self, filters):
+        return [{"id": cid, "labels": {"neon.cpu": "1", "neon.memory": "1024"}} for cid in self.containers]
+
+    def get_pids(self, container_ids):
+        return {cid: self.containers[cid] for cid in container_ids}
+
+
+class TestHostRegistry:
+
+    def test_stand_in_shares_local_engine(self):
+        mod = _load_hosts([{"name": "standin", "url": "local"}])
+        engine = FakeEngine({"c1": 101})
+        registry = mod.HostRegistry(engine, engine)
+
+        assert registry.sharded
+        assert registry.hosts["standin"].docker is engine
+        assert [h.name for h in registry.engines()] == ["local"]
+        free = asyncio.run(registry.capacities())
+        assert {name: (r.cpu, r.memory) for name, r in free.items()} == {
+            "local": (1.5, 3584), "standin": (1.5, 3584)
+        }
+        with pytest.raises(ValueError, match="Unknown Docker host"):
+            registry.get("nowhere")
+
+    def test_assign_only_places_unhosted_nodes(self):
+        mod = _load_hosts([{"name": "standin", "url": "local"}])
+        engine = FakeEngine({})
+        registry = mod.HostRegistry(engine, engine)
+        nodes = [_node("R1", host="standin"), _node("R2"), _node("R3")]
+
+        asyncio.run(registry.assign(nodes, [_link(nodes[0], nodes[1])], images={}))
+
+        assert nodes[0].host == "standin"
+        assert nodes[1].host == "standin"  # next to its already placed neighbour
+        assert nodes[2].host == "local"
+
+
+class TestShardedFacades:
+
+    def _registry(self, mod):
+        local, remote = FakeEngine({"c1": 101}), FakeEngine({"c2": 202}, cpus=8)
+        registry = mod.HostRegistry(local, local)
+        registry.hosts["edge"] = mod.DockerHost("edge", remote, remote, vtep="10.0.0.2", kernel="tcp://edge")
+        registry.bind("c1", registry.local)
+        registry.bind("c2", registry.hosts["edge"])
+        return registry
+
+    def test_listings_are_merged_with_their_host(self):
+        mod = _load_hosts()
+        registry = self._registry(mod)
+
+        docker = mod.ShardedDocker(registry)
+        containers = asyncio.run(docker.list_neon_containers())
+        info = asyncio.run(docker.host_info())
+
+        assert {c["id"]: c["host"] for c in containers} == {"c1": "local", "c2": "edge"}
+        assert info == {"cpus": 12, "memory": 16384}
+
+    def test_pids_resolved_on_owning_hosts(self):
+        mod = _load_hosts()
+        network = mod.ShardedNetwork(self._registry(mod))
+
+        assert asyncio.run(network.get_pids(["c1", "c2"])) == {"c1": 101, "c2": 202}
+
+
+class TestHostShell:
+
+    def test_stdin_goes_through_environment(self):
+        mod = _load_hosts()
+        helper = MagicMock()
+        helper.exec_run.return_value = (0, (b"ok\n", None))
+        shell = mod.HostShell(MagicMock())
+        shell._helper = helper
+
+        result = shell.run(["ip", "-batch", "-"], input="link del x\n", capture_output=True, text=True)
+
+        command = helper.exec_run.call_args.args[0]
+        assert command[-3:] == ["ip", "-batch", "-"] and command[:2] == ["sh", "-c"]
+        assert helper.exec_run.call_args.kwargs["environment"] == {"NEON_STDIN": "link del x\n"}
+        assert result.stdout == "ok\n" and result.returncode == 0
+
+    def test_check_raises_on_failure(self):
+        mod = _load_hosts()
+        helper = MagicMock()
+        helper.exec_run.return_value = (1, (None, b"RTNETLINK answers: File exists"))
+        shell = mod.HostShell(MagicMock())
+        shell._helper = helper
+
+        with pytest.raises(mod.subprocess.CalledProcessError):
+            shell.run(["ip", "link", "add", "x"], check=True)
+
+
+class TestVxlanCommands:
+
+    def test_host_mode_moves_device_into_container(self):
+        network = _load("net_mod_hosts", "app/runtime/network.py")
+
+        commands = network.vxlan_commands(4211, "eth1", 5000, "10.0.0.2", local="10.0.0.1")
+
+        assert commands[0] == ["ip", "link", "add", "vx5000", "type", "vxlan", "id", "5000",
+                               "remote", "10.0.0.2", "dstport", "4789", "local", "10.0.0.1"]
+        assert commands[1] == ["ip", "link", "set", "vx5000", "netns", "4211"]
+        assert commands[2][-4:] == ["set", "vx5000", "name", "eth1"]
+        assert commands[-2][-2:] == ["mtu", "1450"]
+
+    def test_namespace_mode_creates_device_in_container(self):
+        network = _load("net_mod_hosts", "app/runtime/network.py")
+
+        commands = network.vxlan_commands(4211, "eth1", 5000, "172.17.0.3", in_namespace=True)
+
+        assert commands[0][:8] == ["nsenter", "-t", "4211", "-n", "ip", "link", "add", "eth1"]
+        assert all(c[:4] == ["nsenter", "-t", "4211", "-n"] for c in commands)
+        assert len(commands) == 3
@@ -0,0 +1,142 @@
+"""
+Unit tests for the in-process image catalog (app/services/image_catalog.py).
+Runs without PostgreSQL — the catalog loader is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+for mod in ["sqlalchemy", "sqlalchemy.orm", "sqlalchemy.ext.asyncio", "app", "app.db", "app.db.models",
+            "app.core", "app.core.config"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_catalog_module():
+    models = MagicMock()
+    for name in ["Image", "ImageInterface", "ImageTag", "Vendor"]:
+        setattr(models, name, type(name, (), {}))
+    sys.modules["app.db.models"] = models
+
+    spec = importlib.util.spec_from_file_location(
+        "image_catalog_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/services/image_catalog.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _image(mod, name, type, vendor, tags=(), display_name=None):
+    return mod.CatalogImage(
+        id=uuid.uuid4(), name=name, display_name=display_name or name.upper(),
+        type=type, runtime="docker", vendor=vendor, tags=tuple(tags),
+        summary={"name": name},
+    )
+
+
+class TestImageCatalog:
+
+    def _catalog(self, ttl=300):
+        mod = _load_catalog_module()
+        images = [
+            _image(mod, "ceos-lab", "switch", "arista", tags=["datacenter"]),
+            _image(mod, "ceos", "router", "arista", tags=["datacenter", "bgp"]),
+            _image(mod, "frr", "router", "frr", tags=["bgp", "open-source"]),
+            _image(mod, "alpine", "host", "linux"),
+        ]
+        loads = []
+
+        def loader(db):
+            loads.append(db)
+            return list(images)
+
+        return mod, mod.ImageCatalog(ttl=ttl, loader=loader), images, loads
+
+    def test_indexes_answer_filters_from_one_load(self):
+        mod, catalog, images, loads = self._catalog()
+        catalog.load_sync("db")
+
+        assert [i.name for i in catalog.filter(type="router")] == ["ceos", "frr"]
+        assert [i.name for i in catalog.filter(tag="bgp", vendor="frr")] == ["frr"]
+        assert [i.name for i in catalog.filter(search="CEOS")] == ["ceos-lab", "ceos"]
+        assert catalog.filter(vendor="cisco") == []
+        assert catalog.get(images[3].id) is images[3]
+        assert loads == ["db"]
+
+    def test_find_prefers_exact_name_then_substring(self):
+        mod, catalog, images, loads = self._catalog()
+        catalog.load_sync("db")
+
+        assert catalog.find(name="ceos").name == "ceos"
+        assert catalog.find(name="ceos", type="switch").name == "ceos-lab"
+        assert catalog.find(name="fr", vendor="frr").name == "frr"
+        assert catalog.find(type="host").name == "alpine"
+        assert catalog.find(name="srlinux") is None
+
+    def test_invalidate_and_ttl_trigger_reload(self):
+        mod, catalog, images, loads = self._catalog()
+        with pytest.raises(RuntimeError, match="not loaded"):
+            catalog.images()
+
+        catalog.load_sync("db").images()
+        catalog.load_sync("db").images()
+        assert len(loads) == 1
+
+        catalog.invalidate()
+        catalog.load_sync("db")
+        assert len(loads) == 2
+
+        catalog.ttl = 0
+        catalog.load_sync("db")
+        assert len(loads) == 3
+
+    def test_invalidation_during_a_load_keeps_the_catalog_stale(self):
+        mod, catalog, images, loads = self._catalog()
+
+        def loader(db):
+            loads.append(db)
+            if len(loads) == 1:
+                catalog.invalidate()  # a commit lands while the query runs
+            return list(images)
+
+        catalog._loader = loader
+        catalog.load_sync("db")
+        catalog.load_sync("db")
+        assert len(loads) == 2
+
+    def test_concurrent_async_loads_share_one_reload(self):
+        mod, catalog, images, loads = self._catalog()
+
+        class FakeAsyncSession:
+            async def run_sync(self, fn, *args):
+                await asyncio.sleep(0)  # the query yields to the event loop
+                return fn("sync-session", *args)
+
+        async def requests():
+            db = FakeAsyncSession()
+            return await asyncio.gather(*(catalog.load(db) for _ in range(5)))
+
+        assert asyncio.run(requests()) == [catalog] * 5
+        assert loads == ["sync-session"]
+
+    def test_commit_of_catalog_write_invalidates_singleton(self):
+        mod, catalog, images, loads = self._catalog()
+        mod._image_catalog = catalog
+        version = catalog.version
+
+        session = SimpleNamespace(new=[mod.Image()], dirty=[], deleted=[], info={})
+        mod._track_catalog_writes(session, None)
+        mod._invalidate_on_commit(session)
+        assert catalog.version == version + 1
+
+        # Flushes that only touch non-catalog models leave it alone
+        session = SimpleNamespace(new=[object()], dirty=[], deleted=[], info={})
+        mod._track_catalog_writes(session, None)
+        mod._invalidate_on_commit(session)
+        assert catalog.version == version + 1
@@ -0,0 +1,117 @@
+"""
+Unit tests for the image pre-pull scheduler (app/runtime/pull.py).
+Runs without Docker or PostgreSQL — the Docker runtime is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+from unittest.mock import MagicMock
+
+for mod in ["app", "app.db", "app.db.base", "app.core", "app.services",
+            "app.services.image_catalog"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_pull():
+    config = MagicMock()
+    config.settings.IMAGE_PULL_CONCURRENCY = 1
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "pull_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/pull.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakeDocker:
+    def __init__(self, fail=False):
+        self.pulls = []
+        self.local = set()
+        self.release = asyncio.Event()
+        self.fail = fail
+
+    async def image_exists(self, image):
+        return image in self.local
+
+    async def pull_image(self, image, on_progress=None):
+        self.pulls.append(image)
+        on_progress({"status": "Pulling from library/frr", "id": "latest"})
+        on_progress({"status": "Already exists", "id": "aaa"})
+        on_progress({"status": "Downloading", "id": "bbb", "progressDetail": {"current": 25, "total": 100}})
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("manifest unknown")
+        on_progress({"status": "Download complete", "id": "bbb"})
+        on_progress({"status": "Pull complete", "id": "bbb"})
+        self.local.add(image)
+
+
+class FakeRuntime:
+    def __init__(self, docker):
+        self.docker = docker
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return await fn(*args, **kwargs)
+
+
+class TestImagePuller:
+
+    def test_deploys_join_in_flight_background_pull(self):
+        mod = _load_pull()
+
+        async def scenario():
+            docker = FakeDocker()
+            puller = mod.ImagePuller(FakeRuntime(docker))
+            puller.schedule(["frr:latest", "frr:latest"])
+            deploys = [asyncio.create_task(puller.ensure("frr:latest")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+
+            midway = puller.progress()[0]
+            docker.release.set()
+            await asyncio.gather(*deploys)
+            await puller.ensure("frr:latest")
+            return docker, midway, puller.progress()[0]
+
+        docker, midway, final = asyncio.run(scenario())
+        assert docker.pulls == ["frr:latest"]
+        assert (midway["status"], midway["percent"], midway["layers_cached"]) == ("pulling", 25.0, 1)
+        assert (final["status"], final["layers_done"], final["percent"]) == ("complete", 2, 100.0)
+
+    def test_failed_pull_reaches_every_waiter_and_can_be_retried(self):
+        mod = _load_pull()
+
+        async def scenario():
+            docker = FakeDocker(fail=True)
+            puller = mod.ImagePuller(FakeRuntime(docker))
+            waiters = [asyncio.create_task(puller.ensure("srlinux:bad")) for _ in range(2)]
+            await asyncio.sleep(0)
+            docker.release.set()
+            results = await asyncio.gather(*waiters, return_exceptions=True)
+
+            docker.fail = False
+            await puller.ensure("srlinux:bad")
+            return docker, results, puller.progress()[0]
+
+        docker, results, retried = asyncio.run(scenario())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert docker.pulls == ["srlinux:bad", "srlinux:bad"]
+        assert retried["status"] == "complete"
+
+    def test_present_image_is_not_pulled(self):
+        mod = _load_pull()
+
+        async def scenario():
+            docker = FakeDocker()
+            docker.local.add("alpine:3")
+            puller = mod.ImagePuller(FakeRuntime(docker))
+            await puller.ensure("alpine:3")
+            return docker, puller.schedule(["alpine:3"]), puller.progress()[0]
+
+        docker, scheduled, progress = asyncio.run(scenario())
+        assert docker.pulls == [] and scheduled == []
+        assert progress["status"] == "present"
@@ -0,0 +1,171 @@
+"""
+Unit tests for the background job queue (app/runtime/jobs.py).
+Runs without Docker or PostgreSQL — sessions and the deploy engine are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+for mod in ["sqlalchemy", "sqlalchemy.exc", "sqlalchemy.orm", "app", "app.db", "app.db.base",
+            "app.db.models", "app.core", "app.runtime", "app.runtime.deploy",
+            "app.runtime.manager", "app.runtime.lab_events"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+class FakeQuery:
+    def __init__(self, row):
+        self.row = row
+
+    def options(self, *args):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.row
+
+
+class FakeSession:
+    """Every session sees the same job and lab rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.commits = 0
+        self.info = {}
+
+    def query(self, model):
+        return FakeQuery(self.rows.get(model))
+
+    def add(self, row):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeEngine:
+    """Deploys in four steps; `block` keeps it running until cancelled"""
+
+    block = False
+
+    def __init__(self, runtime, progress=None):
+        self.progress = progress
+
+    async def _steps(self):
+        for done in range(1, 5):
+            self.progress(done, 4)
+            await asyncio.sleep(0)
+        if self.block:
+            await asyncio.sleep(60)
+        return {"status": "running", "nodes": [], "links": [], "failed_nodes": []}
+
+    deploy_lab = reconcile_lab = destroy_lab = lambda self, lab, db: self._steps()
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, pathlib.Path(__file__).parent.parent / "backend" / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _setup(block=False):
+    config = MagicMock()
+    config.settings.JOB_WORKERS = 1
+    sys.modules["app.core.config"] = config
+    sys.modules["app.runtime.sessions"] = _load("sessions_mod_jobs", "app/runtime/sessions.py")
+
+    mod = _load("jobs_mod", "app/runtime/jobs.py")
+
+    job = SimpleNamespace(id=uuid.uuid4(), lab_id=uuid.uuid4(), kind="deploy", status="running",
+                          progress=0, cancel_requested=False, result=None, error=None,
+                          created_at=None, started_at=None, heartbeat_at=None, finished_at=None)
+    lab = SimpleNamespace(id=job.lab_id, name="lab", status="deploying",
+                          nodes=[SimpleNamespace(container_id="cid-R1"), SimpleNamespace(container_id=None)])
+    db = FakeSession({mod.Job: job, mod.Lab: lab})
+
+    FakeEngine.block = block
+    mod.SessionLocal = lambda **options: db
+    mod.DeployEngine = FakeEngine
+    mod.get_runtime = MagicMock()
+    return mod, mod.JobQueue(), job, lab, db
+
+
+class TestJobQueue:
+
+    def test_successful_job_records_result_and_progress(self):
+        mod, queue, job, lab, db = _setup()
+
+        asyncio.run(queue._execute(job.id, job.lab_id, "deploy"))
+
+        assert job.status == "succeeded"
+        assert job.progress == 100
+        assert job.result["status"] == "running"
+        assert job.finished_at is not None
+        assert queue._running == {} and queue._progress == {}
+
+    def test_cancel_interrupts_running_job_and_settles_lab(self):
+        mod, queue, job, lab, db = _setup(block=True)
+
+        async def scenario():
+            task = asyncio.create_task(queue._execute(job.id, job.lab_id, "deploy"))
+            queue._running[job.id] = task
+            for _ in range(10):
+                await asyncio.sleep(0)
+            live = queue.describe(job)["progress"]
+            queue.cancel(job, db)
+            await task
+            return live
+
+        live = asyncio.run(scenario())
+
+        assert live == 99  # 4/4 steps but not finished yet
+        assert job.status == "cancelled" and job.cancel_requested
+        assert lab.status == "running"  # one node kept its container
+
+    def test_shutdown_requeues_running_job(self):
+        mod, queue, job, lab, db = _setup(block=True)
+
+        async def scenario():
+            task = asyncio.create_task(queue._execute(job.id, job.lab_id, "deploy"))
+            queue._running[job.id] = task
+            await asyncio.sleep(0)
+            await queue.stop()
+
+        asyncio.run(scenario())
+
+        assert job.status == "queued"
+        assert job.progress == 0 and job.finished_at is None
+
+    def test_enqueue_rejects_second_active_job(self):
+        mod, queue, job, lab, db = _setup()
+
+        with pytest.raises(ValueError, match="already has a running deploy job"):
+            queue.enqueue(lab, "destroy", db)
+
+    def test_enqueue_losing_a_race_is_rejected(self):
+        mod, queue, job, lab, db = _setup()
+        mod.IntegrityError = type("IntegrityError", (Exception,), {})
+        db.rows[mod.Job] = None  # the other job is not visible yet when checking
+
+        def commit():
+            raise mod.IntegrityError("duplicate key value violates unique constraint")
+
+        db.commit = commit
+
+        with pytest.raises(ValueError, match="already has an active job"):
+            queue.enqueue(lab, "destroy", db)
+        assert not queue._wake.is_set()
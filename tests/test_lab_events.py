@@ -0,0 +1,134 @@
+"""
+Unit tests for the lab event bus (app/runtime/lab_events.py).
+Runs without PostgreSQL — sessions and models are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import threading
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+for mod in ["sqlalchemy", "sqlalchemy.orm", "app", "app.db", "app.core", "app.core.config"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_events_module():
+    models = MagicMock()
+    for name in ["Job", "Lab", "Link", "Node"]:
+        setattr(models, name, type(name, (), {}))
+    sys.modules["app.db.models"] = models
+
+    spec = importlib.util.spec_from_file_location(
+        "lab_events_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/lab_events.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _history(changed):
+    """inspect() stand-in reporting `changed` columns as modified"""
+    def inspect(obj):
+        return SimpleNamespace(attrs={
+            column: SimpleNamespace(history=SimpleNamespace(has_changes=lambda c=column: c in changed))
+            for column in ("status", "mgmt_ip", "host")
+        })
+    return inspect
+
+
+class TestLabEventBus:
+
+    def test_fan_out_to_subscribers_of_the_lab_only(self):
+        mod = _load_events_module()
+        bus = mod.LabEventBus(depth=8)
+        lab, other = uuid.uuid4(), uuid.uuid4()
+
+        async def scenario():
+            first, second, elsewhere = bus.subscribe(lab), bus.subscribe(lab), bus.subscribe(other)
+            bus.publish(lab, {"type": "node", "id": "n1", "status": "running"})
+            assert await first.get() == await second.get() == {"type": "node", "id": "n1", "status": "running"}
+            assert elsewhere.queue.empty()
+
+            first.close()
+            second.close()
+            assert bus.subscriber_count(lab) == 0
+
+        asyncio.run(scenario())
+
+    def test_publish_from_worker_thread_is_delivered_on_the_loop(self):
+        mod = _load_events_module()
+        bus = mod.LabEventBus(depth=8)
+        lab = uuid.uuid4()
+
+        async def scenario():
+            subscription = bus.subscribe(lab)
+            thread = threading.Thread(target=bus.publish, args=(lab, {"type": "link", "id": "l1", "status": "up"}))
+            thread.start()
+            thread.join()
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        assert asyncio.run(scenario()) == {"type": "link", "id": "l1", "status": "up"}
+
+    def test_slow_subscriber_is_told_to_resync(self):
+        mod = _load_events_module()
+        bus = mod.LabEventBus(depth=4)
+        lab = uuid.uuid4()
+
+        async def scenario():
+            subscription = bus.subscribe(lab)
+            for i in range(5):
+                bus.publish(lab, {"type": "job", "id": "j1", "progress": i})
+            bus.publish(lab, {"type": "lab", "id": str(lab), "status": "running"})
+            return [await subscription.get() for _ in range(subscription.queue.qsize())]
+
+        assert asyncio.run(scenario()) == [
+            {"type": "resync"}, {"type": "lab", "id": str(lab), "status": "running"}
+        ]
+
+
+class TestCommitHooks:
+
+    def test_only_changed_columns_are_published_after_commit(self):
+        mod = _load_events_module()
+        mod.inspect = _history({"status", "mgmt_ip"})
+        bus = mod._lab_event_bus = mod.LabEventBus(depth=8)
+        lab = uuid.uuid4()
+        node = mod.Node()
+        node.id, node.lab_id, node.status, node.mgmt_ip, node.host = uuid.uuid4(), lab, "running", "172.20.0.5", "local"
+
+        async def scenario():
+            subscription = bus.subscribe(lab)
+            session = SimpleNamespace(new=[], dirty=[node, object()], deleted=[], info={})
+            mod._collect_deltas(session, None)
+            mod._publish_on_commit(session)
+
+            rolled_back = SimpleNamespace(new=[], dirty=[node], deleted=[], info={})
+            mod._collect_deltas(rolled_back, None)
+            mod._discard_on_rollback(rolled_back)
+            mod._publish_on_commit(rolled_back)
+
+            return [await subscription.get() for _ in range(subscription.queue.qsize())]
+
+        assert asyncio.run(scenario()) == [
+            {"type": "node", "id": str(node.id), "status": "running", "mgmt_ip": "172.20.0.5"}
+        ]
+
+    def test_bulk_update_publishes_tracked_values_per_row(self):
+        mod = _load_events_module()
+        bus = mod._lab_event_bus = mod.LabEventBus(depth=8)
+        lab, job = uuid.uuid4(), uuid.uuid4()
+
+        async def scenario():
+            subscription = bus.subscribe(lab)
+            mod.publish_bulk_update(
+                mod.Job, [SimpleNamespace(id=job, lab_id=lab, kind="deploy")], {"status": "queued", "progress": 0}
+            )
+            return [await subscription.get() for _ in range(subscription.queue.qsize())]
+
+        assert asyncio.run(scenario()) == [
+            {"type": "job", "id": str(job), "status": "queued", "kind": "deploy", "progress": 0}
+        ]
@@ -0,0 +1,205 @@
+"""
+Unit tests for live link impairment updates (app/runtime/network.py, manager.py).
+Runs without Docker or root — tc invocations and the network layer are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "sqlalchemy", "sqlalchemy.orm",
+            "app", "app.core", "app.core.config", "app.db", "app.db.models",
+            "app.runtime", "app.runtime.netlink", "app.runtime.docker",
+            "app.runtime.docker_async", "app.runtime.events", "app.runtime.pool",
+            "app.runtime.pull", "app.runtime.wiring", "app.runtime.chaos",
+            "app.runtime.orphans", "app.runtime.capacity", "app.runtime.hosts",
+            "app.runtime.sessions"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_network():
+    network = _load("net_mod_impairment", "app/runtime/network.py")
+    sys.modules["app.runtime.network"] = network
+    return network
+
+
+class TestTcUpdateCommands:
+
+    def test_same_layout_is_replaced_in_place(self):
+        network = _load_network()
+        previous = network.impairment("100mbit", 10, None)
+
+        commands = network.tc_update_commands("eth1", previous, "100mbit", 50, 1.0)
+
+        assert [c[1] for c in commands] == ["replace", "replace"]
+        assert "parent" in commands[1] and "netem" in commands[1]
+        assert commands[1][-4:] == ["delay", "50ms", "loss", "1.0%"]
+
+    def test_chained_to_bandwidth_only_replaces_netem_child_with_fifo(self):
+        network = _load_network()
+        previous = network.impairment("100mbit", 10, None)
+
+        commands = network.tc_update_commands("eth1", previous, "100mbit")
+
+        assert commands[0][:2] == ["qdisc", "replace"] and "tbf" in commands[0]
+        assert commands[1] == ["qdisc", "replace", "dev", "eth1", "parent", "1:1", "pfifo"]
+
+    def test_clearing_impairment_deletes_root_only_when_present(self):
+        network = _load_network()
+
+        assert network.tc_update_commands("eth1", network.impairment(delay_ms=10)) == [
+            ["qdisc", "del", "dev", "eth1", "root"]
+        ]
+        assert network.tc_update_commands("eth1", network.impairment()) == []
+
+    def test_set_impairment_is_one_tc_process(self):
+        network = _load_network()
+        nm = network.NetworkManager.__new__(network.NetworkManager)
+        nm.client = MagicMock()
+        nm.client.containers.get.return_value.attrs = {"State": {"Pid": 1234}}
+
+        with patch("subprocess.run") as mock_run:
+            ok = nm.set_impairment(
+                "c1", "eth1", "1gbit", 20, None, previous=network.impairment(delay_ms=5)
+            )
+
+        assert ok
+        assert mock_run.call_count == 1
+        args, kwargs = mock_run.call_args
+        assert args[0] == ["nsenter", "-t", "1234", "-n", "tc", "-batch", "-"]
+        assert kwargs["input"].count("qdisc replace") == 2
+
+
+class TestImpairmentModel:
+
+    def test_netem_args_follow_tc_grammar(self):
+        network = _load_network()
+        imp = network.Impairment(
+            delay_ms=40, jitter_ms=5, delay_correlation=25, delay_distribution="normal",
+            loss_percent=1.5, loss_correlation=30, duplicate_percent=1,
+            reorder_percent=10, corrupt_percent=0.1,
+        )
+
+        assert imp.netem_args() == [
+            "delay", "40ms", "5ms", "25%", "distribution", "normal",
+            "loss", "1.5%", "30%", "duplicate", "1%", "reorder", "10%", "corrupt", "0.1%",
+        ]
+
+    def test_invalid_combinations_are_rejected(self):
+        network = _load_network()
+        for bad in (
+            network.Impairment(jitter_ms=5),
+            network.Impairment(delay_ms=10, delay_distribution="normal"),
+            network.Impairment(delay_ms=10, jitter_ms=2, delay_distribution="gaussian"),
+            network.Impairment(reorder_percent=5),
+            network.Impairment(bandwidth="fast"),
+        ):
+            try:
+                bad.validate()
+            except ValueError:
+                continue
+            raise AssertionError(f"{bad} should not validate")
+
+    def test_tbf_burst_scales_with_rate(self):
+        network = _load_network()
+
+        assert network.tbf_parameters("1mbit") == (4000, 64)
+        burst, latency = network.tbf_parameters("10gbit")
+        assert burst == 5_000_000 and latency == 50
+        assert network.Impairment(bandwidth="10gbit").tbf_args() == [
+            "rate", "10gbit", "burst", "5000000", "latency", "50ms"
+        ]
+
+    def test_parse_qdiscs_reads_rich_netem(self):
+        network = _load_network()
+        output = (
+            "qdisc netem 8001: dev eth1 root refcnt 2 limit 1000 delay 40ms  5ms 25% "
+            "loss 1.5% 30% duplicate 1% reorder 10% corrupt 0.1%\n"
+        )
+        desired = network.Impairment(
+            delay_ms=40, jitter_ms=5, delay_correlation=25, delay_distribution="normal",
+            loss_percent=1.5, loss_correlation=30, duplicate_percent=1,
+            reorder_percent=10, corrupt_percent=0.1,
+        )
+
+        actual = network.parse_qdiscs(output)["eth1"]
+
+        assert network.impairment_matches(desired.normalized(), actual)
+        assert not network.impairment_matches(network.impairment(delay_ms=40), actual)
+
+
+class FakeNetwork:
+    """Fails every update on `broken` container IDs and records the rest"""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.calls = []
+
+    def set_impairment(self, container_id, interface, bandwidth=None, delay_ms=None,
+                       loss_percent=None, previous=None, **netem):
+        self.calls.append((container_id, delay_ms))
+        return container_id not in self.broken
+
+
+def _manager(network):
+    _load_network()
+    mod = _load("manager_mod_impairment", "app/runtime/manager.py")
+    manager = mod.RuntimeManager.__new__(mod.RuntimeManager)
+    manager.network = network
+    manager._link_locks = {}
+    return manager
+
+
+def _link(status="up"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), status=status,
+        source_node=SimpleNamespace(container_id="c1"), source_interface="eth1",
+        target_node=SimpleNamespace(container_id="c2"), target_interface="eth1",
+        bandwidth=None, delay_ms=10, loss_percent=None,
+    )
+
+
+class TestUpdateLinkImpairment:
+
+    def test_both_ends_updated_and_stored(self):
+        network = FakeNetwork()
+        link, db = _link(), AsyncMock()
+
+        result = asyncio.run(_manager(network).update_link_impairment(link, {"delay_ms": 80}, db))
+
+        assert result["status"] == "updated"
+        assert sorted(network.calls) == [("c1", 80), ("c2", 80)]
+        assert link.delay_ms == 80
+        db.commit.assert_awaited_once()
+
+    def test_failed_end_rolls_back_the_other(self):
+        network = FakeNetwork(broken={"c2"})
+        link, db = _link(), AsyncMock()
+
+        result = asyncio.run(_manager(network).update_link_impairment(link, {"delay_ms": 80}, db))
+
+        assert result["status"] == "error"
+        assert network.calls[-1] == ("c1", 10)   # back to the previous delay
+        assert link.delay_ms == 10
+        db.commit.assert_not_awaited()
+
+    def test_unwired_link_is_only_stored(self):
+        network = FakeNetwork()
+        link, db = _link(status="down"), AsyncMock()
+
+        result = asyncio.run(_manager(network).update_link_impairment(link, {"delay_ms": 80}, db))
+
+        assert result["status"] == "stored" and not network.calls
+        assert link.delay_ms == 80
@@ -0,0 +1,86 @@
+"""
+Unit tests for event-driven node readiness (app/runtime/events.py).
+Runs without Docker or PostgreSQL — the Engine client is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+from unittest.mock import MagicMock
+
+for mod in ["app", "app.db", "app.db.base", "app.db.models", "app.runtime",
+            "app.runtime.docker_async"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+class FakeDockerAPIError(Exception):
+    pass
+
+
+def _load_events():
+    sys.modules["app.runtime.docker_async"].DockerAPIError = FakeDockerAPIError
+    spec = importlib.util.spec_from_file_location(
+        "events_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/events.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.NodeEventWatcher
+
+
+class FakeDocker:
+    def __init__(self, state):
+        self.state = state
+
+    async def inspect_container(self, container_id):
+        return {"State": self.state}
+
+    async def get_container_ip(self, container_id):
+        return "172.17.0.5"
+
+
+def _event(action, **attributes):
+    return {
+        "Action": action,
+        "Actor": {"ID": "cid1", "Attributes": {"neon.node_id": "n1", **attributes}},
+    }
+
+
+class TestNodeEventWatcher:
+
+    def _watcher(self, state):
+        Watcher = _load_events()
+        watcher = Watcher(docker=FakeDocker(state))
+        updates = []
+        watcher._update_node = lambda *args: updates.append(args)
+        return watcher, updates
+
+    def test_start_marks_running_and_wakes_waiter(self):
+        watcher, updates = self._watcher({"Status": "created"})
+
+        async def scenario():
+            waiter = asyncio.create_task(watcher.wait_for_ready("cid1", timeout=1))
+            await asyncio.sleep(0)
+            watcher.docker.state = {"Status": "running"}
+            await watcher.handle_event(_event("start"))
+            return await waiter
+
+        assert asyncio.run(scenario()) is True
+        assert updates == [("n1", "cid1", "running", "172.17.0.5")]
+
+    def test_healthcheck_waits_for_healthy(self):
+        watcher, updates = self._watcher({"Status": "running", "Health": {"Status": "starting"}})
+
+        async def scenario():
+            await watcher.handle_event(_event("start"))
+            await watcher.handle_event(_event("health_status: healthy"))
+
+        asyncio.run(scenario())
+        assert [u[2] for u in updates] == ["starting", "running"]
+
+    def test_crash_marks_error(self):
+        watcher, updates = self._watcher({"Status": "exited"})
+
+        asyncio.run(watcher.handle_event(_event("die", exitCode="137")))
+
+        assert updates == [("n1", "cid1", "error", None)]
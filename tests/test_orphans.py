@@ -0,0 +1,120 @@
+"""
+Unit tests for the orphan collector (app/runtime/orphans.py).
+Runs without Docker, root or PostgreSQL — the runtime and nodes table are faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+from unittest.mock import MagicMock
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "app", "app.core", "app.core.config", "app.db", "app.db.base",
+            "app.db.models", "app.runtime", "app.runtime.pool", "app.runtime.netlink"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_collector(known):
+    config = MagicMock()
+    config.settings.ORPHAN_GC_GRACE = 60
+    config.settings.DEPLOY_CONCURRENCY = 4
+    sys.modules["app.core.config"] = config
+
+    mod = _load("orphans_mod", "app/runtime/orphans.py")
+    mod.POOL_NAME_PREFIX = "neon_pool_"
+    mod.OrphanCollector._known_container_ids = staticmethod(lambda: set(known))
+    return mod
+
+
+class FakeRuntime:
+    def __init__(self, containers, veths):
+        self.containers = containers
+        self.veths = veths
+        self.docker = self
+        self.network = self
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return await fn(*args, **kwargs)
+
+    async def list_neon_containers(self):
+        return [{"id": cid, "name": name, "status": "running"} for cid, name in self.containers.items()]
+
+    async def remove_container(self, container_id):
+        self.containers.pop(container_id)
+
+    async def list_host_veths(self):
+        return list(self.veths)
+
+    async def delete_host_veths(self, names):
+        self.veths = [v for v in self.veths if v not in names]
+
+
+class TestParseHostVeths:
+
+    def test_matches_only_neon_veth_ends(self):
+        network = _load("net_mod_orphans", "app/runtime/network.py")
+        output = (
+            "31: veth4211_eth1@veth4302_eth1: <BROADCAST,MULTICAST,M-DOWN> mtu 1500\n"
+            "32: veth4302_eth1@veth4211_eth1: <BROADCAST,MULTICAST,M-DOWN> mtu 1500\n"
+            "9: veth3a1f0c2@if8: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 master docker0\n"
+        )
+        assert network.parse_host_veths(output) == ["veth4211_eth1", "veth4302_eth1"]
+
+
+class TestOrphanCollector:
+
+    def _runtime(self):
+        return FakeRuntime(
+            containers={"known": "neon_lab_R1", "leaked": "neon_lab_R2", "idle": "neon_pool_abc_123"},
+            veths=["veth4211_eth1", "veth4302_eth1"],
+        )
+
+    def test_dry_run_reports_without_reclaiming(self):
+        mod = _load_collector(known={"known"})
+        runtime = self._runtime()
+
+        report = asyncio.run(mod.OrphanCollector(runtime).collect(dry_run=True, grace=0))
+
+        assert [c["id"] for c in report["containers"]] == ["leaked"]
+        assert {e["action"] for e in report["containers"] + report["veths"]} == {"would_reclaim"}
+        assert report["reclaimed"] == {"containers": 0, "veths": 0}
+        assert set(runtime.containers) == {"known", "leaked", "idle"}
+        assert len(runtime.veths) == 2
+
+    def test_reclaims_only_after_grace(self):
+        mod = _load_collector(known={"known"})
+        runtime = self._runtime()
+        collector = mod.OrphanCollector(runtime)
+
+        first = asyncio.run(collector.collect())
+        assert {e["action"] for e in first["containers"] + first["veths"]} == {"pending"}
+
+        # Pretend the first sighting was long enough ago
+        collector._suspects = {key: seen - 120 for key, seen in collector._suspects.items()}
+        second = asyncio.run(collector.collect())
+
+        assert second["reclaimed"] == {"containers": 1, "veths": 2}
+        assert set(runtime.containers) == {"known", "idle"}
+        assert runtime.veths == []
+        assert collector._suspects == {}
+
+    def test_resolved_suspects_are_forgotten(self):
+        mod = _load_collector(known=set())
+        collector = mod.OrphanCollector(self._runtime())
+
+        asyncio.run(collector.collect(dry_run=True))
+        assert "container:known" in collector._suspects
+
+        # The deploy committed its node row: no longer an orphan
+        mod.OrphanCollector._known_container_ids = staticmethod(lambda: {"known"})
+        asyncio.run(collector.collect(dry_run=True))
+        assert "container:known" not in collector._suspects
@@ -0,0 +1,86 @@
+"""
+Unit tests for topology-aware node placement (app/runtime/placement.py).
+Pure graph partitioning — no Docker, database or app imports needed.
+"""
+import importlib.util
+import pathlib
+
+spec = importlib.util.spec_from_file_location(
+    "placement_mod",
+    pathlib.Path(__file__).parent.parent / "backend/app/runtime/placement.py",
+)
+placement = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(placement)
+
+
+def _clique(prefix, size):
+    nodes = [f"{prefix}{i}" for i in range(size)]
+    return nodes, [(a, b) for i, a in enumerate(nodes) for b in nodes[i + 1:]]
+
+
+def _clos(spines, leaves, per_leaf):
+    nodes = [f"s{i}" for i in range(spines)]
+    edges = []
+    for leaf in range(leaves):
+        name = f"l{leaf}"
+        nodes.append(name)
+        edges += [(name, spine) for spine in nodes[:spines]]
+        for h in range(per_leaf):
+            nodes.append(f"h{leaf}_{h}")
+            edges.append((name, f"h{leaf}_{h}"))
+    return nodes, edges
+
+
+def _counts(result, hosts):
+    return {host: sum(1 for h in result.values() if h == host) for host in hosts}
+
+
+class TestPlace:
+
+    def test_pods_joined_by_one_link_split_on_it(self):
+        pod_a, edges_a = _clique("a", 6)
+        pod_b, edges_b = _clique("b", 6)
+        edges = edges_a + edges_b + [("a0", "b0")]
+        nodes = pod_a + pod_b
+
+        result = placement.place(nodes, edges, {n: (1, 512) for n in nodes},
+                                 {"h1": (16, 16384), "h2": (16, 16384)})
+
+        assert placement.cut_size(edges, result) == 1
+        assert len({result[n] for n in pod_a}) == 1 and len({result[n] for n in pod_b}) == 1
+
+    def test_capacity_and_resource_hints_are_respected(self):
+        ring = [f"r{i}" for i in range(16)]
+        edges = [(ring[i], ring[(i + 1) % 16]) for i in range(16)]
+        demand = {n: (1, 1024) for n in ring}
+        demand["r0"] = (4, 8192)  # heavy image
+
+        result = placement.place(ring, edges, demand, {"small": (6, 12288), "big": (14, 16384)})
+
+        small = [n for n in ring if result[n] == "small"]
+        assert sum(demand[n][0] for n in small) <= 6
+        assert sum(demand[n][1] for n in small) <= 12288
+        assert placement.cut_size(edges, result) == 2  # one contiguous arc per host
+
+    def test_pinned_nodes_stay_and_attract_neighbours(self):
+        nodes, edges = _clique("n", 4)
+        extra = ["x0", "x1"]
+        edges += [("x0", "x1")]
+
+        result = placement.place(nodes[1:] + extra, edges, {n: (1, 512) for n in nodes + extra},
+                                 {"h1": (8, 8192), "h2": (8, 8192)}, pinned={"n0": "h2"})
+
+        assert "n0" not in result
+        assert {result[n] for n in nodes[1:]} == {"h2"}
+        assert {result[n] for n in extra} == {"h1"}
+
+    def test_large_clos_beats_round_robin_within_balance(self):
+        nodes, edges = _clos(spines=8, leaves=60, per_leaf=16)
+        hosts = {f"h{i}": (4096, 1 << 22) for i in range(4)}
+        names = sorted(hosts)
+
+        result = placement.place(nodes, edges, {n: (1, 512) for n in nodes}, hosts)
+        round_robin = {n: names[i % 4] for i, n in enumerate(nodes)}
+
+        assert placement.cut_size(edges, result) * 3 < placement.cut_size(edges, round_robin)
+        assert max(_counts(result, hosts).values()) <= len(nodes) / 4 * 1.1 + 1
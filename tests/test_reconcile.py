@@ -0,0 +1,152 @@
+"""
+Unit tests for diff-based lab reconciliation (app/runtime/reconcile.py).
+Runs without Docker or root — the observed host state is built by hand.
+"""
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "app", "app.core", "app.core.config",
+            "app.db", "app.db.models", "app.runtime", "app.runtime.netlink"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_reconcile():
+    network = _load("net_mod_reconcile", "app/runtime/network.py")
+    sys.modules["app.runtime.network"] = network
+    return network, _load("reconcile_mod", "app/runtime/reconcile.py")
+
+
+def _node(name, container_id=None, image_uri="frr:9"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), name=name, container_id=container_id,
+        image=SimpleNamespace(image_uri=image_uri),
+    )
+
+
+def _link(a, iface_a, b, iface_b, **props):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        source_node_id=a.id, source_interface=iface_a, source_node=a,
+        target_node_id=b.id, target_interface=iface_b, target_node=b,
+        bandwidth=props.get("bandwidth"), delay_ms=props.get("delay_ms", 0),
+        loss_percent=props.get("loss_percent", 0),
+    )
+
+
+class TestParsers:
+
+    def test_parse_veths_reads_peer_indexes(self):
+        network, _ = _load_reconcile()
+        output = (
+            "7: eth1@if12: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc netem\n"
+            "9: eth2@if14: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc noqueue\n"
+        )
+        assert network.parse_veths(output) == {"eth1": (7, 12), "eth2": (9, 14)}
+
+    def test_parse_qdiscs_normalizes_units(self):
+        network, _ = _load_reconcile()
+        output = (
+            "qdisc noqueue 0: dev lo root refcnt 2\n"
+            "qdisc tbf 1: dev eth1 root refcnt 2 rate 100Mbit burst 4Kb lat 50.0ms\n"
+            "qdisc netem 10: dev eth1 parent 1:1 limit 1000 delay 10.0ms loss 1%\n"
+            "qdisc noqueue 0: dev eth2 root refcnt 2\n"
+        )
+        qdiscs = network.parse_qdiscs(output)
+        assert qdiscs["eth1"] == network.impairment("100mbit", 10, 1.0)
+        assert qdiscs["eth2"] == network.impairment()
+        assert network.impairment_matches(network.impairment("100mbit", 10, 1.0), qdiscs["eth1"])
+        assert not network.impairment_matches(network.impairment("100mbit", 20, 1.0), qdiscs["eth1"])
+
+
+class TestPlanReconcile:
+
+    def _running(self, reconcile, cid, veths, impairments=None, image="frr:9"):
+        return reconcile.ObservedContainer(
+            id=cid, name=f"neon_lab_{cid}", status="running", image=image,
+            veths=veths, impairments=impairments or {},
+        )
+
+    def test_matching_lab_needs_no_actions(self):
+        network, reconcile = _load_reconcile()
+        r1, r2 = _node("R1", "c1"), _node("R2", "c2")
+        link = _link(r1, "eth1", r2, "eth1", delay_ms=10)
+        delayed = {"eth1": network.impairment(delay_ms=10)}
+        observed = {
+            "c1": self._running(reconcile, "c1", {"eth0": (2, 30), "eth1": (7, 8)}, delayed),
+            "c2": self._running(reconcile, "c2", {"eth0": (2, 31), "eth1": (8, 7)}, delayed),
+        }
+
+        plan = reconcile.plan_reconcile([r1, r2], [link], observed)
+
+        assert plan.empty
+
+    def test_only_changed_parts_are_planned(self):
+        network, reconcile = _load_reconcile()
+        r1, r2, r3 = _node("R1", "c1"), _node("R2", "c2"), _node("R3")
+        kept = _link(r1, "eth1", r2, "eth1", delay_ms=50)   # delay changed in the DB
+        added = _link(r2, "eth2", r3, "eth1")                # new node, new link
+        observed = {
+            "c1": self._running(reconcile, "c1", {"eth1": (7, 8), "eth3": (9, 20)},
+                                {"eth1": network.impairment(delay_ms=10)}),
+            "c2": self._running(reconcile, "c2", {"eth1": (8, 7)},
+                                {"eth1": network.impairment(delay_ms=10)}),
+            "gone": self._running(reconcile, "gone", {}),    # node deleted from the DB
+        }
+
+        plan = reconcile.plan_reconcile([r1, r2, r3], [kept, added], observed)
+
+        assert plan.remove_containers == ["gone"]
+        assert plan.deploy_nodes == [r3]
+        assert plan.reimpair_links == [kept]
+        assert plan.create_links == [added]
+        assert plan.delete_interfaces == [("c1", "eth3")]   # link removed from the DB
+        assert not plan.start_nodes and not plan.recreate_nodes
+
+    def test_miswired_and_restarted_endpoints_are_rewired(self):
+        _, reconcile = _load_reconcile()
+        r1, r2, r3 = _node("R1", "c1"), _node("R2", "c2"), _node("R3", "c3", image_uri="frr:10")
+        swapped = _link(r1, "eth1", r2, "eth1")
+        to_r3 = _link(r1, "eth2", r3, "eth1")
+        observed = {
+            # R1:eth1 is paired with something other than R2:eth1
+            "c1": self._running(reconcile, "c1", {"eth1": (7, 99), "eth2": (8, 5)}),
+            "c2": self._running(reconcile, "c2", {"eth1": (4, 70)}),
+            "c3": self._running(reconcile, "c3", {"eth1": (5, 8)}, image="frr:9"),
+        }
+
+        plan = reconcile.plan_reconcile([r1, r2, r3], [swapped, to_r3], observed)
+
+        assert plan.recreate_nodes == [r3]
+        assert plan.create_links == [swapped, to_r3]
+        assert set(plan.delete_interfaces) == {("c1", "eth1"), ("c2", "eth1"), ("c1", "eth2")}
+
+    def test_cross_host_tunnels_count_as_wired(self):
+        _, reconcile = _load_reconcile()
+        r1, r2, r3 = _node("R1", "c1"), _node("R2", "c2"), _node("R3", "c3")
+        tunneled = _link(r1, "eth1", r2, "eth1")
+        half = _link(r1, "eth2", r3, "eth1")
+        observed = {
+            "c1": self._running(reconcile, "c1", {}),
+            "c2": self._running(reconcile, "c2", {}),
+            "c3": self._running(reconcile, "c3", {}),
+        }
+        observed["c1"].tunnels = ["eth1", "eth2", "eth9"]
+        observed["c2"].tunnels = ["eth1"]
+
+        plan = reconcile.plan_reconcile([r1, r2, r3], [tunneled, half], observed)
+
+        assert plan.create_links == [half]
+        assert set(plan.delete_interfaces) == {("c1", "eth2"), ("c1", "eth9")}
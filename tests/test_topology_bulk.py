@@ -0,0 +1,188 @@
+"""
+Unit tests for the bulk insert path of TopologyBuilder (app/services/topology_builder.py).
+Runs without PostgreSQL — the session records INSERT statements instead, or
+(when SQLAlchemy is installed) is a real session on in-memory SQLite.
+"""
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+for mod in ["sqlalchemy", "sqlalchemy.orm", "app", "app.db", "app.db.base",
+            "app.db.models", "app.core", "app.core.config", "app.services"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+class FakeInsert:
+    def __init__(self, model):
+        self.model = model
+        self.rows = None
+
+
+class FakeSession:
+    """Applies recorded INSERTs to a stub lab so later calls see the rows"""
+
+    def __init__(self, lab):
+        self.lab = lab
+        self.inserts = []
+        self.flushes = 0
+
+    def query(self, model):
+        lab = self.lab
+        return SimpleNamespace(filter=lambda *a: SimpleNamespace(first=lambda: lab))
+
+    def execute(self, statement, rows):
+        statement.rows = rows
+        self.inserts.append(statement)
+        target = self.lab.nodes if statement.model == "Node" else self.lab.links
+        target.extend(SimpleNamespace(**row) for row in statement.rows)
+
+    def flush(self):
+        self.flushes += 1
+
+    def expire(self, obj, attributes):
+        pass
+
+    def commit(self):
+        pass
+
+
+def _load_builder(models=None):
+    catalog = MagicMock()
+    catalog.find.return_value = SimpleNamespace(id=uuid.uuid4(), name="frr", type="router")
+    catalog.load_sync.return_value = catalog
+    catalog_mod = MagicMock()
+    catalog_mod.get_image_catalog.return_value = catalog
+    sys.modules["app.services.image_catalog"] = catalog_mod
+
+    if models is None:
+        models = MagicMock()
+        models.Node, models.Link = "Node", "Link"
+    sys.modules["app.db.models"] = models
+
+    spec = importlib.util.spec_from_file_location(
+        "topo_bulk",
+        pathlib.Path(__file__).parent.parent / "backend/app/services/topology_builder.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    if isinstance(models, MagicMock):
+        mod.insert = FakeInsert
+    return mod.TopologyBuilder()
+
+
+def _sqlite_models():
+    """Lab, Node and Link mapped like app.db.models, on a fresh in-memory SQLite database"""
+    sa = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import declarative_base, relationship
+
+    Base = declarative_base()
+
+    class Lab(Base):
+        __tablename__ = "labs"
+        id = sa.Column(sa.Uuid, primary_key=True, default=uuid.uuid4)
+        name = sa.Column(sa.String(200))
+        nodes = relationship("Node")
+        links = relationship("Link")
+
+    class Node(Base):
+        __tablename__ = "nodes"
+        id = sa.Column(sa.Uuid, primary_key=True, default=uuid.uuid4)
+        lab_id = sa.Column(sa.Uuid, sa.ForeignKey("labs.id"))
+        image_id = sa.Column(sa.Uuid)
+        name = sa.Column(sa.String(100))
+        hostname = sa.Column(sa.String(100))
+        position_x = sa.Column(sa.Integer)
+        position_y = sa.Column(sa.Integer)
+        cpu = sa.Column(sa.Integer)
+        memory = sa.Column(sa.Integer)
+        status = sa.Column(sa.String(30))
+
+    class Link(Base):
+        __tablename__ = "links"
+        id = sa.Column(sa.Uuid, primary_key=True, default=uuid.uuid4)
+        lab_id = sa.Column(sa.Uuid, sa.ForeignKey("labs.id"))
+        source_node_id = sa.Column(sa.Uuid, sa.ForeignKey("nodes.id"))
+        source_interface = sa.Column(sa.String(50))
+        target_node_id = sa.Column(sa.Uuid, sa.ForeignKey("nodes.id"))
+        target_interface = sa.Column(sa.String(50))
+        bandwidth = sa.Column(sa.String(20))
+        delay_ms = sa.Column(sa.Integer)
+        loss_percent = sa.Column(sa.Float)
+        jitter_ms = sa.Column(sa.Integer)
+        status = sa.Column(sa.String(20))
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return SimpleNamespace(Lab=Lab, Node=Node, Link=Link, engine=engine)
+
+
+class TestBulkTopologyInsert:
+
+    def test_mesh_is_one_insert_per_table(self):
+        builder = _load_builder()
+        db = FakeSession(SimpleNamespace(nodes=[], links=[]))
+
+        result = builder.create_topology_pattern(
+            lab_id=uuid.uuid4(), pattern="mesh", count=64, image_type="router", db=db
+        )
+
+        assert db.flushes == 0
+        assert [(s.model, len(s.rows)) for s in db.inserts] == [("Node", 64), ("Link", 64 * 63 // 2)]
+        assert len(result["links"]) == 2016
+        # Summaries carry the same client-generated IDs that were inserted
+        assert [n["id"] for n in result["nodes"]] == [str(r["id"]) for r in db.inserts[0].rows]
+
+    def test_interface_assignment_matches_row_by_row_semantics(self):
+        builder = _load_builder()
+        db = FakeSession(SimpleNamespace(nodes=[], links=[]))
+        lab_id = uuid.uuid4()
+
+        builder.add_nodes(lab_id, [{"name": f"R{i}"} for i in range(1, 4)], db)
+        builder.add_links(lab_id, [{"source": "R1", "target": "R2"}], db)
+        second = builder.add_links(lab_id, [
+            {"source": "R1", "target": "R3"},
+            {"source": "R2", "target": "R3", "target_interface": "eth5"},
+            {"source": "R3", "target": "R1"},
+        ], db)
+
+        assert [(l["source"], l["target"]) for l in second] == [
+            ("R1:eth1", "R3:eth0"),
+            ("R2:eth1", "R3:eth5"),
+            ("R3:eth1", "R1:eth2"),
+        ]
+
+
+class TestRealSession:
+
+    def test_patterns_see_rows_of_earlier_batches(self):
+        # The chat tools run the builder through AsyncSession.run_sync on a
+        # session with expire_on_commit=False that has already loaded the lab
+        with patch.dict(sys.modules):
+            for name in [m for m in sys.modules if m.split(".")[0] == "sqlalchemy"]:
+                del sys.modules[name]
+            models = _sqlite_models()
+            builder = _load_builder(models)
+            from sqlalchemy.orm import Session, selectinload
+
+            with Session(models.engine, expire_on_commit=False) as db:
+                lab = models.Lab(name="lab")
+                db.add(lab)
+                db.commit()
+                db.query(models.Lab).options(
+                    selectinload(models.Lab.nodes), selectinload(models.Lab.links)
+                ).filter(models.Lab.id == lab.id).first()
+
+                ring = builder.create_topology_pattern(
+                    lab_id=lab.id, pattern="ring", count=4, image_type="router", db=db
+                )
+                more = builder.add_links(lab.id, [{"source": "R1", "target": "R3"}], db)
+
+                assert len(ring["links"]) == 4
+                assert more[0]["source"] == "R1:eth2" and more[0]["target"] == "R3:eth2"
+                assert db.query(models.Node).count() == 4
+                assert db.query(models.Link).count() == 5
@@ -0,0 +1,156 @@
+"""
+Unit tests for the warm container pool (app/runtime/pool.py).
+Runs without Docker or PostgreSQL — the Docker runtime is faked.
+"""
+import asyncio
+import importlib.util
+import pathlib
+import sys
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+for mod in ["app", "app.db", "app.db.base", "app.db.models", "app.core"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load_pool():
+    config = MagicMock()
+    config.settings.WARM_POOL_REFILL_CONCURRENCY = 2
+    sys.modules["app.core.config"] = config
+
+    spec = importlib.util.spec_from_file_location(
+        "pool_mod",
+        pathlib.Path(__file__).parent.parent / "backend/app/runtime/pool.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakeDocker:
+    def __init__(self):
+        self.containers = {}
+
+    async def create_container(self, image, name, labels, **kwargs):
+        container_id = uuid.uuid4().hex
+        self.containers[container_id] = {"name": name, "status": "created", "labels": labels}
+        return container_id
+
+    async def start_container(self, container_id):
+        self.containers[container_id]["status"] = "running"
+
+    async def remove_container(self, container_id):
+        self.containers.pop(container_id, None)
+
+    async def get_container_status(self, container_id):
+        return self.containers.get(container_id, {}).get("status", "not_found")
+
+    async def rename_container(self, container_id, name):
+        self.containers[container_id]["name"] = name
+
+    async def list_containers(self, filters):
+        return [{"id": cid, **c} for cid, c in self.containers.items()]
+
+
+class FakePuller:
+    async def ensure(self, image_uri):
+        pass
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.docker = FakeDocker()
+        self.puller = FakePuller()
+
+    @staticmethod
+    async def _run(fn, *args, **kwargs):
+        return await fn(*args, **kwargs)
+
+
+def _image(size):
+    return SimpleNamespace(
+        id=uuid.uuid4(), image_uri="ceos:4.30", cpu_recommended=2,
+        memory_recommended=2048, default_credentials=None, warm_pool_size=size,
+    )
+
+
+def _node(cpu=None, memory=None):
+    return SimpleNamespace(name="R1", cpu=cpu, memory=memory)
+
+
+class TestWarmPool:
+
+    def _started_pool(self, image):
+        mod = _load_pool()
+        pool = mod.WarmPool(FakeRuntime())
+        pool._load_specs = lambda: [mod.PoolSpec.from_image(image)]
+        return pool
+
+    async def _settle(self, pool):
+        await asyncio.gather(*pool._refills.values())
+
+    def test_claim_hits_renames_and_refills(self):
+        image = _image(size=2)
+
+        async def scenario():
+            pool = self._started_pool(image)
+            await pool.start()
+            await self._settle(pool)
+            assert pool.image_stats(str(image.id))["idle"] == 2
+
+            container_id = await pool.claim(_node(), image, "neon_lab_R1")
+            await self._settle(pool)
+            return pool, container_id
+
+        pool, container_id = asyncio.run(scenario())
+        docker = pool.runtime.docker
+        assert docker.containers[container_id]["name"] == "neon_lab_R1"
+        stats = pool.image_stats(str(image.id))
+        assert (stats["hits"], stats["misses"], stats["idle"], stats["created"]) == (1, 0, 2, 3)
+
+    def test_resource_override_and_dead_container_miss(self):
+        image = _image(size=1)
+
+        async def scenario():
+            pool = self._started_pool(image)
+            await pool.start()
+            await self._settle(pool)
+
+            custom = await pool.claim(_node(cpu=8), image, "neon_lab_R1")
+
+            # The only warm container died: it is discarded, not handed out
+            dead = pool._idle[str(image.id)][0]
+            pool.runtime.docker.containers[dead]["status"] = "exited"
+            missed = await pool.claim(_node(), image, "neon_lab_R2")
+            await self._settle(pool)
+            return pool, custom, missed, dead
+
+        pool, custom, missed, dead = asyncio.run(scenario())
+        assert custom is None and missed is None
+        assert dead not in pool.runtime.docker.containers
+        assert pool.stats()["misses"] == 2
+        assert pool.image_stats(str(image.id))["idle"] == 1
+
+    def test_restart_adopts_idle_and_leaves_claimed_containers(self):
+        image = _image(size=1)
+
+        async def scenario():
+            pool = self._started_pool(image)
+            await pool.start()
+            await self._settle(pool)
+            claimed = await pool.claim(_node(), image, "neon_lab_R1")
+            await self._settle(pool)
+            await pool.stop()
+
+            restarted = self._started_pool(image)
+            restarted.runtime = pool.runtime
+            await restarted.start()
+            await self._settle(restarted)
+            return restarted, claimed
+
+        pool, claimed = asyncio.run(scenario())
+        assert claimed in pool.runtime.docker.containers
+        assert claimed not in pool._idle[str(image.id)]
+        assert len(pool.runtime.docker.containers) == 2
+        assert pool.image_stats(str(image.id))["created"] == 0
@@ -0,0 +1,83 @@
+"""
+Unit tests for batched whole-lab wiring (app/runtime/wiring.py).
+Runs without Docker or root — only the generated batch scripts are checked.
+"""
+import importlib.util
+import pathlib
+import sys
+from unittest.mock import MagicMock
+
+BACKEND = pathlib.Path(__file__).parent.parent / "backend"
+
+for mod in ["docker", "docker.errors", "app", "app.core", "app.core.config",
+            "app.runtime", "app.runtime.netlink"]:
+    sys.modules.setdefault(mod, MagicMock())
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, BACKEND / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _load_wiring():
+    sys.modules["app.runtime.network"] = _load("net_mod_wiring", "app/runtime/network.py")
+    return _load("wiring_mod", "app/runtime/wiring.py")
+
+
+class TestWiringPlan:
+
+    def _mesh(self, wiring, nodes):
+        """Full mesh between `nodes` PIDs, eth1.. assigned per node"""
+        next_iface = {pid: 1 for pid in nodes}
+        links = []
+        for i, a in enumerate(nodes):
+            for b in nodes[i + 1:]:
+                links.append(wiring.LinkEndpoints(
+                    link_id=f"{a}-{b}",
+                    pid_a=a, iface_a=f"eth{next_iface[a]}",
+                    pid_b=b, iface_b=f"eth{next_iface[b]}",
+                    delay_ms=5,
+                ))
+                next_iface[a] += 1
+                next_iface[b] += 1
+        return links
+
+    def test_process_count_scales_with_nodes_not_links(self):
+        wiring = _load_wiring()
+        nodes = list(range(1000, 1010))
+        links = self._mesh(wiring, nodes)          # 45 links
+
+        plan = wiring.plan_lab_wiring(links)
+
+        # one host batch + one ip and one tc batch per namespace
+        assert plan.process_count == 1 + 2 * len(nodes)
+        assert len(plan.host_ip) == 3 * len(links)
+        assert set(plan.ns_ip) == set(nodes)
+
+    def test_namespace_scripts_rename_and_raise(self):
+        wiring = _load_wiring()
+        link = wiring.LinkEndpoints("l1", 111, "eth1", 222, "eth3", bandwidth="1gbit", delay_ms=10)
+
+        plan = wiring.plan_lab_wiring([link])
+
+        assert plan.host_ip[0] == "link add veth111_eth1 type veth peer name veth222_eth3"
+        assert plan.ns_ip[111] == ["link set veth111_eth1 name eth1", "link set eth1 up"]
+        # tbf root + chained netem child on each end
+        assert len(plan.ns_tc[222]) == 2
+        assert "root handle 1: tbf" in plan.ns_tc[222][0]
+        assert "parent 1:1" in plan.ns_tc[222][1]
+
+    def test_truncated_name_collisions_are_disambiguated(self):
+        wiring = _load_wiring()
+        links = [
+            wiring.LinkEndpoints("l1", 1234567, "Ethernet1/1", 2, "eth1"),
+            wiring.LinkEndpoints("l2", 1234567, "Ethernet1/2", 3, "eth1"),
+        ]
+
+        plan = wiring.plan_lab_wiring(links)
+
+        created = [line.split()[2] for line in plan.host_ip if line.startswith("link add")]
+        assert len(created) == len(set(created)), f"duplicate veth names: {created}"
+        assert all(len(name) <= 15 for name in created)